@@ -1,93 +1,235 @@
-from fastapi import FastAPI, HTTPException
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
 from contextlib import asynccontextmanager
+import asyncio
+import json
 import os
+import threading
 import uvicorn
 
 from database import Database
 from data_loader import DataLoader
-from embedding import EmbeddingManager
-from search import RAGSearch
+from executor import BoundedExecutor, QueueFullError
+from http_responses import ResponseEncoder, answer_etag, etag_matches
+from metrics import StageTimer
+from prometheus import PrometheusWriter, CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE
+from sessions import SessionStore, new_session_id, is_valid_session_id
+from startup import StartupTracker
+# embedding, search and record_store pull in torch, sentence_transformers and faiss;
+# they are imported by the background warm-up so the server starts accepting connections first
+
+# Tuning knobs (overridable through environment variables)
+BATCH_MAX_SIZE = int(os.environ.get("RAG_BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("RAG_BATCH_MAX_WAIT_MS", "5"))
+WORKER_THREADS = int(os.environ.get("RAG_WORKER_THREADS", str(min(8, os.cpu_count() or 1))))
+WORKER_QUEUE_SIZE = int(os.environ.get("RAG_WORKER_QUEUE_SIZE", "32"))
+EMBED_CACHE_SIZE = int(os.environ.get("RAG_EMBED_CACHE_SIZE", "2048"))
+EMBED_CACHE_MB = float(os.environ.get("RAG_EMBED_CACHE_MB", "16"))
+EMBED_CACHE_TTL = float(os.environ.get("RAG_EMBED_CACHE_TTL", "0")) or None
+ANSWER_CACHE_SIZE = int(os.environ.get("RAG_ANSWER_CACHE_SIZE", "1024"))
+RECORD_CACHE_SIZE = int(os.environ.get("RAG_RECORD_CACHE_SIZE", "4096"))
+RECORD_STORE_MB = float(os.environ.get("RAG_RECORD_STORE_MB", "0"))
+SESSION_MAX = int(os.environ.get("RAG_SESSION_MAX", "10000"))
+SESSION_TTL = float(os.environ.get("RAG_SESSION_TTL", "1800"))
+SESSION_COOKIE = "rag_session"
+INDEX_TYPE = os.environ.get("RAG_INDEX_TYPE", "flat")
+# Unset parameters fall back to vector_index.DEFAULT_PARAMS for the index type
+INDEX_PARAMS = {
+    name: int(os.environ[var])
+    for name, var in [
+        ("nlist", "RAG_INDEX_NLIST"),
+        ("nprobe", "RAG_INDEX_NPROBE"),
+        ("M", "RAG_INDEX_HNSW_M"),
+        ("ef_search", "RAG_INDEX_EF_SEARCH"),
+        ("pq_m", "RAG_INDEX_PQ_M"),
+    ]
+    if os.environ.get(var)
+}
+RERANK_FACTOR = int(os.environ.get("RAG_RERANK_FACTOR", "0"))
+INDEX_MMAP = os.environ.get("RAG_INDEX_MMAP", "0") == "1"
+EMBED_WORKERS = int(os.environ.get("RAG_EMBED_WORKERS", "1"))
+ENCODER_BACKEND = os.environ.get("RAG_ENCODER_BACKEND", "torch")
+RETRIEVAL_MODE = os.environ.get("RAG_RETRIEVAL_MODE", "vector")
+LEXICAL_MARGIN = float(os.environ.get("RAG_LEXICAL_MARGIN", "1.5"))
+TIERED_RETRIEVAL = os.environ.get("RAG_TIERED_RETRIEVAL", "0") == "1"
+FUZZY_SKIP_SCORE = int(os.environ.get("RAG_FUZZY_SKIP_SCORE", "90"))
+ASK_BATCH_MAX = int(os.environ.get("RAG_ASK_BATCH_MAX", "10000"))
+ASK_BATCH_CHUNK = int(os.environ.get("RAG_ASK_BATCH_CHUNK", "256"))
+ASK_CACHE_MAX_AGE = int(os.environ.get("RAG_ASK_CACHE_MAX_AGE", "60"))
+GZIP_MIN_BYTES = int(os.environ.get("RAG_GZIP_MIN_BYTES", "1024"))
+
+INDEX_PATH = "faiss_index_v2.bin"
+ID_TABLE_PATH = "id_table_v2.bin"
+LEGACY_MAPPING_PATH = "id_mapping_v2.pkl"  # Pickled mapping written by older versions
+
+# Encoded once the model and index are up, so the first real query is not slow
+WARMUP_QUERIES = [
+    "hello",
+    "who is the author",
+    "tell me more about the history and main ideas of this topic and why it matters",
+]
+STARTUP_STAGES = ["imports", "database", "model", "index", "search", "warmup"]
+
+# Paths with their own request metrics; everything else (frontend files) is counted as "other"
+METRIC_PATHS = {"/ask", "/ask/batch", "/health", "/ready", "/stats", "/metrics"}
+
+IMPORT_SECONDS = time.perf_counter() - _import_started
 
 # Global variables for application state
 db = None
 embedding_manager = None
-rag_search = None
+rag_search = None  # Set once every startup stage is done
+executor = None
+startup = None
+warmup_thread = None
+response_encoder = ResponseEncoder(GZIP_MIN_BYTES)
+http_times = StageTimer()  # (method, path) -> request latency
+http_statuses = {}  # (method, path, status) -> request count
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Initialize application on startup"""
+
+def warm_up():
+    """Load data, model and index, then warm them up (runs in a background thread)"""
     global db, embedding_manager, rag_search
     
-    print("="*50)
-    print("Starting RAG Application")
-    print("="*50)
+    with startup.stage("imports"):
+        from embedding import EmbeddingManager
+        from search import RAGSearch
+        from record_store import RecordStore
     
     # Initialize database
-    print("\n1. Initializing database...")
-    db = Database("knowledge_v2.db")
-    db.connect()
-    db.create_table()
-    
-    # Check if database is empty
-    record_count = db.count_records()
-    print(f"   Database has {record_count} records")
-    
-    # Load data if database is empty
-    if record_count == 0:
-        print("\n2. Loading data from JSON files...")
-        loader = DataLoader("data")
-        loaded = loader.load_into_database(db)
+    with startup.stage("database"):
+        print("\n1. Initializing database...")
+        database = Database("knowledge_v2.db")
+        database.connect()
+        database.create_table()
+        db = database  # Published only once the schema exists, for /health
+        
+        # Check if database is empty
+        record_count = db.count_records()
+        print(f"   Database has {record_count} records")
         
-        if loaded == 0:
-            print("\n   WARNING: No data loaded!")
-            print("   Place JSON files in the 'data' folder to enable search.")
-            print("   Application will start but searches will return no results.")
-    else:
-        print("\n2. Using existing database")
+        # Load data if database is empty
+        if record_count == 0:
+            print("\n2. Loading data from JSON files...")
+            loader = DataLoader("data")
+            loaded = loader.load_into_database(db)
+            
+            if loaded == 0:
+                print("\n   WARNING: No data loaded!")
+                print("   Place JSON files in the 'data' folder to enable search.")
+                print("   Application will start but searches will return no results.")
+        else:
+            print("\n2. Using existing database")
     
     # Initialize embedding manager
-    print("\n3. Initializing embedding model...")
-    embedding_manager = EmbeddingManager()
-    
-    # Try to load existing index
-    index_exists = embedding_manager.load_index("faiss_index_v2.bin", "id_mapping_v2.pkl")
+    with startup.stage("model"):
+        print("\n3. Initializing embedding model...")
+        embedding_manager = EmbeddingManager(
+            cache_size=EMBED_CACHE_SIZE,
+            cache_max_bytes=int(EMBED_CACHE_MB * 1024 * 1024),
+            cache_ttl=EMBED_CACHE_TTL,
+            index_type=INDEX_TYPE,
+            index_params=INDEX_PARAMS,
+            rerank_factor=RERANK_FACTOR,
+            embed_workers=EMBED_WORKERS,
+            encoder_backend=ENCODER_BACKEND
+        )
     
-    # Build index if doesn't exist or if new data was loaded
-    if not index_exists or (record_count == 0 and db.count_records() > 0):
-        print("\n4. Building FAISS index...")
-        records = db.get_all_records()
+    with startup.stage("index"):
+        # Try to load existing index
+        index_exists = embedding_manager.load_index(
+            INDEX_PATH, ID_TABLE_PATH, mmap=INDEX_MMAP, legacy_mapping_path=LEGACY_MAPPING_PATH
+        )
         
-        if records:
-            texts = [r['content'] for r in records]
-            ids = [r['id'] for r in records]
-            
-            embeddings = embedding_manager.create_embeddings(texts)
-            embedding_manager.build_index(embeddings, ids)
-            
-            # Save index for future use
-            embedding_manager.save_index("faiss_index_v2.bin", "id_mapping_v2.pkl")
+        # Build index if doesn't exist, otherwise bring it in line with the database
+        if not index_exists:
+            print("\n4. Building FAISS index...")
+            # Stored vectors are reused; only records without a current one are encoded
+            if embedding_manager.build_index_from_database(db):
+                embedding_manager.save_index(INDEX_PATH, ID_TABLE_PATH)
         else:
-            print("   No records to index")
-    else:
-        print("\n4. Using existing FAISS index")
+            print("\n4. Syncing existing FAISS index with database...")
+            summary = embedding_manager.sync_with_database(db)
+            if any(summary.values()) or embedding_manager.needs_save:
+                embedding_manager.save_index(INDEX_PATH, ID_TABLE_PATH)
+            # Persist vectors of indexes built before embeddings were stored, so rebuilds skip encoding
+            embedding_manager.store_index_vectors(db)
     
     # Initialize RAG search
-    print("\n5. Initializing RAG search...")
-    rag_search = RAGSearch(db, embedding_manager)
+    with startup.stage("search"):
+        print("\n5. Initializing RAG search...")
+        search = RAGSearch(
+            db,
+            embedding_manager,
+            answer_cache_size=ANSWER_CACHE_SIZE,
+            sessions=SessionStore(SESSION_MAX, SESSION_TTL),
+            record_cache_size=RECORD_CACHE_SIZE,
+            retrieval_mode=RETRIEVAL_MODE,
+            lexical_margin=LEXICAL_MARGIN,
+            tiered=TIERED_RETRIEVAL,
+            fuzzy_skip_score=FUZZY_SKIP_SCORE
+        )
+        
+        # Optionally keep indexed records resident
+        if RECORD_STORE_MB > 0 and embedding_manager.index is not None:
+            store = RecordStore(int(RECORD_STORE_MB * 1024 * 1024))
+            store.load(db, embedding_manager.record_ids())
+            search.attach_record_store(store)
+    
+    with startup.stage("warmup"):
+        embedding_manager.warm_up(WARMUP_QUERIES)
+        # Batch concurrent query encodes (set RAG_BATCH_MAX_SIZE=1 to disable)
+        if BATCH_MAX_SIZE > 1:
+            embedding_manager.enable_batching(BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
     
+    rag_search = search
     print("\n" + "="*50)
     print("RAG Application Ready!")
     print(f"Total records: {db.count_records()}")
+    startup.report(IMPORT_SECONDS)
     print("="*50 + "\n")
+
+
+def _run_warm_up():
+    try:
+        warm_up()
+    except Exception as e:
+        print(f"Startup failed: {startup.error or e}")
+        startup.report(IMPORT_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start serving at once; the model and index load in the background (see /ready)"""
+    global executor, startup, warmup_thread
+    
+    print("="*50)
+    print("Starting RAG Application")
+    print(f"App imports took {IMPORT_SECONDS:.3f}s")
+    print("="*50)
+    
+    startup = StartupTracker(STARTUP_STAGES)
+    # Run the blocking pipeline off the event loop
+    executor = BoundedExecutor(WORKER_THREADS, WORKER_QUEUE_SIZE)
+    # Daemon thread: shutting down mid-warm-up must not wait for the model to finish loading
+    warmup_thread = threading.Thread(target=_run_warm_up, name="rag-warmup", daemon=True)
+    warmup_thread.start()
     
     yield
     
     # Cleanup on shutdown
-    if db:
+    if executor:
+        executor.shutdown()
+    if embedding_manager:
+        embedding_manager.disable_batching()
+    if db and not warmup_thread.is_alive():
         db.close()
 
 # Create FastAPI app
@@ -107,33 +249,180 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class RequestMetrics:
+    """ASGI middleware timing each request until its last body byte is sent"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        started = time.perf_counter()
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            path = scope["path"] if scope["path"] in METRIC_PATHS else "other"
+            http_times.observe((scope["method"], path), time.perf_counter() - started)
+            key = (scope["method"], path, status)
+            http_statuses[key] = http_statuses.get(key, 0) + 1
+
+app.add_middleware(RequestMetrics)
+
 # Request/Response models
 class QuestionRequest(BaseModel):
     question: str
+    session_id: Optional[str] = None  # Falls back to the session cookie
+    include_sources: bool = False
 
 class AnswerResponse(BaseModel):
     answer: str
+    session_id: Optional[str] = None
+    sources: Optional[List[Dict[str, Any]]] = None  # Only with include_sources
+
+class BatchQuestion(BaseModel):
+    question: str
+    session_id: Optional[str] = None  # Without one the question is answered without conversation context
+
+class BatchRequest(BaseModel):
+    questions: List[BatchQuestion]
 
 # API Endpoints
+def answer_response(payload: Dict[str, Any], raw_request: Request, headers: Dict[str, str]) -> Response:
+    """JSON response encoded by response_encoder (gzipped when large), with extra headers"""
+    body, encoding_headers = response_encoder.encode(payload, raw_request.headers.get("accept-encoding"))
+    return Response(body, media_type="application/json", headers={**headers, **encoding_headers})
+
+def cache_headers(question: str, include_sources: bool) -> Dict[str, str]:
+    """ETag and Cache-Control for a context-free answer; changes whenever the data or index does"""
+    return {
+        "ETag": answer_etag(rag_search.data_fingerprint(), question, include_sources),
+        "Cache-Control": f"public, max-age={ASK_CACHE_MAX_AGE}"
+    }
+
+async def run_answer(*args, **kwargs) -> Dict[str, Any]:
+    """answer_question on the worker pool"""
+    try:
+        future = executor.submit(rag_search.answer_question, *args, **kwargs)
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+    
+    try:
+        return await asyncio.wrap_future(future)
+    except Exception as e:
+        print(f"Error processing question: {e}")
+        raise HTTPException(status_code=500, detail="Error processing question")
+
 @app.post("/ask", response_model=AnswerResponse)
-async def ask_question(request: QuestionRequest):
+async def ask_question(request: QuestionRequest, raw_request: Request):
     """Answer a question using RAG"""
-    if not rag_search:
-        raise HTTPException(status_code=503, detail="Service not ready")
+    if not rag_search or not executor:
+        raise HTTPException(status_code=503, detail="Service not ready", headers={"Retry-After": "5"})
+    
+    question = request.question.strip() if request.question else ""
+    if not question:
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+    
+    # Conversation context is scoped to the client's session
+    session_id = request.session_id or raw_request.cookies.get(SESSION_COOKIE)
+    if not is_valid_session_id(session_id):
+        session_id = new_session_id()
+    
+    # Not conditional: POST changes the session's context, and the body carries the session id
+    result = await run_answer(question, session_id)
     
-    if not request.question or not request.question.strip():
+    payload = {"answer": result['answer'], "session_id": session_id}
+    if request.include_sources:
+        payload["sources"] = result['sources']
+    response = answer_response(payload, raw_request, {"Cache-Control": "no-store"})
+    response.set_cookie(SESSION_COOKIE, session_id, max_age=int(SESSION_TTL), httponly=True, samesite="lax")
+    return response
+
+@app.get("/ask")
+async def ask_question_cacheable(raw_request: Request, question: str = "", include_sources: bool = False):
+    """Answer a question without conversation context; publicly cacheable by ETag"""
+    if not rag_search or not executor:
+        raise HTTPException(status_code=503, detail="Service not ready", headers={"Retry-After": "5"})
+    
+    question = question.strip()
+    if not question:
         raise HTTPException(status_code=400, detail="Question cannot be empty")
     
+    headers = cache_headers(question, include_sources)
+    if etag_matches(raw_request.headers.get("if-none-match"), headers["ETag"]):
+        response_encoder.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    
+    result = await run_answer(question, use_context=False)
+    payload = {"answer": result['answer']}
+    if include_sources:
+        payload["sources"] = result['sources']
+    return answer_response(payload, raw_request, headers)
+
+@app.post("/ask/batch")
+async def ask_batch(request: BatchRequest):
+    """Answer many questions, streamed back in input order as NDJSON, one line per question"""
+    if not rag_search or not executor:
+        raise HTTPException(status_code=503, detail="Service not ready", headers={"Retry-After": "5"})
+    
+    if len(request.questions) > ASK_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {ASK_BATCH_MAX} questions per batch")
+    
+    items = [(item.question.strip(), item.session_id) for item in request.questions]
+    chunks = [list(range(start, min(start + ASK_BATCH_CHUNK, len(items)))) for start in range(0, len(items), ASK_BATCH_CHUNK)]
+    
+    def submit(chunk):
+        # Empty questions get an error line instead of an answer
+        valid = [i for i in chunk if items[i][0]]
+        questions = [items[i][0] for i in valid]
+        session_ids = [items[i][1] if is_valid_session_id(items[i][1]) else None for i in valid]
+        return valid, executor.submit(rag_search.answer_batch, questions, session_ids)
+    
+    # Fail fast while a status code can still be sent
     try:
-        result = rag_search.answer_question(request.question.strip())
-        return AnswerResponse(answer=result['answer'])
-    except Exception as e:
-        print(f"Error processing question: {e}")
-        raise HTTPException(status_code=500, detail="Error processing question")
+        first = submit(chunks[0]) if chunks else None
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+    
+    async def lines():
+        # One chunk is answered at a time, so at most one chunk of results is held in memory
+        for n, chunk in enumerate(chunks):
+            if n == 0:
+                valid, future = first
+            else:
+                while True:
+                    try:
+                        valid, future = submit(chunk)
+                        break
+                    except QueueFullError:
+                        await asyncio.sleep(0.05)
+            try:
+                results = dict(zip(valid, await asyncio.wrap_future(future)))
+            except Exception as e:
+                print(f"Error processing question batch: {e}")
+                yield json.dumps({"error": "Error processing question"}) + "\n"
+                return
+            for i in chunk:
+                if i in results:
+                    line = {"index": i, "answer": results[i]['answer'], "sources": results[i]['sources']}
+                else:
+                    line = {"index": i, "error": "Question cannot be empty"}
+                yield json.dumps(line) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness check: the process is up, even while still warming up"""
     record_count = db.count_records() if db else 0
     return {
         "status": "healthy",
@@ -141,6 +430,105 @@ async def health_check():
         "index_ready": embedding_manager.index is not None if embedding_manager else False
     }
 
+@app.get("/ready")
+async def ready():
+    """Readiness check: 200 once every startup stage is done, 503 with stage status before"""
+    snapshot = startup.snapshot() if startup else {"ready": False, "stages": {}, "error": None}
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+@app.get("/stats")
+async def stats():
+    """Runtime tuning statistics"""
+    batcher = embedding_manager.batcher if embedding_manager else None
+    return {
+        "executor": executor.stats() if executor else None,
+        "batcher": batcher.stats() if batcher else None,
+        "query_cache": embedding_manager.query_cache.stats() if embedding_manager else None,
+        "answer_cache": rag_search.cache_stats() if rag_search else None,
+        "sessions": rag_search.sessions.stats() if rag_search else None,
+        "records": rag_search.fetch_stats() if rag_search else None,
+        "retrieval": rag_search.retrieval_stats() if rag_search else None,
+        "responses": response_encoder.stats(),
+        "stages_ms": dict(
+            rag_search.stage_times.snapshot() if rag_search else {},
+            **(embedding_manager.stage_times.snapshot() if embedding_manager else {})
+        ),
+        "index": embedding_manager.index_stats() if embedding_manager else None
+    }
+
+def cache_metrics(writer: PrometheusWriter, cache: str, stats: dict):
+    labels = {"cache": cache}
+    writer.counter("rag_cache_hits_total", "Cache hits", stats["hits"], labels)
+    writer.counter("rag_cache_misses_total", "Cache misses", stats["misses"], labels)
+    writer.counter("rag_cache_evictions_total", "Entries evicted to stay within the cache limits", stats["evictions"], labels)
+    writer.gauge("rag_cache_entries", "Entries in the cache", stats["entries"], labels)
+    writer.gauge("rag_cache_bytes", "Bytes held by the cache (0 when not tracked)", stats["bytes"], labels)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: per-stage and per-request latency, counters, index size, caches and queues"""
+    w = PrometheusWriter()
+    w.gauge("rag_ready", "1 once every startup stage is done", int(bool(startup and startup.ready)))
+    
+    for (method, path), histogram in list(http_times.stages.items()):
+        w.histogram("rag_http_request_duration_seconds", "HTTP request latency, body included",
+                    histogram, {"method": method, "path": path}, scale=0.001)
+    for (method, path, status), count in list(http_statuses.items()):
+        w.counter("rag_http_requests_total", "HTTP requests by response status", count,
+                  {"method": method, "path": path, "status": str(status)})
+    
+    if rag_search:
+        w.histogram("rag_answer_duration_seconds", "answer_question latency, answer cache hits included",
+                    rag_search.answer_times, scale=0.001)
+        for stage, histogram in list(rag_search.stage_times.stages.items()):
+            w.histogram("rag_stage_duration_seconds", "Latency of one RAG pipeline stage", histogram, {"stage": stage}, scale=0.001)
+        tiers, paths = rag_search.retrieval_counters()
+        for path, stats in paths.items():
+            labels = {"path": path}
+            w.histogram("rag_retrieval_duration_seconds", "Retrieval latency per retrieval path", stats["latency"], labels, scale=0.001)
+            w.counter("rag_retrieval_requests_total", "Retrievals per retrieval path", stats["requests"], labels)
+            w.counter("rag_retrieval_hits_total", "Retrievals that found documents", stats["hits"], labels)
+        for tier, count in tiers.items():
+            w.counter("rag_entity_tier_requests_total", "Retrievals per entity-match tier", count, {"tier": tier})
+        answer_cache = rag_search.cache_stats()
+        cache_metrics(w, "answer", answer_cache)
+        cache_metrics(w, "record", rag_search.record_cache.stats())
+        cache_metrics(w, "rendered_answer", rag_search.record_answers.stats())
+        w.counter("rag_answer_coalesced_total", "Requests that waited for an identical in-flight answer",
+                  answer_cache["coalesced"])
+        w.gauge("rag_sessions", "Active conversation sessions", len(rag_search.sessions))
+    
+    if embedding_manager:
+        for stage, histogram in list(embedding_manager.stage_times.stages.items()):
+            w.histogram("rag_stage_duration_seconds", "Latency of one RAG pipeline stage", histogram, {"stage": stage}, scale=0.001)
+        index = embedding_manager.index_stats()
+        w.gauge("rag_index_vectors", "Vectors in the FAISS index", index["vectors"])
+        w.gauge("rag_index_memory_bytes", "Estimated FAISS index memory", index.get("memory_bytes", 0))
+        cache_metrics(w, "query_embedding", embedding_manager.query_cache.stats())
+        batcher = embedding_manager.batcher
+        if batcher:
+            w.gauge("rag_query_batcher_pending", "Queries waiting for a micro-batch", batcher.pending())
+            w.histogram("rag_query_batch_size", "Queries per micro-batch", batcher.batch_sizes)
+            w.histogram("rag_query_batch_wait_seconds", "Time a query waited for its micro-batch", batcher.wait_times, scale=0.001)
+    
+    if executor:
+        stats = executor.stats()
+        w.gauge("rag_executor_queue_depth", "Tasks waiting for a worker thread", stats["queue_depth"])
+        w.gauge("rag_executor_active", "Tasks running on worker threads", stats["active"])
+        w.gauge("rag_executor_workers", "Worker threads", stats["max_workers"])
+        w.counter("rag_executor_completed_total", "Tasks completed by the worker pool", stats["completed"])
+        w.counter("rag_executor_rejected_total", "Tasks rejected because the queue was full", stats["rejected"])
+    
+    if db:
+        w.gauge("rag_records", "Records in the knowledge base", db.cached_record_count())
+    
+    w.counter("rag_response_body_bytes_total", "/ask response bytes before compression", response_encoder.body_bytes)
+    w.counter("rag_response_wire_bytes_total", "/ask response bytes sent", response_encoder.wire_bytes)
+    w.counter("rag_response_not_modified_total", "/ask requests answered with 304 Not Modified", response_encoder.not_modified)
+    w.histogram("rag_response_serialize_duration_seconds", "/ask JSON serialization time",
+                response_encoder.serialize_times, scale=0.001)
+    return Response(w.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 # Serve frontend static files
 frontend_path = "frontend/dist"
 if os.path.exists(frontend_path):
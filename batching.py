@@ -0,0 +1,135 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import List, Tuple, Dict, Any
+
+from metrics import Histogram, LATENCY_BUCKETS_MS, BATCH_SIZE_BUCKETS
+
+# How often a blocked submit() checks whether the worker has exited
+STOP_POLL_SECONDS = 0.1
+
+
+def on_event_loop() -> bool:
+    """Whether the calling thread is running an asyncio event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class QueryBatcher:
+    """Collect concurrent search requests into micro-batches.
+
+    Callers block in submit() while a single worker thread drains the queue
+    (so it must not be called from an event loop thread),
+    waiting up to max_wait_ms (or until max_batch queries are pending) before
+    running one batched encode + FAISS search and fanning results back out.
+    """
+
+    def __init__(self, embedding_manager, max_batch: int = 16, max_wait_ms: float = 5.0):
+        self.embedding_manager = embedding_manager
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+
+        # Tuning metrics
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.wait_times = Histogram(LATENCY_BUCKETS_MS)
+
+        self._worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Queue a query and block until its batch has been searched"""
+        if self._stopped.is_set():
+            raise RuntimeError("Query batcher is stopped")
+
+        future = Future()
+        self._queue.put((query, k, future, time.perf_counter()))
+        # stop() may have run its final drain between the check above and the put;
+        # once the worker has exited nothing else will resolve the future
+        while True:
+            try:
+                return future.result(timeout=STOP_POLL_SECONDS)
+            except FutureTimeout:
+                if self._stopped.is_set() and not self._worker.is_alive() and not future.done():
+                    raise RuntimeError("Query batcher is stopped")
+
+    def _collect(self) -> List[tuple]:
+        """Block for the first request, then gather more until the window closes"""
+        first = self._queue.get()
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._stopped.set()
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect()
+            if not batch:
+                break
+
+            started = time.perf_counter()
+            for _, _, _, enqueued in batch:
+                self.wait_times.observe((started - enqueued) * 1000)
+            self.batch_sizes.observe(len(batch))
+
+            queries = [item[0] for item in batch]
+            k = max(item[1] for item in batch)
+            try:
+                # Cache misses were already counted by EmbeddingManager.search
+                results = self.embedding_manager.search_batch(queries, k=k, record_miss=False)
+            except Exception as e:
+                for _, _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, item_k, future, _), hits in zip(batch, results):
+                future.set_result(hits[:item_k])
+
+        # Fail anything left behind so callers never hang
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[2].set_exception(RuntimeError("Query batcher is stopped"))
+
+    def stop(self):
+        """Stop the worker thread"""
+        self._stopped.set()
+        self._queue.put(None)
+        self._worker.join(timeout=1.0)
+
+    def pending(self) -> int:
+        """Queries waiting for a micro-batch (approximate)"""
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch-size and queue-wait histograms for tuning"""
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "pending": self.pending(),
+            "batch_size": self.batch_sizes.snapshot(),
+            "wait_ms": self.wait_times.snapshot(),
+        }
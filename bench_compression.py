@@ -0,0 +1,122 @@
+"""
+Benchmark compressed vector storage: resident index memory vs recall@k, with
+and without exact re-ranking from the memory-mapped full-precision store.
+
+Recall is measured against exact (flat) search the same way tune_index.py
+does. The full-precision store lives on disk and is only paged in for the
+re-ranked candidates, so it is reported separately from index memory.
+
+Usage:
+    python bench_compression.py --synthetic 100000
+    python bench_compression.py --stub-encoder --json compression.json
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from tune_index import load_corpus, load_encoder, encode, measure
+from vector_index import create_index, index_memory_bytes, describe
+from vector_store import VectorStore, rerank, store_paths
+
+RERANK_FACTORS = [0, 2, 4, 10]
+
+
+class Reranked:
+    """Index-like wrapper that shortlists k * factor candidates and rescores them"""
+
+    def __init__(self, index, store: VectorStore, factor: int):
+        self.index = index
+        self.store = store
+        self.factor = factor
+
+    def search(self, queries, k):
+        _, candidates = self.index.search(queries, k * self.factor)
+        return rerank(self.store, queries, candidates, k)
+
+
+def candidates(n: int):
+    nlist = max(1, int(4 * np.sqrt(n)))
+    return [
+        ("flat", {}),
+        ("fp16", {}),
+        ("sq8", {}),
+        ("pq", {"pq_m": 96}),
+        ("pq", {"pq_m": 48}),
+        ("ivf_pq", {"nlist": nlist, "nprobe": 32, "pq_m": 48}),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic records instead of --data")
+    parser.add_argument("--stub-encoder", action="store_true", help="Use HashingEncoder instead of the model")
+    parser.add_argument("--model", default="paraphrase-MiniLM-L3-v2")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    name, texts = load_corpus(args)
+    encoder = load_encoder(args)
+    vectors = encode(encoder, texts)
+    labels = np.arange(len(vectors), dtype='int64')
+    print(f"Corpus {name}: {len(texts):,} records, {vectors.shape[1]} dimensions")
+
+    sample = random.Random(0).sample(range(len(texts)), min(args.queries, len(texts)))
+    queries = encode(encoder, [" ".join(texts[i].split()[:8]) for i in sample])
+
+    # Full-precision store, written once and memory-mapped like EmbeddingManager does
+    folder = tempfile.mkdtemp()
+    store = VectorStore(vectors.shape[1])
+    store.add(labels, vectors)
+    store.save(os.path.join(folder, "bench.bin"))
+    store_mb = os.path.getsize(store_paths(os.path.join(folder, "bench.bin"))[0]) / 1024 / 1024
+
+    results = []
+    kth_scores = None
+    for index_type, build_params in candidates(len(vectors)):
+        started = time.perf_counter()
+        index, params = create_index(index_type, vectors.shape[1], build_params, vectors)
+        index.add_with_ids(vectors, labels)
+        build_seconds = time.perf_counter() - started
+        memory_mb = index_memory_bytes(index) / 1024 / 1024
+
+        if kth_scores is None:
+            kth_scores = index.search(queries, args.k)[0][:, -1]
+
+        for factor in RERANK_FACTORS if index_type != "flat" else [0]:
+            searcher = Reranked(index, store, factor) if factor else index
+            recall, p50, p99 = measure(searcher, vectors, queries, kth_scores, args.k)
+            results.append({
+                "index_type": index_type,
+                "params": params,
+                "rerank_factor": factor,
+                f"recall_at_{args.k}": round(recall, 4),
+                "p50_ms": round(p50, 4),
+                "p99_ms": round(p99, 4),
+                "index_memory_mb": round(memory_mb, 2),
+                "store_on_disk_mb": round(store_mb, 2) if factor else 0,
+                "build_seconds": round(build_seconds, 2),
+            })
+            rerank_label = f"rerank x{factor}" if factor else "no rerank"
+            print(f"{describe(index_type, params):<50} {rerank_label:<10} recall@{args.k} {recall:.3f}  "
+                  f"p50 {p50:.3f}ms  p99 {p99:.3f}ms  index {memory_mb:8.1f}MB")
+
+    print(f"\nFull-precision store: {store_mb:.1f}MB on disk (memory-mapped, paged in on demand)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"corpus": name, "records": len(texts), "queries": len(queries), "k": args.k,
+                       "store_on_disk_mb": round(store_mb, 2), "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
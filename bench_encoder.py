@@ -0,0 +1,97 @@
+"""
+Benchmark the encoder backends: load time, single-query latency (p50/p99)
+and batched throughput, on the CPU.
+
+Single queries are short texts encoded one call at a time, like /ask does
+without batching. Throughput encodes record texts from data/ at each
+--batch-sizes value. Every backend is warmed up with a few encodes first.
+
+Usage:
+    python bench_encoder.py
+    python bench_encoder.py --backends torch,onnx-int8 --threads 2 --json encoder.json
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+import numpy as np
+
+from data_loader import DataLoader
+from encoders import load_encoder, ENCODER_BACKENDS
+
+
+def limit_threads(threads: int):
+    """Give torch the same thread budget ONNX Runtime gets"""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--model", default="paraphrase-MiniLM-L3-v2")
+    parser.add_argument("--backends", default=",".join(ENCODER_BACKENDS))
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--texts", type=int, default=2000, help="Record texts encoded per throughput run")
+    parser.add_argument("--batch-sizes", default="8,32,128")
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0 = library default)")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data)
+    corpus = [loader.prepare_content(r) for r in loader.load_json_files()]
+    rng = random.Random(0)
+    texts = [rng.choice(corpus) for _ in range(args.texts)]
+    queries = [" ".join(rng.choice(corpus).split()[:8]) for _ in range(args.queries)]
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+    if args.threads:
+        limit_threads(args.threads)
+
+    results = []
+    for backend in args.backends.split(","):
+        started = time.perf_counter()
+        encoder = load_encoder(args.model, backend, threads=args.threads or None)
+        load_seconds = time.perf_counter() - started
+        encoder.encode(queries[:8])
+
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            encoder.encode([query])
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        throughput = {}
+        for batch_size in batch_sizes:
+            started = time.perf_counter()
+            encoder.encode(texts, batch_size=batch_size)
+            throughput[batch_size] = len(texts) / (time.perf_counter() - started)
+
+        model_path = getattr(encoder, "model_path", None)
+        result = {
+            "backend": backend,
+            "load_seconds": round(load_seconds, 2),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "texts_per_sec": {str(size): round(rate, 1) for size, rate in throughput.items()},
+            "model_mb": round(os.path.getsize(model_path) / 1024 / 1024, 1) if model_path else None,
+        }
+        results.append(result)
+        rates = "  ".join(f"b{size} {rate:,.0f}/s" for size, rate in throughput.items())
+        print(f"{backend:<10} load {load_seconds:5.1f}s  single p50 {result['p50_ms']:.2f}ms  "
+              f"p99 {result['p99_ms']:.2f}ms  {rates}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"model": args.model, "threads": args.threads, "queries": len(queries),
+                       "texts": len(texts), "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
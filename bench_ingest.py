@@ -0,0 +1,79 @@
+"""
+Benchmark database ingestion: one insert_record commit per row vs insert_records.
+
+The per-row baseline is slow, so it runs on a smaller sample and the paths
+are compared by records/sec. The baseline is measured both with the original
+rollback journal (synchronous=FULL) and with the WAL settings Database now
+uses. Synthetic record generation is timed separately and excluded.
+
+Usage: python bench_ingest.py [--records 1000000] [--baseline-records 20000] [--batch-size 5000]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from database import Database
+from data_loader import DataLoader
+from synthetic_data import generate_records
+
+
+def prepared_rows(count: int):
+    loader = DataLoader()
+    for record in generate_records(count):
+        yield record['id'], loader.prepare_content(record), json.dumps(record)
+
+
+def fresh_db(folder: str, name: str, legacy_journal: bool = False) -> Database:
+    db = Database(os.path.join(folder, name))
+    db.connect()
+    if legacy_journal:
+        # SQLite defaults, as used before the WAL change
+        db.conn.execute("PRAGMA journal_mode=DELETE")
+        db.conn.execute("PRAGMA synchronous=FULL")
+    db.create_table()
+    return db
+
+
+def per_row_rate(folder: str, name: str, rows, legacy_journal: bool) -> float:
+    db = fresh_db(folder, name, legacy_journal)
+    started = time.perf_counter()
+    for record_id, content, metadata in rows:
+        db.insert_record(record_id, content, metadata)
+    rate = len(rows) / (time.perf_counter() - started)
+    db.close()
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--baseline-records", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+
+    rows = list(prepared_rows(args.baseline_records))
+    legacy_rate = per_row_rate(folder, "per_row_legacy.db", rows, legacy_journal=True)
+    wal_rate = per_row_rate(folder, "per_row_wal.db", rows, legacy_journal=False)
+    print(f"insert_record, rollback journal: {legacy_rate:,.0f} records/sec on {len(rows):,} records")
+    print(f"insert_record, WAL:              {wal_rate:,.0f} records/sec on {len(rows):,} records")
+
+    started = time.perf_counter()
+    rows = list(prepared_rows(args.records))
+    print(f"Generated {len(rows):,} synthetic records in {time.perf_counter() - started:.1f}s (not counted)")
+
+    db = fresh_db(folder, "bulk.db")
+    started = time.perf_counter()
+    inserted = db.insert_records(rows, batch_size=args.batch_size)
+    bulk_rate = len(rows) / (time.perf_counter() - started)
+    db.close()
+    print(f"insert_records (batched):        {bulk_rate:,.0f} records/sec on {inserted:,} records")
+    print(f"Speedup vs rollback journal: {bulk_rate / legacy_rate:.1f}x, vs WAL per-row: {bulk_rate / wal_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark the indexed EntityMatcher against the original linear thefuzz scan.
+
+Builds synthetic name lists (seeded with the real names from data/*.json),
+runs the same queries through both matchers and reports agreement and
+per-query latency.
+
+Usage: python bench_matcher.py [--sizes 1000 100000 1000000] [--queries 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import time
+
+from thefuzz import process, fuzz
+
+from matcher import EntityMatcher
+
+SYLLABLES = ["an", "bel", "cor", "da", "el", "fin", "gar", "hal", "is", "jo", "kar", "lin",
+             "mar", "nor", "os", "pet", "quin", "ros", "sam", "tor", "ul", "ven", "wil", "yan", "zed"]
+
+QUERY_TEMPLATES = ["who is {}", "tell me about {}", "{} education", "what did {} build", "{}"]
+
+
+def load_real_names(data_folder: str = "data"):
+    names = []
+    for filename in sorted(os.listdir(data_folder)):
+        if not filename.endswith('.json'):
+            continue
+        with open(os.path.join(data_folder, filename), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get('data'), list):
+            data = data['data']
+        for idx, record in enumerate(data if isinstance(data, list) else [data]):
+            record_id = record.get('id', f"{filename}_{idx}")
+            for field in ('name', 'title'):
+                if record.get(field):
+                    names.append((record[field], record_id))
+    return names
+
+
+def synthetic_name(rng: random.Random) -> str:
+    words = []
+    for _ in range(rng.choice([2, 2, 3])):
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+        words.append(word.capitalize())
+    return " ".join(words)
+
+
+def add_typo(rng: random.Random, text: str) -> str:
+    if len(text) < 4:
+        return text
+    i = rng.randrange(1, len(text) - 1)
+    op = rng.choice(["drop", "swap", "replace"])
+    if op == "drop":
+        return text[:i] + text[i + 1:]
+    if op == "swap":
+        return text[:i - 1] + text[i] + text[i - 1] + text[i + 1:]
+    return text[:i] + rng.choice(string.ascii_lowercase) + text[i + 1:]
+
+
+def build_names(size: int, real_names, rng: random.Random):
+    names = list(real_names[:size])
+    while len(names) < size:
+        names.append((synthetic_name(rng), f"synthetic_{len(names)}"))
+    return names
+
+
+def build_queries(names, count: int, rng: random.Random):
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.7:
+            name = rng.choice(names)[0]
+            if rng.random() < 0.5:
+                name = add_typo(rng, name)
+            queries.append(rng.choice(QUERY_TEMPLATES).format(name))
+        else:
+            # Questions that should not hit any entity
+            queries.append(rng.choice(["how does garbage collection work", "what is a closure",
+                                       "explain list slicing", "difference between jdk and jre"]))
+    return queries
+
+
+def linear_match(query, names, names_only):
+    """The original retrieve_relevant_documents matching logic"""
+    match_name, score = process.extractOne(query, names_only, scorer=fuzz.token_set_ratio)
+    if score > 80:
+        for name, rid in names:
+            if name == match_name:
+                return rid, score
+    return None
+
+
+def run(size: int, query_count: int, seed: int):
+    rng = random.Random(seed)
+    names = build_names(size, load_real_names(), rng)
+    queries = build_queries(names, query_count, rng)
+    names_only = [n[0] for n in names]
+
+    started = time.perf_counter()
+    matcher = EntityMatcher(names)
+    build_seconds = time.perf_counter() - started
+
+    agree = 0
+    linear_total = indexed_total = 0.0
+    mismatches = []
+    for query in queries:
+        t0 = time.perf_counter()
+        expected = linear_match(query, names, names_only)
+        t1 = time.perf_counter()
+        got = matcher.match(query)
+        t2 = time.perf_counter()
+
+        linear_total += t1 - t0
+        indexed_total += t2 - t1
+
+        got = (got[0], got[2]) if got else None
+        if (expected is None) == (got is None) and (expected is None or expected[0] == got[0]):
+            agree += 1
+        elif len(mismatches) < 5:
+            mismatches.append((query, expected, got))
+
+    print(f"\n=== {size:,} names, {len(queries)} queries ===")
+    print(f"Index build:      {build_seconds:.2f} s")
+    print(f"Linear thefuzz:   {linear_total / len(queries) * 1000:.2f} ms/query")
+    print(f"EntityMatcher:    {indexed_total / len(queries) * 1000:.3f} ms/query")
+    print(f"Agreement:        {agree}/{len(queries)} ({agree / len(queries):.1%})")
+    for query, expected, got in mismatches:
+        print(f"  differs: {query!r} linear={expected} indexed={got}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        # The linear scan is slow at 1M names, so sample fewer queries there
+        count = args.queries if size <= 100000 else max(20, args.queries // 10)
+        run(size, count, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Measure per-request record materialization cost: SQLite fetch + JSON decoding.
+
+Compares the original path (one get_record_by_id and json.loads per hit)
+with the bulk get_records_by_ids path, cold and with the parsed-record cache,
+and with the resident RecordStore (including its resident-set size).
+
+Usage: python bench_records.py [--db knowledge_v2.db] [--requests 2000] [--hits 5] [--store-mb 256]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+from database import Database
+from cache import LRUCache
+from record_store import RecordStore
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (Linux), or 0 if unknown"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def per_id_path(db, ids):
+    sqlite_s = json_s = 0.0
+    for record_id in ids:
+        t0 = time.perf_counter()
+        record = db.get_record_by_id(record_id)
+        t1 = time.perf_counter()
+        if record:
+            json.loads(record['metadata'])
+        sqlite_s += t1 - t0
+        json_s += time.perf_counter() - t1
+    return sqlite_s, json_s
+
+
+def bulk_path(db, ids, cache=None):
+    sqlite_s = json_s = 0.0
+    missing = [rid for rid in ids if cache is None or cache.get(rid) is None]
+    if missing:
+        t0 = time.perf_counter()
+        records = db.get_records_by_ids(missing)
+        t1 = time.perf_counter()
+        for record in records:
+            parsed = (record['content'], json.loads(record['metadata']))
+            if cache is not None:
+                cache.put(record['id'], parsed)
+        sqlite_s = t1 - t0
+        json_s = time.perf_counter() - t1
+    return sqlite_s, json_s
+
+
+def store_path(store, ids):
+    t0 = time.perf_counter()
+    for record_id in ids:
+        stored = store.get(record_id)
+        if stored is not None:
+            stored[1].get('name')
+    return time.perf_counter() - t0, 0.0
+
+
+def report(label, samples):
+    """Print fetch (SQLite or in-memory lookup) and JSON decode times per request"""
+    fetch_ms = sorted(f * 1000 for f, _ in samples)
+    decode_ms = sorted(d * 1000 for _, d in samples)
+    n = len(samples)
+    print(f"{label:<28} fetch mean {sum(fetch_ms) / n:.4f} ms  p99 {fetch_ms[int(n * 0.99)]:.4f} ms   "
+          f"decode mean {sum(decode_ms) / n:.4f} ms  p99 {decode_ms[int(n * 0.99)]:.4f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="knowledge_v2.db")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--hits", type=int, default=5)
+    parser.add_argument("--store-mb", type=float, default=256)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    db.connect()
+    all_ids = [r['id'] for r in db.get_all_records()]
+    if not all_ids:
+        print("Database is empty")
+        return
+
+    # Skewed traffic: most requests touch a small set of popular records
+    rng = random.Random(args.seed)
+    popular = all_ids[:max(1, len(all_ids) // 10)]
+    requests = [
+        [rng.choice(popular if rng.random() < 0.8 else all_ids) for _ in range(args.hits)]
+        for _ in range(args.requests)
+    ]
+
+    print(f"{len(all_ids)} records, {args.requests} requests x {args.hits} hits")
+    report("per-id + json.loads", [per_id_path(db, ids) for ids in requests])
+    report("bulk IN (...)", [bulk_path(db, ids) for ids in requests])
+    cache = LRUCache(4096)
+    report("bulk + parsed-record cache", [bulk_path(db, ids, cache) for ids in requests])
+    print(f"cache: {cache.stats()}")
+
+    rss_before = current_rss()
+    store = RecordStore(int(args.store_mb * 1024 * 1024))
+    store.load(db, all_ids)
+    rss_after = current_rss()
+    report("resident RecordStore", [store_path(store, ids) for ids in requests])
+    print(f"store: {store.stats()}")
+    print(f"RSS growth from loading the store: {(rss_after - rss_before) / 1024 / 1024:.1f} MB")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
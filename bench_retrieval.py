@@ -0,0 +1,117 @@
+"""
+Compare the retrieval modes (vector, hybrid, lexical-first): latency and
+hit rate per retrieval path.
+
+Records from data/ (or --synthetic N generated ones) are loaded into a
+temporary database and indexed. Each query is made from one sampled record:
+either a few of its keywords ("keyword" queries, like "garbage collection
+JVM") or its opening words ("prefix" queries). A query is a top-1 hit when
+that record ranks first, and a hit@k when it is among the first k.
+
+Usage:
+    python bench_retrieval.py                          # real corpus, real model
+    python bench_retrieval.py --stub-encoder           # real corpus, HashingEncoder
+    python bench_retrieval.py --synthetic 20000 --json retrieval.json
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from data_loader import DataLoader
+from database import Database
+from embedding import EmbeddingManager
+from encoders import STUB_MODEL
+from lexical import query_terms
+from search import RAGSearch, RETRIEVAL_MODES
+from synthetic_data import generate_records
+
+
+def make_queries(db: Database, count: int, seed: int = 0):
+    """(kind, query, source record id) triples"""
+    rng = random.Random(seed)
+    records = db.get_all_records()
+    queries = []
+    for record in rng.sample(records, min(count, len(records))):
+        terms = [t for t in query_terms(record['content']) if len(t) > 3]
+        if len(terms) >= 3:
+            queries.append(("keyword", " ".join(rng.sample(terms, 3)), record['id']))
+        queries.append(("prefix", " ".join(record['content'].split()[:8]), record['id']))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic records instead of --data")
+    parser.add_argument("--stub-encoder", action="store_true", help="Use HashingEncoder instead of the model")
+    parser.add_argument("--model", default="paraphrase-MiniLM-L3-v2")
+    parser.add_argument("--queries", type=int, default=500, help="Records to build queries from")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    db = Database(os.path.join(folder, "bench.db"))
+    db.connect()
+    db.create_table()
+    loader = DataLoader(args.data)
+    records = generate_records(args.synthetic) if args.synthetic else loader.load_json_files()
+    db.insert_records((r['id'], loader.prepare_content(r), json.dumps(r)) for r in records)
+
+    model = STUB_MODEL if args.stub_encoder or args.synthetic else args.model
+    embedding_manager = EmbeddingManager(model_name=model)
+    embedding_manager.build_index_from_database(db)
+    queries = make_queries(db, args.queries)
+    print(f"{db.count_records():,} records, {len(queries)} queries, encoder {model}\n")
+
+    results = []
+    for mode in RETRIEVAL_MODES:
+        search = RAGSearch(db, embedding_manager, retrieval_mode=mode)
+        search.answer_cache.clear()
+        embedding_manager.query_cache.clear()
+        by_path = {}
+        for kind, query, source in queries:
+            started = time.perf_counter()
+            path, hits = search._search(query, args.k)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            ids = [record_id for record_id, _ in hits]
+            for key in (path, f"{path}/{kind}"):
+                entry = by_path.setdefault(key, {"latency": [], "top1": 0, "hit_at_k": 0})
+                entry["latency"].append(elapsed_ms)
+                entry["top1"] += bool(ids) and ids[0] == source
+                entry["hit_at_k"] += source in ids
+
+        for path, entry in sorted(by_path.items()):
+            n = len(entry["latency"])
+            row = {
+                "mode": mode,
+                "path": path,
+                "queries": n,
+                "share": round(n / len(queries), 4),
+                "p50_ms": round(float(np.percentile(entry["latency"], 50)), 3),
+                "p99_ms": round(float(np.percentile(entry["latency"], 99)), 3),
+                "top1_hit_rate": round(entry["top1"] / n, 4),
+                f"hit_rate_at_{args.k}": round(entry["hit_at_k"] / n, 4),
+            }
+            results.append(row)
+            print(f"{mode:<14} {path:<18} {n:5d} queries ({row['share']:6.1%})  p50 {row['p50_ms']:7.3f}ms  "
+                  f"p99 {row['p99_ms']:7.3f}ms  top-1 {row['top1_hit_rate']:.3f}  "
+                  f"hit@{args.k} {row[f'hit_rate_at_{args.k}']:.3f}")
+        print()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"records": db.count_records(), "queries": len(queries), "encoder": model,
+                       "k": args.k, "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark index start-up: the pickle loader (faiss.read_index plus a pickled
+list of record ids) vs the memory-mapped loader (read-only mapped index plus
+the id table from id_table.py).
+
+A synthetic index of --records random vectors is written in both formats.
+Then --workers processes load it at the same time, like uvicorn workers,
+and each one runs a few searches. Every worker reports its load time and,
+once all of them are up, its RSS, PSS (RSS with shared pages split between
+the processes mapping them) and private memory.
+
+The page cache is warm after the first run. Times are "cold process", not
+"cold disk".
+
+The pickle loader always uses a positional flat index, as older versions did.
+
+Usage: python bench_startup.py [--records 1000000] [--workers 4] [--index-type flat]
+"""
+
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+
+def memory_stats():
+    """RSS, PSS and private memory of this process in MB (from /proc/self/smaps_rollup)"""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(values.get("Rss", 0), 1),
+        "pss_mb": round(values.get("Pss", 0), 1),
+        "private_mb": round(values.get("Private_Clean", 0) + values.get("Private_Dirty", 0), 1),
+    }
+
+
+def child(mode: str, folder: str, index_type: str, searches: int):
+    """One worker: load, search, report load time, wait for the go signal, report memory"""
+    from id_table import IdTable
+    from vector_index import mmap_io_flags
+
+    baseline = memory_stats()
+    started = time.perf_counter()
+    if mode == "pickle":
+        index = faiss.read_index(os.path.join(folder, "legacy_index.bin"))
+        with open(os.path.join(folder, "id_mapping.pkl"), "rb") as f:
+            id_mapping = pickle.load(f)
+        lookup = id_mapping.__getitem__
+    else:
+        index = faiss.read_index(os.path.join(folder, "index.bin"), mmap_io_flags(index_type))
+        id_mapping = IdTable(os.path.join(folder, "id_table.bin"))
+        lookup = id_mapping.__getitem__
+    load_seconds = time.perf_counter() - started
+
+    rng = np.random.default_rng(os.getpid())
+    queries = rng.standard_normal((searches, index.d)).astype('float32')
+    faiss.normalize_L2(queries)
+    for query in queries:
+        _, labels = index.search(query.reshape(1, -1), 5)
+        [lookup(int(label)) for label in labels[0] if label >= 0]
+
+    print("ready", flush=True)
+    sys.stdin.readline()  # Wait until every worker is loaded before measuring sharing
+    stats = memory_stats()
+    stats["load_seconds"] = round(load_seconds, 4)
+    stats["baseline_rss_mb"] = baseline["rss_mb"]
+    print(json.dumps(stats), flush=True)
+
+
+def write_corpus(folder: str, records: int, dimension: int, index_type: str):
+    from embedding import record_label
+    from id_table import write_id_table
+    from vector_index import create_index
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((records, dimension)).astype('float32')
+    faiss.normalize_L2(vectors)
+    ids = [f"SYN_{i:07d}" for i in range(records)]
+
+    # Pickle format: positional flat index plus a pickled list of ids
+    positional = faiss.IndexFlatIP(dimension)
+    positional.add(vectors)
+    faiss.write_index(positional, os.path.join(folder, "legacy_index.bin"))
+    with open(os.path.join(folder, "id_mapping.pkl"), "wb") as f:
+        pickle.dump(ids, f)
+    del positional
+
+    # Mapped format: labelled index of the requested type plus an id table
+    labels = np.array([record_label(rid) for rid in ids], dtype='int64')
+    index, _ = create_index(index_type, dimension, {}, vectors)
+    index.add_with_ids(vectors, labels)
+    faiss.write_index(index, os.path.join(folder, "index.bin"))
+    write_id_table(os.path.join(folder, "id_table.bin"), dict(zip(labels.tolist(), ids)), {})
+
+
+def run_workers(mode: str, folder: str, workers: int, index_type: str, searches: int):
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--child", mode, "--folder", folder,
+             "--index-type", index_type, "--searches", str(searches)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        if proc.stdout.readline().strip() != "ready":
+            raise SystemExit(f"{mode} worker failed to start")
+    for proc in procs:
+        proc.stdin.write("go\n")
+        proc.stdin.flush()
+    results = [json.loads(proc.stdout.readline()) for proc in procs]
+    for proc in procs:
+        proc.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--searches", type=int, default=20)
+    parser.add_argument("--index-type", default="flat")
+    parser.add_argument("--folder")
+    parser.add_argument("--child", choices=["pickle", "mmap"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.folder, args.index_type, args.searches)
+        return
+
+    folder = args.folder or tempfile.mkdtemp()
+    os.makedirs(folder, exist_ok=True)
+    started = time.perf_counter()
+    write_corpus(folder, args.records, args.dimension, args.index_type)
+    print(f"Wrote {args.records:,} vectors ({args.index_type}) to {folder} in {time.perf_counter() - started:.1f}s")
+
+    for mode in ("pickle", "mmap"):
+        results = run_workers(mode, folder, args.workers, args.index_type, args.searches)
+        load = [r["load_seconds"] for r in results]
+        print(f"\n{mode} loader, {args.workers} workers:")
+        print(f"  load time   mean {np.mean(load):.3f}s  max {max(load):.3f}s")
+        for key, label in (("rss_mb", "RSS"), ("pss_mb", "PSS"), ("private_mb", "private")):
+            values = [r[key] for r in results]
+            print(f"  {label:<10}  mean {np.mean(values):8.1f}MB  total {sum(values):8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
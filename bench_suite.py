@@ -0,0 +1,271 @@
+"""
+Benchmark suite: ingestion, embedding, indexing and query latency on synthetic corpora.
+
+For each corpus size a synthetic corpus shaped like data/*.json (personalities
+and concepts, see synthetic_data.py) is written to JSON files, then:
+
+  load       DataLoader.load_into_database throughput
+  embed      EmbeddingManager.embed_missing (encode and store every record)
+  index      build_index_from_database, then the saved index size on disk
+  search     RAGSearch start-up (entity name index)
+  query      answer_question p50/p95/p99, once cold (answer cache empty) and
+             once warm (same questions again), with the mean time per stage
+
+Each size runs in its own process so its peak memory is measured on its own.
+A size the machine cannot hold is reported as failed (with the exit code);
+1M records peak at about 5 GB of RAM, so they are not in the default sizes.
+The default encoder is the deterministic HashingEncoder, so the suite runs
+offline; --model uses a real model instead. Results are written as JSON, and
+--compare prints the change against an earlier results file.
+
+Usage:
+    python bench_suite.py                                # 1k and 100k records
+    python bench_suite.py --sizes 1000000                # 1M records (about 5 GB of RAM)
+    python bench_suite.py --sizes 1000,100000 --json before.json
+    python bench_suite.py --sizes 1000,100000 --compare before.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from encoders import STUB_MODEL
+
+PERSON_TEMPLATES = ["who is {name}", "{name} education", "what did {name} create", "{name} career"]
+CONCEPT_TEMPLATES = ["what is {topic}", "explain {topic} in {language}", "{title}"]
+GENERIC_QUESTIONS = ["how does garbage collection work", "difference between list and tuple", "who founded a company"]
+
+# Metrics compared by --compare, and whether a larger value is better
+COMPARED_METRICS = {
+    "load_records_per_sec": True,
+    "embed_records_per_sec": True,
+    "index_build_seconds": False,
+    "index_file_bytes": False,
+    "search_init_seconds": False,
+    "cold_p50_ms": False,
+    "cold_p95_ms": False,
+    "cold_p99_ms": False,
+    "warm_p50_ms": False,
+    "warm_p99_ms": False,
+    "peak_rss_mb": False,
+}
+
+
+def rss_mb() -> float:
+    """Current resident set size, or 0 where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return 0.0
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024  # Bytes on macOS, KiB on Linux
+
+
+def make_questions(size: int, count: int, seed: int = 0):
+    """Questions about records sampled from the corpus generate_records(size) yields"""
+    from synthetic_data import generate_records
+
+    rng = random.Random(seed)
+    picked = set(rng.sample(range(size), min(count, size)))
+    questions = list(GENERIC_QUESTIONS)
+    for idx, record in enumerate(generate_records(size)):
+        if idx not in picked:
+            continue
+        if 'name' in record:
+            questions.append(rng.choice(PERSON_TEMPLATES).format(name=record['name']))
+        else:
+            template = rng.choice(CONCEPT_TEMPLATES)
+            questions.append(template.format(
+                topic=record['concept'].lower(), language=record['category'], title=record['title']
+            ))
+    rng.shuffle(questions)
+    return questions
+
+
+def percentiles(latencies_ms, prefix: str):
+    values = np.percentile(latencies_ms, [50, 95, 99])
+    return {f"{prefix}_{name}_ms": round(float(v), 3) for name, v in zip(("p50", "p95", "p99"), values)}
+
+
+def run_size(size: int, options: dict) -> dict:
+    """Benchmark one corpus size (runs in a child process)"""
+    from data_loader import DataLoader
+    from database import Database
+    from embedding import EmbeddingManager
+    from search import RAGSearch
+    from synthetic_data import write_corpus
+
+    folder = tempfile.mkdtemp(prefix=f"bench_suite_{size}_")
+    result = {"records": size, "rss_start_mb": round(rss_mb(), 1)}
+    try:
+        started = time.perf_counter()
+        write_corpus(os.path.join(folder, "data"), size)
+        result["generate_seconds"] = round(time.perf_counter() - started, 3)  # Not part of any metric below
+
+        db = Database(os.path.join(folder, "bench.db"))
+        db.connect()
+        db.create_table()
+        started = time.perf_counter()
+        loaded = DataLoader(os.path.join(folder, "data")).load_into_database(db)
+        seconds = time.perf_counter() - started
+        result["load_seconds"] = round(seconds, 3)
+        result["load_records_per_sec"] = round(loaded / seconds, 1)
+
+        embedding_manager = EmbeddingManager(
+            model_name=options["model"],
+            index_type=options["index_type"],
+            embed_workers=options["embed_workers"]
+        )
+        started = time.perf_counter()
+        embedded = embedding_manager.embed_missing(db)
+        seconds = time.perf_counter() - started
+        result["embed_seconds"] = round(seconds, 3)
+        result["embed_records_per_sec"] = round(embedded / seconds, 1) if seconds else 0.0
+
+        started = time.perf_counter()
+        embedding_manager.build_index_from_database(db)
+        result["index_build_seconds"] = round(time.perf_counter() - started, 3)
+        index_path = os.path.join(folder, "index.bin")
+        id_table_path = os.path.join(folder, "id_table.bin")
+        embedding_manager.save_index(index_path, id_table_path)
+        result["index_file_bytes"] = os.path.getsize(index_path) + os.path.getsize(id_table_path)
+        result["index_memory_bytes"] = embedding_manager.index_stats().get("memory_bytes", 0)
+        result["rss_after_index_mb"] = round(rss_mb(), 1)
+
+        started = time.perf_counter()
+        search = RAGSearch(db, embedding_manager, retrieval_mode=options["retrieval_mode"])
+        result["search_init_seconds"] = round(time.perf_counter() - started, 3)
+
+        questions = make_questions(size, options["queries"])
+        result["queries"] = len(questions)
+        for phase in ("cold", "warm"):
+            latencies = []
+            for i, question in enumerate(questions):
+                started = time.perf_counter()
+                search.answer_question(question, session_id=f"bench-{i}")
+                latencies.append((time.perf_counter() - started) * 1000)
+            result.update(percentiles(latencies, phase))
+            if phase == "cold":
+                stages = dict(search.stage_times.snapshot(), **embedding_manager.stage_times.snapshot())
+                result["cold_stage_mean_ms"] = {stage: s["mean"] for stage, s in stages.items()}
+
+        result["rss_end_mb"] = round(rss_mb(), 1)
+        result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        db.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return result
+
+
+def _run_in_child(size: int, options: dict, conn):
+    conn.send(run_size(size, options))
+    conn.close()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(previous: dict, current: dict):
+    """Print each compared metric of both runs, per corpus size"""
+    before = {r["records"]: r for r in previous["results"]}
+    print(f"\nChange from {previous.get('commit', '?')} to {current['commit']} (+ is better):")
+    for result in current["results"]:
+        old = before.get(result["records"])
+        if old is None:
+            continue
+        print(f"\n{result['records']:,} records")
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if metric not in old or metric not in result or not old[metric]:
+                continue
+            change = (result[metric] - old[metric]) / old[metric]
+            better = change if higher_is_better else -change
+            print(f"   {metric:<24} {old[metric]:>14,.3f} -> {result[metric]:>14,.3f}   {better:+7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000", help="Comma-separated corpus sizes")
+    parser.add_argument("--model", default=STUB_MODEL, help=f"Embedding model ({STUB_MODEL} = HashingEncoder)")
+    parser.add_argument("--index-type", default="flat")
+    parser.add_argument("--retrieval-mode", default="vector")
+    parser.add_argument("--embed-workers", type=int, default=1)
+    parser.add_argument("--queries", type=int, default=1000, help="Records to ask about per size")
+    parser.add_argument("--json", help="Results file (default: bench_suite_<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    options = {
+        "model": args.model,
+        "index_type": args.index_type,
+        "retrieval_mode": args.retrieval_mode,
+        "embed_workers": args.embed_workers,
+        "queries": args.queries,
+    }
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "options": options,
+        "results": [],
+    }
+
+    # A fresh process per size: peak memory of one size must not include the previous ones
+    context = multiprocessing.get_context("spawn")
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"\n=== {size:,} records ===")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_run_in_child, args=(size, options, sender))
+        process.start()
+        sender.close()
+        try:
+            result = receiver.recv()
+        except EOFError:
+            result = None
+        process.join()
+        if result is None:
+            # Killed (usually out of memory) or failed with a traceback above
+            print(f"{size:,} records failed: exit code {process.exitcode}")
+            report["results"].append({"records": size, "error": f"exit code {process.exitcode}"})
+            continue
+        report["results"].append(result)
+        print(f"load {result['load_records_per_sec']:,.0f} rec/s | embed {result['embed_records_per_sec']:,.0f} rec/s"
+              f" | index {result['index_build_seconds']:.2f}s, {result['index_file_bytes'] / 2**20:.1f} MB"
+              f" | cold p50/p95/p99 {result['cold_p50_ms']:.2f}/{result['cold_p95_ms']:.2f}/{result['cold_p99_ms']:.2f} ms"
+              f" | warm p99 {result['warm_p99_ms']:.3f} ms | peak RSS {result['peak_rss_mb']:,.0f} MB")
+
+    path = args.json or f"bench_suite_{commit}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -71,7 +71,7 @@ class DataLoader:
         
         return ' '.join(content_parts).strip()
     
-    def load_into_database(self, db: Database) -> int:
+    def load_into_database(self, db: Database, batch_size: int = 5000) -> int:
         """Load JSON data into database"""
         records = self.load_json_files()
         
@@ -80,6 +80,7 @@ class DataLoader:
             return 0
         
         loaded_count = 0
+        rows = []
         for idx, record in enumerate(records):
             # Generate ID if not present
             record_id = record.get('id', f"record_{idx}")
@@ -90,8 +91,11 @@ class DataLoader:
             if content:
                 # Store original record as metadata
                 metadata = json.dumps(record)
-                if db.insert_record(record_id, content, metadata):
-                    loaded_count += 1
+                rows.append((record_id, content, metadata))
+                loaded_count += 1
+        
+        # One transaction per batch instead of one commit per record
+        db.insert_records(rows, batch_size=batch_size)
         
         print(f"Successfully loaded {loaded_count} records into database")
         return loaded_count
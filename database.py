@@ -1,68 +1,468 @@
 import sqlite3
 import os
-from typing import List, Dict, Any
+import hashlib
+import threading
+import time
+from typing import List, Dict, Any, Callable, Iterable, Tuple
+
+# Stay well below SQLite's limit on bound parameters per statement
+MAX_IN_PARAMS = 500
+
+# Keeps knowledge_fts in step with row-by-row inserts; bulk loads drop it and index the new rows at the end
+LEXICAL_INSERT_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS knowledge_fts_insert AFTER INSERT ON knowledge BEGIN
+        INSERT INTO knowledge_fts (rowid, content) VALUES (new.rowid, new.content);
+    END
+"""
+
+
+def content_hash(content: str) -> str:
+    """Fingerprint of a record's searchable content, used to detect changes"""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
 
 class Database:
-    def __init__(self, db_path: str = "knowledge.db"):
+    """SQLite access with one writer connection and per-thread read-only readers.
+
+    The database runs in WAL mode so readers never block the writer (or each
+    other). Every thread gets its own read-only connection on first use;
+    all writes go through the single writer connection under a lock.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "knowledge.db",
+        cache_size_kb: int = 16 * 1024,
+        mmap_size: int = 256 * 1024 * 1024
+    ):
         self.db_path = db_path
-        self.conn = None
-        self.cursor = None
-        
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.conn = None    # Writer connection
+        self.cursor = None  # Writer cursor
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers = []  # Every reader connection, so close() can reach them
+        self._readers_lock = threading.Lock()
+        self.version = 0  # Bumped on every write so caches can detect changes
+        self._stamp = None  # (version, row count, highest rowid), see _row_stamp
+        self._listeners = []  # Callbacks receiving the id of each changed record
+
     def connect(self):
         """Connect to SQLite database"""
         self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.cursor = self.conn.cursor()
-        
+        if self.db_path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, far fewer fsyncs
+        self._apply_pragmas(self.conn)
+
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute("PRAGMA busy_timeout=5000")
+
+    def _reader(self) -> sqlite3.Connection:
+        """Read-only connection owned by the calling thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        # An in-memory database only exists on the writer connection
+        if self.db_path == ":memory:":
+            return self.conn
+
+        path = os.path.abspath(self.db_path)
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._apply_pragmas(conn)
+        conn.execute("PRAGMA query_only=1")
+        self._local.conn = conn
+        with self._readers_lock:
+            self._readers.append(conn)
+        return conn
+
+    def _read(self, sql: str, params=()) -> List[tuple]:
+        """Run a SELECT on this thread's reader and return every row"""
+        if self.db_path == ":memory:":
+            with self._write_lock:
+                return self.conn.execute(sql, params).fetchall()
+        return self._reader().execute(sql, params).fetchall()
+
     def create_table(self):
         """Create knowledge table if not exists"""
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS knowledge (
-                id TEXT PRIMARY KEY,
-                content TEXT NOT NULL,
-                metadata TEXT
-            )
+        with self._write_lock:
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS knowledge (
+                    id TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    metadata TEXT,
+                    content_hash TEXT
+                )
+            """)
+            # Stored embeddings per record and model, tagged with the content hash they were built from
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    id TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (id, model)
+                )
+            """)
+            self.conn.commit()
+            self._migrate_content_hash()
+            self._create_lexical_index()
+
+    def _create_lexical_index(self):
+        """FTS5 index over knowledge.content, kept in step with the table by triggers"""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'knowledge_fts'"
+        ).fetchone()
+        if exists:
+            self._repair_lexical_index()
+            return
+
+        # External content: the index stores no copy of the text, only knowledge rowids
+        self.conn.executescript("""
+            CREATE VIRTUAL TABLE knowledge_fts USING fts5(
+                content, content='knowledge', content_rowid='rowid', tokenize='porter unicode61'
+            );
+            CREATE TRIGGER knowledge_fts_delete AFTER DELETE ON knowledge BEGIN
+                INSERT INTO knowledge_fts (knowledge_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+            END;
+            CREATE TRIGGER knowledge_fts_update AFTER UPDATE OF content ON knowledge BEGIN
+                INSERT INTO knowledge_fts (knowledge_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+                INSERT INTO knowledge_fts (rowid, content) VALUES (new.rowid, new.content);
+            END;
         """)
+        self.conn.execute(LEXICAL_INSERT_TRIGGER)
+        if self.conn.execute("SELECT EXISTS (SELECT 1 FROM knowledge)").fetchone()[0]:
+            self.rebuild_lexical_index()
+        self.conn.commit()
+
+    def _repair_lexical_index(self):
+        """Index rows a bulk load left out and restore the insert trigger, if a crash cut the load short"""
+        # knowledge_fts itself reads through to knowledge; its docsize table has one row per indexed rowid
+        indexed_up_to = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM knowledge_fts_docsize").fetchone()[0]
+        missing = self.conn.execute(
+            "INSERT INTO knowledge_fts (rowid, content) SELECT rowid, content FROM knowledge WHERE rowid > ?",
+            (indexed_up_to,)
+        ).rowcount
+        if missing:
+            print(f"Indexed {missing} records missing from the lexical index")
+        self.conn.execute(LEXICAL_INSERT_TRIGGER)
         self.conn.commit()
-        
+
+    def rebuild_lexical_index(self):
+        """Re-index every record (needed after a VACUUM, which may renumber rowids)"""
+        started = time.perf_counter()
+        with self._write_lock:
+            self.conn.execute("INSERT INTO knowledge_fts (knowledge_fts) VALUES ('rebuild')")
+            self.conn.commit()
+        print(f"Built lexical index in {time.perf_counter() - started:.2f}s")
+
+    def _migrate_content_hash(self):
+        """Add and backfill the content_hash column on databases created before it existed"""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(knowledge)")]
+        if "content_hash" not in columns:
+            print("Adding content_hash column to knowledge table...")
+            self.conn.execute("ALTER TABLE knowledge ADD COLUMN content_hash TEXT")
+
+        rows = self.conn.execute("SELECT id, content FROM knowledge WHERE content_hash IS NULL").fetchall()
+        if rows:
+            self.conn.executemany(
+                "UPDATE knowledge SET content_hash = ? WHERE id = ?",
+                ((content_hash(content), record_id) for record_id, content in rows)
+            )
+            print(f"Backfilled content hashes for {len(rows)} records")
+        self.conn.commit()
+
     def insert_record(self, record_id: str, content: str, metadata: str = ""):
         """Insert a record, ignore if id already exists"""
         try:
-            self.cursor.execute(
-                "INSERT OR IGNORE INTO knowledge (id, content, metadata) VALUES (?, ?, ?)",
-                (record_id, content, metadata)
-            )
-            self.conn.commit()
+            with self._write_lock:
+                self.cursor.execute(
+                    "INSERT OR IGNORE INTO knowledge (id, content, metadata, content_hash) VALUES (?, ?, ?, ?)",
+                    (record_id, content, metadata, content_hash(content))
+                )
+                changed = self.cursor.rowcount > 0
+                if changed:
+                    self.version += 1
+                self.conn.commit()
+            if changed:
+                self._notify(record_id)
             return True
         except Exception as e:
             print(f"Error inserting record {record_id}: {e}")
             return False
-    
+
+    def insert_records(self, records: Iterable[Tuple[str, str, str]], batch_size: int = 5000) -> int:
+        """Bulk insert (id, content, metadata) tuples, ignoring ids that already exist.
+
+        Rows are written with executemany in one transaction per batch while
+        durability pragmas are relaxed; ANALYZE runs once at the end. Once a
+        full batch shows this is a bulk load, the lexical index insert trigger
+        is dropped and the new rows are indexed in one statement at the end.
+        Returns the number of rows actually inserted.
+        """
+        inserted = 0
+        total = 0
+        started = time.perf_counter()
+
+        with self._write_lock:
+            synchronous = self.conn.execute("PRAGMA synchronous").fetchone()[0]
+            temp_store = self.conn.execute("PRAGMA temp_store").fetchone()[0]
+            self.conn.execute("PRAGMA synchronous=OFF")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+            indexed_up_to = None  # Highest rowid in the lexical index, once the trigger is dropped
+            try:
+                batch = []
+                for record in records:
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        if indexed_up_to is None:
+                            indexed_up_to = self._suspend_lexical_trigger()
+                        inserted += self._insert_batch(batch)
+                        total += len(batch)
+                        batch = []
+                if batch:
+                    inserted += self._insert_batch(batch)
+                    total += len(batch)
+            finally:
+                if indexed_up_to is not None:
+                    self._resume_lexical_trigger(indexed_up_to)
+                # Refresh planner statistics once, after the load
+                self.conn.execute("ANALYZE")
+                self.conn.commit()
+                self.conn.execute(f"PRAGMA synchronous={int(synchronous)}")
+                self.conn.execute(f"PRAGMA temp_store={int(temp_store)}")
+
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed > 0 else 0.0
+        print(f"Bulk inserted {inserted}/{total} records in {elapsed:.2f}s ({rate:,.0f} records/sec)")
+        return inserted
+
+    def _suspend_lexical_trigger(self) -> int:
+        """Drop the lexical index insert trigger; returns the highest rowid indexed so far"""
+        self.conn.execute("DROP TRIGGER IF EXISTS knowledge_fts_insert")
+        self.conn.commit()
+        return self.conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM knowledge").fetchone()[0]
+
+    def _resume_lexical_trigger(self, indexed_up_to: int):
+        """Index the rows inserted since the trigger was dropped, then restore it"""
+        # INSERT OR IGNORE only ever adds rows, and new rows get rowids above the old maximum
+        self.conn.execute(
+            "INSERT INTO knowledge_fts (rowid, content) SELECT rowid, content FROM knowledge WHERE rowid > ?",
+            (indexed_up_to,)
+        )
+        self.conn.execute(LEXICAL_INSERT_TRIGGER)
+        self.conn.commit()
+
+    def _insert_batch(self, batch: List[Tuple[str, str, str]]) -> int:
+        """Write one batch in a single transaction, falling back to row by row on error"""
+        sql = "INSERT OR IGNORE INTO knowledge (id, content, metadata, content_hash) VALUES (?, ?, ?, ?)"
+        batch = [(record_id, content, metadata, content_hash(content)) for record_id, content, metadata in batch]
+        try:
+            # rowcount, unlike total_changes, leaves out rows written by the lexical index trigger
+            inserted = self.conn.executemany(sql, batch).rowcount
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"Batch insert failed ({e}), retrying {len(batch)} records one by one")
+            inserted = 0
+            for record in batch:
+                try:
+                    self.cursor.execute(sql, record)
+                    inserted += self.cursor.rowcount > 0
+                except Exception as e:
+                    print(f"Error inserting record {record[0]}: {e}")
+            self.conn.commit()
+
+        if inserted:
+            self.version += 1
+            for record in batch:
+                self._notify(record[0])
+        return inserted
+
+    def add_change_listener(self, callback: Callable[[str], None]):
+        """Register a callback invoked with the id of every inserted or changed record"""
+        self._listeners.append(callback)
+
+    def _notify(self, record_id: str):
+        for callback in self._listeners:
+            callback(record_id)
+
     def get_all_records(self) -> List[Dict[str, Any]]:
         """Get all records from database"""
-        self.cursor.execute("SELECT id, content, metadata FROM knowledge")
-        rows = self.cursor.fetchall()
+        rows = self._read("SELECT id, content, metadata FROM knowledge")
         return [
             {"id": row[0], "content": row[1], "metadata": row[2]}
             for row in rows
         ]
-    
+
+    def get_entity_names(self) -> List[Tuple[str, Any, Any]]:
+        """(id, name, title) of every record with valid metadata, without loading content or full metadata"""
+        return self._read(
+            "SELECT id, json_extract(metadata, '$.name'), json_extract(metadata, '$.title') "
+            "FROM knowledge WHERE json_valid(metadata)"
+        )
+
     def get_record_by_id(self, record_id: str) -> Dict[str, Any]:
         """Get a specific record by id"""
-        self.cursor.execute(
+        rows = self._read(
             "SELECT id, content, metadata FROM knowledge WHERE id = ?",
             (record_id,)
         )
-        row = self.cursor.fetchone()
-        if row:
+        if rows:
+            row = rows[0]
             return {"id": row[0], "content": row[1], "metadata": row[2]}
         return None
-    
+
+    def get_records_by_ids(self, record_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch several records in one query, in the order of record_ids (missing ids are skipped)"""
+        rows_by_id = {}
+        unique_ids = list(dict.fromkeys(record_ids))
+        for start in range(0, len(unique_ids), MAX_IN_PARAMS):
+            chunk = unique_ids[start:start + MAX_IN_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._read(
+                f"SELECT id, content, metadata FROM knowledge WHERE id IN ({placeholders})",
+                chunk
+            )
+            for row in rows:
+                rows_by_id[row[0]] = row
+
+        return [
+            {"id": row[0], "content": row[1], "metadata": row[2]}
+            for row in (rows_by_id.get(rid) for rid in record_ids)
+            if row
+        ]
+
+    def get_content_hashes(self) -> Dict[str, str]:
+        """Map every record id to the hash of its content"""
+        return dict(self._read("SELECT id, content_hash FROM knowledge"))
+
+    def put_embeddings(self, model: str, rows: Iterable[Tuple[str, str, bytes]]) -> int:
+        """Store (id, content_hash, vector bytes) rows for a model, replacing older vectors"""
+        rows = [(record_id, model, hash_, vector) for record_id, hash_, vector in rows]
+        with self._write_lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (id, model, content_hash, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+        return len(rows)
+
+    def get_embeddings(self, model: str, record_ids: List[str]) -> Dict[str, Tuple[str, bytes]]:
+        """Stored (content_hash, vector bytes) for the given ids that have one"""
+        found = {}
+        for start in range(0, len(record_ids), MAX_IN_PARAMS):
+            chunk = record_ids[start:start + MAX_IN_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._read(
+                f"SELECT id, content_hash, vector FROM embeddings WHERE model = ? AND id IN ({placeholders})",
+                [model] + chunk
+            )
+            for record_id, hash_, vector in rows:
+                found[record_id] = (hash_, vector)
+        return found
+
+    def iter_current_embeddings(self, model: str, batch_size: int = 10000) -> Iterable[List[tuple]]:
+        """Yield batches of (id, content_hash, vector bytes) whose vector matches the current content"""
+        last_id = ""
+        while True:
+            rows = self._read(
+                """SELECT k.id, k.content_hash, e.vector FROM knowledge k
+                   JOIN embeddings e ON e.id = k.id AND e.model = ? AND e.content_hash = k.content_hash
+                   WHERE k.id > ? ORDER BY k.id LIMIT ?""",
+                (model, last_id, batch_size)
+            )
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield rows
+
+    def get_unembedded_ids(self, model: str) -> List[str]:
+        """Ids of records with no stored vector for model, or one built from older content"""
+        rows = self._read(
+            """SELECT k.id FROM knowledge k
+               LEFT JOIN embeddings e ON e.id = k.id AND e.model = ?
+               WHERE e.id IS NULL OR e.content_hash != k.content_hash""",
+            (model,)
+        )
+        return [row[0] for row in rows]
+
+    def iter_unembedded(self, model: str, batch_size: int = 10000) -> Iterable[List[Tuple[str, str, str]]]:
+        """Yield batches of (id, content, content_hash) for records needing a vector, in id order"""
+        last_id = ""
+        while True:
+            rows = self._read(
+                """SELECT k.id, k.content, k.content_hash FROM knowledge k
+                   LEFT JOIN embeddings e ON e.id = k.id AND e.model = ?
+                   WHERE k.id > ? AND (e.id IS NULL OR e.content_hash != k.content_hash)
+                   ORDER BY k.id LIMIT ?""",
+                (model, last_id, batch_size)
+            )
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield rows
+
+    def count_unembedded(self, model: str) -> int:
+        """Number of records with no current stored vector for model"""
+        return self._read(
+            """SELECT COUNT(*) FROM knowledge k
+               LEFT JOIN embeddings e ON e.id = k.id AND e.model = ?
+               WHERE e.id IS NULL OR e.content_hash != k.content_hash""",
+            (model,)
+        )[0][0]
+
+    def prune_embeddings(self) -> int:
+        """Delete stored vectors of records that no longer exist"""
+        with self._write_lock:
+            self.cursor.execute("DELETE FROM embeddings WHERE id NOT IN (SELECT id FROM knowledge)")
+            removed = self.cursor.rowcount
+            self.conn.commit()
+        return removed
+
+    def search_lexical(self, match: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """(id, BM25 score) of records matching an FTS5 query, best first (higher is better)"""
+        rows = self._read(
+            """SELECT k.id, -knowledge_fts.rank FROM knowledge_fts
+               JOIN knowledge k ON k.rowid = knowledge_fts.rowid
+               WHERE knowledge_fts MATCH ? ORDER BY knowledge_fts.rank LIMIT ?""",
+            (match, limit)
+        )
+        return [(record_id, float(score)) for record_id, score in rows]
+
+    def _row_stamp(self) -> Tuple[int, int]:
+        """Row count and highest rowid, queried again only after a write through this Database"""
+        version = self.version  # Read first: a write during the query then forces a refresh next time
+        stamp = self._stamp
+        if stamp is None or stamp[0] != version:
+            count, last_rowid = self._read("SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM knowledge")[0]
+            stamp = self._stamp = (version, count, last_rowid)
+        return stamp[1], stamp[2]
+
+    def fingerprint(self) -> str:
+        """Row count and highest rowid; records are only ever inserted, so equal stamps mean equal records"""
+        count, last_rowid = self._row_stamp()
+        return f"{count}:{last_rowid}"
+
+    def cached_record_count(self) -> int:
+        """count_records() without a table scan unless this Database wrote since the last count"""
+        return self._row_stamp()[0]
+
     def count_records(self) -> int:
         """Count total records in database"""
-        self.cursor.execute("SELECT COUNT(*) FROM knowledge")
-        return self.cursor.fetchone()[0]
-    
+        return self._read("SELECT COUNT(*) FROM knowledge")[0][0]
+
     def close(self):
-        """Close database connection"""
+        """Close database connections"""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+        self._local = threading.local()
         if self.conn:
             self.conn.close()
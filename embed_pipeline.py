@@ -0,0 +1,166 @@
+"""
+Parallel, resumable embedding pipeline for ingestion.
+
+Records that have no current vector in the embeddings table are streamed
+from the Database in pages. Each page is sorted by length so that texts
+encoded together need little padding, then split into chunks that a pool
+of worker processes encodes, each with its own copy of the model. The main
+process writes every finished chunk to the embeddings table straight away.
+Committed chunks are the checkpoints: after a crash, a rerun only streams
+the records that are still missing.
+
+Usage: python embed_pipeline.py [--db knowledge_v2.db] [--workers N] [--stub-encoder]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from database import Database
+from encoders import load_encoder, ENCODER_BACKENDS, STUB_MODEL
+
+# Per-process encoder, created by _init_worker
+_encoder = None
+_init_error = None
+
+
+def _init_worker(model_name: str, backend: str, threads: int, stub_encoder: bool):
+    global _encoder, _init_error
+    try:
+        try:
+            import torch
+            torch.set_num_threads(threads)  # Workers split the cores instead of all using every core
+        except ImportError:
+            pass
+        if stub_encoder:
+            from synthetic_data import HashingEncoder
+            _encoder = HashingEncoder()
+        else:
+            _encoder = load_encoder(model_name, backend, threads)
+    except Exception as e:
+        # Raising here would make the pool restart workers forever; fail the first task instead
+        _init_error = e
+
+
+def _encode_chunk(texts: List[str], batch_size: int) -> Tuple[int, np.ndarray, float]:
+    """Encode texts to L2-normalized float32 vectors in a worker"""
+    if _init_error is not None:
+        raise RuntimeError(f"Embedding worker could not load the model: {_init_error}")
+    started = time.perf_counter()
+    vectors = np.asarray(_encoder.encode(texts, batch_size=batch_size), dtype='float32')
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return os.getpid(), vectors, time.perf_counter() - started
+
+
+def text_length(text: str) -> int:
+    """Cheap token-count proxy used to bucket texts of similar length"""
+    return text.count(" ") + 1
+
+
+class EmbeddingPipeline:
+    def __init__(
+        self,
+        model_name: str,
+        workers: int = None,
+        page_size: int = 8192,
+        chunk_size: int = 512,
+        batch_size: int = 64,
+        stub_encoder: bool = False,
+        backend: str = "torch"
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self.page_size = page_size  # Records read from SQLite and length-sorted together
+        self.chunk_size = chunk_size  # Records per worker task (and per write)
+        self.batch_size = batch_size  # Texts per model forward pass
+        self.stub_encoder = stub_encoder
+        self.worker_stats: Dict[int, Dict[str, float]] = {}
+
+    def run(self, db: Database) -> Dict[str, Any]:
+        """Encode and store every record without a current vector; returns throughput stats"""
+        total = db.count_unembedded(self.model_name)
+        if total == 0:
+            print("Embedding pipeline: every record already has a current vector")
+            return {"encoded": 0, "seconds": 0.0, "texts_per_sec": 0.0, "workers": {}}
+
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        print(f"Embedding pipeline: {total} records, {self.workers} workers x {threads} threads, "
+              f"chunks of {self.chunk_size}")
+
+        started = time.perf_counter()
+        self.worker_stats = {}
+        done = 0
+        last_report = started
+        # spawn: forking a process that already loaded torch can deadlock in OpenMP
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(self.workers, _init_worker, (self.model_name, self.backend, threads, self.stub_encoder)) as pool:
+            pending = deque()
+            for page in db.iter_unembedded(self.model_name, self.page_size):
+                page.sort(key=lambda row: text_length(row[1]))
+                for start in range(0, len(page), self.chunk_size):
+                    chunk = page[start:start + self.chunk_size]
+                    texts = [row[1] for row in chunk]
+                    pending.append((chunk, pool.apply_async(_encode_chunk, (texts, self.batch_size))))
+                    # Keep every worker busy without buffering the whole corpus
+                    while len(pending) > 2 * self.workers:
+                        done += self._store(db, *pending.popleft())
+                if time.perf_counter() - last_report > 10:
+                    last_report = time.perf_counter()
+                    rate = done / (last_report - started)
+                    print(f"   {done}/{total} embedded ({rate:,.0f} texts/sec)")
+            while pending:
+                done += self._store(db, *pending.popleft())
+
+        seconds = time.perf_counter() - started
+        rate = done / seconds if seconds > 0 else 0.0
+        print(f"Embedding pipeline: {done} records in {seconds:.1f}s ({rate:,.0f} texts/sec)")
+        workers = {}
+        for slot, (pid, stats) in enumerate(sorted(self.worker_stats.items())):
+            worker_rate = stats["texts"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+            workers[pid] = {**stats, "texts_per_sec": round(worker_rate, 1)}
+            print(f"   worker {slot} (pid {pid}): {stats['texts']} texts, {stats['seconds']:.1f}s busy, "
+                  f"{worker_rate:,.0f} texts/sec")
+        return {"encoded": done, "seconds": round(seconds, 2), "texts_per_sec": round(rate, 1), "workers": workers}
+
+    def _store(self, db: Database, chunk: List[tuple], result) -> int:
+        """Wait for one chunk and commit its vectors"""
+        pid, vectors, seconds = result.get()
+        db.put_embeddings(self.model_name, (
+            (record_id, hash_, vector.tobytes())
+            for (record_id, _, hash_), vector in zip(chunk, vectors)
+        ))
+        stats = self.worker_stats.setdefault(pid, {"texts": 0, "seconds": 0.0})
+        stats["texts"] += len(chunk)
+        stats["seconds"] += seconds
+        return len(chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="knowledge_v2.db")
+    parser.add_argument("--model", default="paraphrase-MiniLM-L3-v2")
+    parser.add_argument("--backend", default="torch", choices=ENCODER_BACKENDS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--stub-encoder", action="store_true", help="Use HashingEncoder instead of the model")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    db.connect()
+    db.create_table()
+    model_name = STUB_MODEL if args.stub_encoder else args.model
+    pipeline = EmbeddingPipeline(model_name, args.workers, chunk_size=args.chunk_size,
+                                 batch_size=args.batch_size, stub_encoder=args.stub_encoder, backend=args.backend)
+    pipeline.run(db)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
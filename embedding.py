@@ -1,18 +1,98 @@
 import numpy as np
 import faiss
-from sentence_transformers import SentenceTransformer
-from typing import List, Tuple
+from typing import List, Tuple, Dict
+import hashlib
+import json
 import pickle
 import os
+import time
+
+from batching import on_event_loop
+from cache import LRUCache
+from metrics import StageTimer
+from database import content_hash
+from embed_pipeline import EmbeddingPipeline
+from encoders import load_encoder
+from vector_index import (
+    create_index, apply_search_params, resolve_params, supports_removal, estimate_memory_bytes, describe, mmap_io_flags,
+    COMPRESSED_TYPES
+)
+from vector_store import VectorStore, rerank
+from id_table import IdTable, write_id_table, is_id_table, id_table_digest
+
+# Index metadata layout written by save_index. Format 3 stores ids in an id table;
+# older mapping files are pickles (format 2 dict, or a plain list of ids before that)
+MAPPING_FORMAT = 3
+
+# Records embedded per encode call during incremental sync
+SYNC_CHUNK_SIZE = 1024
+
+
+def meta_path(index_path: str) -> str:
+    """Index configuration file stored next to an index file"""
+    return os.path.splitext(index_path)[0] + ".meta.json"
+
+
+def record_label(record_id: str) -> int:
+    """Stable non-negative int64 FAISS label derived from a record id"""
+    digest = hashlib.blake2b(record_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") & 0x7FFFFFFFFFFFFFFF
 
 class EmbeddingManager:
-    def __init__(self, model_name: str = "paraphrase-MiniLM-L3-v2"):
+    def __init__(
+        self,
+        model_name: str = "paraphrase-MiniLM-L3-v2",
+        cache_size: int = 2048,
+        cache_max_bytes: int = 16 * 1024 * 1024,
+        cache_ttl: float = None,
+        index_type: str = "flat",
+        index_params: Dict[str, int] = None,
+        rerank_factor: int = 0,
+        embed_workers: int = 1,
+        encoder_backend: str = "torch"
+    ):
         """Initialize embedding model"""
-        print(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
-        self.dimension = self.model.get_sentence_embedding_dimension()
         self.index = None
-        self.id_mapping = []  # Maps index position to record id
+        self.index_type = index_type  # See vector_index.INDEX_TYPES
+        self.index_params = resolve_params(index_type, index_params)
+        # With rerank_factor > 0, k * rerank_factor candidates are rescored from full-precision vectors
+        self.rerank_factor = rerank_factor
+        self.vector_store = None
+        self.embed_workers = embed_workers  # > 1 encodes bulk ingestion in an EmbeddingPipeline
+        self.encoder_backend = encoder_backend  # See encoders.ENCODER_BACKENDS
+        self.id_mapping = {}  # Maps FAISS label to record id (dict, or a read-only IdTable after load)
+        self.content_hashes = {}  # Record id -> hash of the content its vector was built from
+        self.needs_save = False  # Set when the in-memory index differs from the saved files
+        self.id_table_digest = None  # Digest of the id table (saved in the index meta), None until computed
+        self.index_path = None  # File the index was loaded from
+        self.index_mmapped = False  # Mapped indexes are read-only until _make_writable()
+        self.batcher = None  # Optional QueryBatcher for concurrent searches
+        self.version = 0  # Bumped whenever the model or index changes
+        self.stage_times = StageTimer()  # Query encoding and index search latency
+        
+        # Normalized query text -> normalized float32 query vector
+        self.query_cache = LRUCache(cache_size, cache_max_bytes, cache_ttl, sizeof=self._cache_entry_size)
+        
+        self.load_model(model_name)
+        
+    def load_model(self, model_name: str):
+        """Load (or swap) the embedding model"""
+        print(f"Loading embedding model: {model_name} ({self.encoder_backend})")
+        self.model_name = model_name
+        self.model = load_encoder(model_name, self.encoder_backend)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        self.query_cache.clear()
+        self.version += 1
+        
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Canonical form of a query used for encoding and cache keys"""
+        # The MiniLM tokenizer is uncased, so lowercasing does not change the vector
+        return " ".join(query.lower().split())
+    
+    @staticmethod
+    def _cache_entry_size(vector: np.ndarray) -> int:
+        return vector.nbytes + 64  # Vector plus rough per-entry overhead
         
     def create_embeddings(self, texts: List[str]) -> np.ndarray:
         """Generate embeddings for texts"""
@@ -20,60 +100,464 @@ class EmbeddingManager:
         embeddings = self.model.encode(texts, show_progress_bar=True)
         return embeddings
     
-    def build_index(self, embeddings: np.ndarray, record_ids: List[str]):
+    def build_index(self, embeddings: np.ndarray, record_ids: List[str], content_hashes: List[str] = None):
         """Build FAISS index from embeddings"""
-        print(f"Building FAISS index with {len(embeddings)} vectors...")
+        print(f"Building {self.index_type} FAISS index with {len(embeddings)} vectors...")
+        started = time.perf_counter()
         
         # Normalize embeddings for cosine similarity
-        embeddings = embeddings.astype('float32')
+        embeddings = np.asarray(embeddings, dtype='float32')
         faiss.normalize_L2(embeddings)
         
-        # Create FAISS index
-        self.index = faiss.IndexFlatIP(self.dimension)  # Inner Product for cosine similarity
-        self.index.add(embeddings)
+        # Create FAISS index keyed by stable per-record labels
+        labels = np.array([record_label(rid) for rid in record_ids], dtype='int64')
+        if len(set(labels.tolist())) != len(labels):
+            raise ValueError("Duplicate record ids (or label collision) in index build")
+        # Inner Product for cosine similarity; IVF types are trained here
+        self.index, self.index_params = create_index(self.index_type, self.dimension, self.index_params, embeddings)
+        self.index.add_with_ids(embeddings, labels)
+        self.index_mmapped = False
+        
+        # Keep exact vectors beside a lossy index for re-ranking
+        self.vector_store = None
+        if self.rerank_factor > 0:
+            self.vector_store = VectorStore(self.dimension)
+            self.vector_store.add(labels, embeddings)
         
         # Store id mapping
-        self.id_mapping = record_ids
+        self.id_mapping = {int(label): rid for label, rid in zip(labels, record_ids)}
+        self.content_hashes = dict(zip(record_ids, content_hashes or [None] * len(record_ids)))
+        self.query_cache.clear()
+        self.version += 1
+        self.needs_save = True
+        self.id_table_digest = None
         
-        print(f"FAISS index built successfully with {self.index.ntotal} vectors")
+        print(f"FAISS index {describe(self.index_type, self.index_params)} built successfully "
+              f"with {self.index.ntotal} vectors in {time.perf_counter() - started:.2f}s")
     
-    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
-        """Search for similar documents"""
+    def _embed_and_store(self, db, record_ids: List[str]) -> int:
+        """Encode records and store their normalized vectors in the database"""
+        stored = 0
+        for start in range(0, len(record_ids), SYNC_CHUNK_SIZE):
+            records = db.get_records_by_ids(record_ids[start:start + SYNC_CHUNK_SIZE])
+            if not records:
+                continue
+            embeddings = np.asarray(self.model.encode([r['content'] for r in records]), dtype='float32')
+            faiss.normalize_L2(embeddings)
+            stored += db.put_embeddings(self.model_name, (
+                (r['id'], content_hash(r['content']), vector.tobytes())
+                for r, vector in zip(records, embeddings)
+            ))
+        return stored
+    
+    def embed_missing(self, db) -> int:
+        """Encode only records whose stored vector is missing or built from older content"""
+        if self.embed_workers > 1:
+            pipeline = EmbeddingPipeline(self.model_name, self.embed_workers, backend=self.encoder_backend)
+            return pipeline.run(db)["encoded"]
+        record_ids = db.get_unembedded_ids(self.model_name)
+        if not record_ids:
+            return 0
+        print(f"Embedding {len(record_ids)} records without a current stored vector...")
+        started = time.perf_counter()
+        stored = self._embed_and_store(db, record_ids)
+        print(f"Stored {stored} embeddings in {time.perf_counter() - started:.2f}s")
+        return stored
+    
+    def store_index_vectors(self, db) -> int:
+        """Save vectors already in an exact index for records with no stored vector yet.
+
+        Lets indexes built before vectors were persisted seed the embeddings
+        table without re-encoding. Compressed indexes only hold approximations
+        and are skipped.
+        """
+        if self.index is None or self.index_type in COMPRESSED_TYPES:
+            return 0
+        missing = [
+            rid for rid in db.get_unembedded_ids(self.model_name)
+            if self.content_hashes.get(rid) is not None
+        ]
+        if not missing:
+            return 0
+        
+        db_hashes = db.get_content_hashes()
+        stored = 0
+        for start in range(0, len(missing), SYNC_CHUNK_SIZE):
+            rows = []
+            for rid in missing[start:start + SYNC_CHUNK_SIZE]:
+                if self.content_hashes.get(rid) == db_hashes.get(rid):
+                    vector = self.index.reconstruct(record_label(rid))
+                    rows.append((rid, db_hashes[rid], np.asarray(vector, dtype='float32').tobytes()))
+            stored += db.put_embeddings(self.model_name, rows)
+        print(f"Stored {stored} vectors from the existing index")
+        return stored
+    
+    def build_index_from_database(self, db) -> bool:
+        """Build the index from stored vectors, encoding only what is missing or outdated"""
+        self.embed_missing(db)
+        db.prune_embeddings()
+        
+        started = time.perf_counter()
+        ids, hashes, chunks = [], [], []
+        for rows in db.iter_current_embeddings(self.model_name):
+            ids.extend(row[0] for row in rows)
+            hashes.extend(row[1] for row in rows)
+            chunks.append(np.frombuffer(b"".join(row[2] for row in rows), dtype='float32').reshape(len(rows), -1))
+        if not ids:
+            print("   No records to index")
+            return False
+        
+        embeddings = np.vstack(chunks)
+        del chunks  # The stored vectors would otherwise be held twice while the index is built
+        if embeddings.shape[1] != self.dimension:
+            raise ValueError(f"Stored vectors have {embeddings.shape[1]} dimensions, model has {self.dimension}")
+        print(f"Read {len(ids)} stored vectors in {time.perf_counter() - started:.2f}s")
+        self.build_index(embeddings, ids, hashes)
+        return True
+    
+    def record_ids(self) -> List[str]:
+        """Indexed record ids (in label order once loaded from an id table, not FAISS row order)"""
+        return list(self.id_mapping.values())
+    
+    def fingerprint(self) -> str:
+        """Identifies the model, index configuration and indexed records (ids and content hashes).
+
+        Unlike version, it is the same in every process serving the same saved
+        index, and across restarts.
+        """
+        if self.id_table_digest is None:
+            if isinstance(self.id_mapping, IdTable):
+                self.id_table_digest = self.id_mapping.digest()
+            else:
+                self.id_table_digest = id_table_digest(self.id_mapping, self.content_hashes)
+        key = json.dumps([self.model_name, self.index_type, self.index_params, self.id_table_digest], sort_keys=True)
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+    def sync_with_database(self, db) -> Dict[str, int]:
+        """Embed only new or changed records and drop deleted ones"""
         if self.index is None:
             raise ValueError("Index not built yet")
         
-        # Generate query embedding
-        query_embedding = self.model.encode([query]).astype('float32')
-        faiss.normalize_L2(query_embedding)
+        started = time.perf_counter()
+        db_hashes = db.get_content_hashes()
+        
+        indexed = dict(self.content_hashes.items())
+        added = [rid for rid in db_hashes if rid not in indexed]
+        removed = [rid for rid in indexed if rid not in db_hashes]
+        changed = []
+        adopted = []
+        for rid, indexed_hash in indexed.items():
+            if rid not in db_hashes:
+                continue
+            if indexed_hash is None:
+                # Index predates content hashes: trust it and adopt the current hash
+                adopted.append(rid)
+            elif indexed_hash != db_hashes[rid]:
+                changed.append(rid)
+        
+        if added or removed or changed or adopted:
+            self._make_writable()
+        for rid in adopted:
+            self.content_hashes[rid] = db_hashes[rid]
+        
+        stale = removed + changed
+        if stale:
+            self._remove_labels(np.array([record_label(rid) for rid in stale], dtype='int64'))
+            for rid in stale:
+                self.id_mapping.pop(record_label(rid), None)
+                self.content_hashes.pop(rid, None)
         
-        # Search in index
-        distances, indices = self.index.search(query_embedding, k)
+        # Reuse stored vectors where they match the current content; encode the rest
+        to_embed = added + changed
+        encoded = 0
+        for start in range(0, len(to_embed), SYNC_CHUNK_SIZE):
+            chunk = to_embed[start:start + SYNC_CHUNK_SIZE]
+            stored = db.get_embeddings(self.model_name, chunk)
+            outdated = [rid for rid in chunk if rid not in stored or stored[rid][0] != db_hashes[rid]]
+            if outdated:
+                encoded += self._embed_and_store(db, outdated)
+                stored.update(db.get_embeddings(self.model_name, outdated))
+            ids = [rid for rid in chunk if rid in stored]
+            if not ids:
+                continue
+            embeddings = np.vstack([np.frombuffer(stored[rid][1], dtype='float32') for rid in ids])
+            labels = np.array([record_label(rid) for rid in ids], dtype='int64')
+            self.index.add_with_ids(embeddings, labels)
+            if self.vector_store is not None:
+                self.vector_store.add(labels, embeddings)
+            for label, rid in zip(labels, ids):
+                self.id_mapping[int(label)] = rid
+                self.content_hashes[rid] = stored[rid][0]
+        if removed:
+            db.prune_embeddings()
         
-        # Return results with record ids and similarity scores
-        results = []
-        for idx, score in zip(indices[0], distances[0]):
-            if idx < len(self.id_mapping):
-                results.append((self.id_mapping[idx], float(score)))
+        summary = {'added': len(added), 'changed': len(changed), 'removed': len(removed)}
+        if stale or to_embed:
+            self.version += 1
+        if stale or to_embed or adopted:
+            self.needs_save = True
+            self.id_table_digest = None
         
-        return results
+        print(f"Index sync: {summary['added']} added, {summary['changed']} changed, "
+              f"{summary['removed']} removed ({encoded} encoded, {len(to_embed) - encoded} from stored vectors) "
+              f"in {time.perf_counter() - started:.2f}s ({self.index.ntotal} vectors)")
+        return summary
+    
+    def _make_writable(self):
+        """Swap a memory-mapped index and id table for in-memory copies before changing them"""
+        if isinstance(self.id_mapping, IdTable):
+            self.id_mapping, self.content_hashes = self.id_mapping.to_dicts()
+        if self.index_mmapped:
+            print("Reloading memory-mapped index into memory to apply changes...")
+            self.index = faiss.read_index(self.index_path)
+            apply_search_params(self.index, self.index_type, self.index_params)
+            self.index_mmapped = False
+    
+    def _remove_labels(self, labels: np.ndarray):
+        """Drop vectors from the index, rebuilding it for types without removal"""
+        if self.vector_store is not None:
+            self.vector_store.remove(labels)
+        if supports_removal(self.index_type):
+            self.index.remove_ids(labels)
+            return
+        
+        print(f"Rebuilding {self.index_type} index to drop {len(labels)} vectors...")
+        stored = faiss.vector_to_array(self.index.id_map)
+        keep = ~np.isin(stored, labels)
+        vectors = self.index.index.reconstruct_n(0, self.index.ntotal)[keep]
+        index, _ = create_index(self.index_type, self.dimension, self.index_params, vectors)
+        index.add_with_ids(vectors, stored[keep])
+        self.index = index
+    
+    def index_stats(self) -> Dict[str, object]:
+        """Index type, parameters and size"""
+        if self.index is None:
+            return {"type": self.index_type, "params": self.index_params, "vectors": 0}
+        store = self.vector_store
+        return {
+            "type": self.index_type,
+            "params": self.index_params,
+            "vectors": int(self.index.ntotal),
+            "memory_bytes": estimate_memory_bytes(self.index_type, self.index_params, self.index.ntotal, self.dimension),
+            "mmap": self.index_mmapped,
+            "rerank_factor": self.rerank_factor if store is not None else 0,
+            "rerank_store_resident_bytes": store.memory_bytes() if store is not None else 0,
+        }
     
-    def save_index(self, index_path: str = "faiss_index.bin", mapping_path: str = "id_mapping.pkl"):
-        """Save FAISS index and id mapping to disk"""
+    def enable_batching(self, max_batch: int = 16, max_wait_ms: float = 5.0):
+        """Route single-query searches through a micro-batching worker"""
+        from batching import QueryBatcher
+
+        self.disable_batching()
+        self.batcher = QueryBatcher(self, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        print(f"Query batching enabled (max_batch={max_batch}, max_wait_ms={max_wait_ms})")
+
+    def disable_batching(self):
+        """Stop the micro-batching worker, if any"""
+        if self.batcher:
+            self.batcher.stop()
+            self.batcher = None
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Search for similar documents"""
+        if self.index is None:
+            raise ValueError("Index not built yet")
+
+        # Cached queries skip both the encoder and the batching window
+        cached = self.query_cache.get(self.normalize_query(query))
+        if cached is not None:
+            return self.search_vectors(cached.reshape(1, -1), k=k)[0]
+
+        # Blocking in the batching window on an event loop thread would stall every other request
+        if self.batcher and not on_event_loop():
+            return self.batcher.submit(query, k)
+
+        return self.search_batch([query], k=k)[0]
+
+    def search_batch(
+        self, queries: List[str], k: int = 5, record_miss: bool = True
+    ) -> List[List[Tuple[str, float]]]:
+        """Search for several queries with one encode call and one index search"""
+        if self.index is None:
+            raise ValueError("Index not built yet")
+
+        return self.search_vectors(self.encode_queries(queries, record_miss), k=k)
+
+    def encode_queries(self, queries: List[str], record_miss: bool = True) -> np.ndarray:
+        """Encode queries to normalized float32 vectors, reusing cached ones"""
+        keys = [self.normalize_query(q) for q in queries]
+        vectors = np.empty((len(keys), self.dimension), dtype='float32')
+
+        missing = {}  # key -> row positions needing that vector
+        for pos, key in enumerate(keys):
+            cached = self.query_cache.get(key, record_miss=record_miss)
+            if cached is None:
+                missing.setdefault(key, []).append(pos)
+            else:
+                vectors[pos] = cached
+
+        if missing:
+            texts = list(missing.keys())
+            with self.stage_times.time("encode"):
+                encoded = np.asarray(self.model.encode(texts), dtype='float32')
+                faiss.normalize_L2(encoded)
+            for key, vector in zip(texts, encoded):
+                vector = vector.copy()
+                self.query_cache.put(key, vector)
+                for pos in missing[key]:
+                    vectors[pos] = vector
+
+        return vectors
+
+    def search_vectors(self, query_embeddings: np.ndarray, k: int = 5) -> List[List[Tuple[str, float]]]:
+        """Search the index with already normalized query vectors"""
+        if self.index is None:
+            raise ValueError("Index not built yet")
+
+        # Search in index, rescoring a wider shortlist with exact vectors when available
+        if self.vector_store is not None:
+            with self.stage_times.time("index_search"):
+                _, candidates = self.index.search(query_embeddings, k * self.rerank_factor)
+            with self.stage_times.time("rerank"):
+                distances, indices = rerank(self.vector_store, query_embeddings, candidates, k)
+        else:
+            with self.stage_times.time("index_search"):
+                distances, indices = self.index.search(query_embeddings, k)
+
+        # Return results with record ids and similarity scores, per query
+        all_results = []
+        for row_indices, row_distances in zip(indices, distances):
+            results = []
+            for label, score in zip(row_indices, row_distances):
+                record_id = self.id_mapping.get(int(label))
+                if record_id is not None:
+                    results.append((record_id, float(score)))
+            all_results.append(results)
+
+        return all_results
+
+    def warm_up(self, texts: List[str]):
+        """Run encodes and a search so the first real query does not pay for lazy initialization.
+
+        Bypasses the query cache. Searching also pages in a memory-mapped index.
+        """
+        embeddings = np.asarray(self.model.encode(texts), dtype='float32')
+        faiss.normalize_L2(embeddings)
+        if self.index is not None and self.index.ntotal > 0:
+            self.search_vectors(embeddings, k=5)
+
+    def save_index(self, index_path: str = "faiss_index.bin", mapping_path: str = "id_table.bin"):
+        """Save FAISS index, id table and index configuration to disk"""
         if self.index is None:
             raise ValueError("No index to save")
         
-        faiss.write_index(self.index, index_path)
-        with open(mapping_path, 'wb') as f:
-            pickle.dump(self.id_mapping, f)
+        # Write then rename, so processes that have the old file mapped keep a valid copy
+        faiss.write_index(self.index, index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
+        if self.vector_store is not None:
+            self.vector_store.save(index_path)
+        self.id_table_digest = write_id_table(mapping_path, self.id_mapping, self.content_hashes)
+        with open(meta_path(index_path), 'w', encoding='utf-8') as f:
+            json.dump({
+                'format': MAPPING_FORMAT,
+                'index_config': {'type': self.index_type, 'params': self.index_params},
+                'id_table_digest': self.id_table_digest
+            }, f)
+        self.needs_save = False
         
         print(f"Index saved to {index_path}")
     
-    def load_index(self, index_path: str = "faiss_index.bin", mapping_path: str = "id_mapping.pkl"):
-        """Load FAISS index and id mapping from disk"""
-        if os.path.exists(index_path) and os.path.exists(mapping_path):
-            self.index = faiss.read_index(index_path)
+    def load_index(
+        self,
+        index_path: str = "faiss_index.bin",
+        mapping_path: str = "id_table.bin",
+        mmap: bool = False,
+        legacy_mapping_path: str = "id_mapping.pkl"
+    ):
+        """Load FAISS index and id mapping from disk.
+
+        With mmap=True the index and id table are memory-mapped read-only, so
+        load time barely depends on corpus size and processes share pages.
+        Without an id table at mapping_path, the pickled mapping older versions
+        wrote to legacy_mapping_path is read and flagged for re-save.
+        """
+        if not os.path.exists(mapping_path) and legacy_mapping_path:
+            mapping_path = legacy_mapping_path
+        if not (os.path.exists(index_path) and os.path.exists(mapping_path)):
+            return False
+        
+        started = time.perf_counter()
+        legacy = not is_id_table(mapping_path)
+        digest = None
+        if legacy:
+            index = faiss.read_index(index_path)
             with open(mapping_path, 'rb') as f:
-                self.id_mapping = pickle.load(f)
-            print(f"Index loaded from {index_path} with {self.index.ntotal} vectors")
-            return True
-        return False
+                mapping = pickle.load(f)
+            if isinstance(mapping, list):
+                index, mapping = self._upgrade_positional_index(index, mapping)
+            config = mapping.get('index_config', {'type': 'flat', 'params': {}})
+            id_mapping, content_hashes = mapping['id_mapping'], mapping['content_hashes']
+            mmap = False
+        else:
+            config = {'type': 'flat', 'params': {}}
+            if os.path.exists(meta_path(index_path)):
+                with open(meta_path(index_path), encoding='utf-8') as f:
+                    meta = json.load(f)
+                config = meta['index_config']
+                digest = meta.get('id_table_digest')  # Missing in metas written before it was added
+            flags = mmap_io_flags(config['type']) if mmap else 0
+            index = faiss.read_index(index_path, flags)
+            id_mapping = IdTable(mapping_path, mmap=mmap)
+            content_hashes = id_mapping.content_hashes
+        
+        # The saved configuration wins over the one passed to __init__
+        if config['type'] != self.index_type:
+            print(f"Using saved {config['type']} index instead of configured {self.index_type} "
+                  f"(delete {index_path} to rebuild)")
+        self.index_type = config['type']
+        self.index_params = resolve_params(config['type'], config['params'])
+        apply_search_params(index, self.index_type, self.index_params)
+        
+        self.index = index
+        self.index_path = index_path
+        self.index_mmapped = mmap
+        self.id_mapping = id_mapping
+        self.content_hashes = content_hashes
+        self.needs_save = legacy  # Rewrite older mapping files as an id table
+        self.id_table_digest = digest
+        self._load_vector_store(index_path)
+        self.query_cache.clear()
+        self.version += 1
+        print(f"Index {describe(self.index_type, self.index_params)} loaded from {index_path} "
+              f"with {self.index.ntotal} vectors in {time.perf_counter() - started:.3f}s"
+              f"{' (memory-mapped)' if mmap else ''}")
+        return True
+    
+    def _load_vector_store(self, index_path: str):
+        """Map the full-precision vectors saved with the index, if re-ranking is on"""
+        self.vector_store = None
+        if self.rerank_factor <= 0:
+            return
+        store = VectorStore(self.dimension)
+        if not store.load(index_path):
+            print("No full-precision vectors saved with the index; re-ranking disabled until it is rebuilt")
+        elif len(store) != self.index.ntotal:
+            print(f"Full-precision vectors ({len(store)}) do not match the index ({self.index.ntotal}); "
+                  f"re-ranking disabled until it is rebuilt")
+        else:
+            self.vector_store = store
+            print(f"Re-ranking top {self.rerank_factor}x candidates with {len(store)} memory-mapped vectors")
+    
+    def _upgrade_positional_index(self, index, record_ids: List[str]):
+        """Convert an index addressed by position (old format) to stable labels"""
+        print("Upgrading positional index to stable record labels...")
+        vectors = index.reconstruct_n(0, index.ntotal)
+        labels = np.array([record_label(rid) for rid in record_ids], dtype='int64')
+        upgraded = faiss.IndexIDMap2(faiss.IndexFlatIP(index.d))
+        upgraded.add_with_ids(vectors, labels)
+        mapping = {
+            'id_mapping': {int(label): rid for label, rid in zip(labels, record_ids)},
+            'content_hashes': dict.fromkeys(record_ids),
+            'index_config': {'type': 'flat', 'params': {}}
+        }
+        return upgraded, mapping
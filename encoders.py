@@ -0,0 +1,186 @@
+"""
+Encoder backends for EmbeddingManager.
+
+"torch" is the SentenceTransformer model itself. "onnx" runs the same
+transformer exported to ONNX with ONNX Runtime, and "onnx-int8" runs a copy
+with dynamically int8-quantized weights. The export is made on first use from
+the SentenceTransformer model and cached under onnx_models/; afterwards the
+ONNX backends only need onnxruntime and the tokenizer, not torch.
+
+OnnxEncoder reproduces SentenceTransformer.encode(): tokenize with the same
+tokenizer and max_seq_length, run the transformer, then apply the model's
+pooling (and normalization, if the model has it). verify_encoder_parity.py
+checks the result against the torch backend.
+"""
+
+import inspect
+import json
+import os
+from typing import List, Union
+
+import numpy as np
+
+ENCODER_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Exported models are cached here, one folder per model
+ONNX_MODELS_DIR = "onnx_models"
+ONNX_OPSET = 14
+TRANSFORMER_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+
+# Model name that selects synthetic_data.HashingEncoder (no download; for benchmarks)
+STUB_MODEL = "hashing-stub"
+
+
+def load_encoder(model_name: str, backend: str = "torch", threads: int = None):
+    """Encoder with SentenceTransformer's encode() / get_sentence_embedding_dimension()"""
+    if model_name == STUB_MODEL:
+        from synthetic_data import HashingEncoder
+        return HashingEncoder()
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEncoder(model_name, quantize=backend == "onnx-int8", threads=threads)
+    raise ValueError(f"Unknown encoder backend {backend!r}, expected one of {', '.join(ENCODER_BACKENDS)}")
+
+
+def onnx_model_dir(model_name: str) -> str:
+    return os.path.join(ONNX_MODELS_DIR, model_name.replace("/", "__"))
+
+
+def export_onnx(model_name: str, model_dir: str):
+    """Export the SentenceTransformer's transformer to model_dir/model.onnx with its tokenizer and pooling config"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    pooling = next(module for module in model if isinstance(module, Pooling))
+    tokenizer = transformer.tokenizer
+    hf_model = transformer.auto_model.eval()
+
+    sample = tokenizer(["export sample text"], padding=True, return_tensors="pt")
+    input_names = [name for name in TRANSFORMER_INPUTS if name in sample]
+
+    class TokenEmbeddings(torch.nn.Module):
+        """Positional inputs in, last hidden state out (torch.onnx.export traces positional args)"""
+
+        def __init__(self):
+            super().__init__()
+            self.model = hf_model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    os.makedirs(model_dir, exist_ok=True)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+    tmp_path = os.path.join(model_dir, "model.onnx.tmp")
+    # Newer torch exports through torch.export by default, which does not take dynamic_axes
+    legacy_exporter = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(),
+            tuple(sample[name] for name in input_names),
+            tmp_path,
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+            do_constant_folding=True,
+            **legacy_exporter,
+        )
+    os.replace(tmp_path, os.path.join(model_dir, "model.onnx"))
+
+    tokenizer.save_pretrained(model_dir)
+    config = {
+        "model_name": model_name,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "max_seq_length": model.max_seq_length,
+        # sentence-transformers 6 replaced get_pooling_mode_str() with a pooling_mode attribute
+        "pooling": pooling.get_pooling_mode_str() if hasattr(pooling, "get_pooling_mode_str") else pooling.pooling_mode,
+        "normalize": any(isinstance(module, Normalize) for module in model),
+    }
+    with open(os.path.join(model_dir, "encoder.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    print(f"Exported {model_name} to {model_dir}")
+
+
+def quantize_onnx(model_dir: str):
+    """Write model.int8.onnx: weights quantized to int8, activations quantized per batch at run time"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        os.path.join(model_dir, "model.onnx"),
+        os.path.join(model_dir, "model.int8.onnx"),
+        weight_type=QuantType.QInt8,
+    )
+    print(f"Quantized {model_dir}/model.onnx to int8")
+
+
+class OnnxEncoder:
+    """SentenceTransformer-compatible encoder running an exported model with ONNX Runtime"""
+
+    def __init__(self, model_name: str, quantize: bool = False, model_dir: str = None, threads: int = None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_dir = model_dir or onnx_model_dir(model_name)
+        if not os.path.exists(os.path.join(model_dir, "model.onnx")):
+            export_onnx(model_name, model_dir)
+        model_file = "model.int8.onnx" if quantize else "model.onnx"
+        if not os.path.exists(os.path.join(model_dir, model_file)):
+            quantize_onnx(model_dir)
+
+        with open(os.path.join(model_dir, "encoder.json"), encoding="utf-8") as f:
+            config = json.load(f)
+        self.dimension = config["dimension"]
+        self.max_seq_length = config["max_seq_length"]
+        self.pooling = config["pooling"]
+        self.normalize = config["normalize"]
+        if self.pooling not in ("mean", "cls", "max"):
+            raise ValueError(f"Unsupported pooling mode {self.pooling!r} for ONNX encoding")
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.model_path = os.path.join(model_dir, model_file)
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Embed texts like SentenceTransformer.encode (other keyword arguments are ignored)"""
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        # Longest first, as SentenceTransformer does, so each batch pads little
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings = np.empty((len(texts), self.dimension), dtype='float32')
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            batch = self.tokenizer(
+                [texts[i] for i in rows], padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors="np"
+            )
+            feeds = {name: batch[name].astype('int64') for name in self.input_names}
+            token_embeddings = self.session.run(None, feeds)[0]
+            embeddings[rows] = self._pool(token_embeddings, batch["attention_mask"])
+
+        if self.normalize:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling == "cls":
+            return token_embeddings[:, 0]
+        mask = attention_mask[:, :, None].astype('float32')
+        if self.pooling == "max":
+            return np.where(mask > 0, token_embeddings, -1e9).max(axis=1)
+        return (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
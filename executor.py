@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Any
+
+
+class QueueFullError(Exception):
+    """Raised when the executor cannot admit more work"""
+
+
+class BoundedExecutor:
+    """Thread pool with a bounded admission queue.
+
+    At most max_workers tasks run at once and at most max_queue more wait for
+    a free worker. Anything beyond that is rejected immediately with
+    QueueFullError so callers can shed load instead of piling up latency.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, name: str = "rag-worker"):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+
+        # Counters
+        self.active = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+        self.started_at = time.perf_counter()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Submit a task, or raise QueueFullError if no slot is free"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise QueueFullError("Executor queue is full")
+
+        with self._lock:
+            self.submitted += 1
+
+        try:
+            return self._pool.submit(self._run, fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _run(self, fn: Callable, *args, **kwargs):
+        with self._lock:
+            self.active += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+                self.busy_seconds += elapsed
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and worker utilisation"""
+        with self._lock:
+            active = self.active
+            in_flight = self.submitted - self.completed
+            uptime = time.perf_counter() - self.started_at
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": active,
+                "queue_depth": max(0, in_flight - active),
+                "utilisation": round(active / self.max_workers, 3),
+                "busy_ratio": round(self.busy_seconds / (uptime * self.max_workers), 3) if uptime else 0.0,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        """Wait for running tasks and stop the pool"""
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,105 @@
+"""
+Response encoding for /ask: fast JSON, gzip, ETags and wire-size counters.
+
+orjson is used when it is installed; otherwise the standard json module with
+compact separators. Bodies of at least gzip_min_bytes are gzipped for clients
+that accept it.
+"""
+
+import gzip
+import hashlib
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from metrics import Histogram, LATENCY_BUCKETS_MS, SIZE_BUCKETS_BYTES
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(payload: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def answer_etag(fingerprint: str, question: str, include_sources: bool) -> str:
+    """Weak ETag of a context-free answer: same data fingerprint, same question, same body"""
+    key = repr((fingerprint, question.strip().lower(), include_sources))
+    return 'W/"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:24] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against etag"""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class ResponseEncoder:
+    """Encodes JSON response bodies and counts serialization time and bytes on the wire"""
+
+    def __init__(self, gzip_min_bytes: int = 1024, gzip_level: int = 5):
+        self.gzip_min_bytes = gzip_min_bytes
+        self.gzip_level = gzip_level
+        self.responses = 0
+        self.gzipped = 0
+        self.not_modified = 0
+        self.body_bytes = 0
+        self.wire_bytes = 0
+        self.serialize_times = Histogram(LATENCY_BUCKETS_MS)
+        self.gzip_times = Histogram(LATENCY_BUCKETS_MS)
+        self.sizes = Histogram(SIZE_BUCKETS_BYTES)
+
+    def encode(self, payload: Any, accept_encoding: Optional[str] = None) -> Tuple[bytes, Dict[str, str]]:
+        """Body bytes and the headers describing them"""
+        started = time.perf_counter()
+        body = dumps(payload)
+        self.serialize_times.observe((time.perf_counter() - started) * 1000)
+
+        headers = {"Vary": "Accept-Encoding"}
+        raw_size = len(body)
+        if raw_size >= self.gzip_min_bytes and accepts_gzip(accept_encoding):
+            started = time.perf_counter()
+            body = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+            self.gzip_times.observe((time.perf_counter() - started) * 1000)
+            headers["Content-Encoding"] = "gzip"
+            self.gzipped += 1
+
+        self.responses += 1
+        self.body_bytes += raw_size
+        self.wire_bytes += len(body)
+        self.sizes.observe(len(body))
+        return body, headers
+
+    def record_not_modified(self):
+        self.not_modified += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "encoder": "orjson" if orjson is not None else "json",
+            "responses": self.responses,
+            "not_modified": self.not_modified,
+            "gzipped": self.gzipped,
+            "body_bytes": self.body_bytes,
+            "wire_bytes": self.wire_bytes,
+            "wire_size_bytes": self.sizes.snapshot(),
+            "serialize_ms": self.serialize_times.snapshot(),
+            "gzip_ms": self.gzip_times.snapshot()
+        }
@@ -0,0 +1,184 @@
+"""
+Compact, memory-mappable table of FAISS labels, record ids and content hashes.
+
+Replaces the pickled id mapping: instead of rebuilding Python dicts with one
+entry per record in every process, the file is mapped read-only and looked
+up in place, so load time barely depends on corpus size and worker
+processes share the same physical pages.
+
+File layout (little endian, every section 8-byte aligned):
+
+    header   magic "RAGIDT01", row count n, blob length (uint64 each)
+    labels   int64[n]      FAISS labels, sorted
+    offsets  uint64[n + 1] record id i is blob[offsets[i]:offsets[i + 1]]
+    hashes   S32[n]        content hash hex digests (empty when unknown)
+    by_id    int64[n]      rows ordered by record id bytes
+    blob     utf-8 record ids, concatenated
+"""
+
+import hashlib
+import os
+import struct
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+MAGIC = b"RAGIDT01"
+HEADER = struct.Struct("<8sQQ")
+HASH_WIDTH = 32
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _sections(id_mapping: Dict[int, str], content_hashes: Dict[str, Optional[str]]) -> List[bytes]:
+    """The file contents, in order; the same mapping always gives the same bytes"""
+    labels = np.fromiter(id_mapping.keys(), dtype='int64', count=len(id_mapping))
+    order = np.argsort(labels)
+    labels = labels[order]
+    ids = list(id_mapping.values())
+    encoded = [ids[i].encode("utf-8") for i in order]
+
+    offsets = np.zeros(len(encoded) + 1, dtype='uint64')
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    hashes = np.array([(content_hashes.get(ids[i]) or "").encode("ascii") for i in order], dtype=f'S{HASH_WIDTH}')
+    by_id = np.array(sorted(range(len(encoded)), key=encoded.__getitem__), dtype='int64')
+    blob = b"".join(encoded)
+
+    sections = [HEADER.pack(MAGIC, len(encoded), len(blob))]
+    for array in (labels, offsets, hashes, by_id):
+        data = array.tobytes()
+        sections.append(data + b"\0" * (_aligned(len(data)) - len(data)))
+    sections.append(blob)
+    return sections
+
+
+def _digest(sections) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for data in sections:
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def id_table_digest(id_mapping: Dict[int, str], content_hashes: Dict[str, Optional[str]]) -> str:
+    """Digest of the id table write_id_table would write for this mapping"""
+    return _digest(_sections(id_mapping, content_hashes))
+
+
+def write_id_table(path: str, id_mapping: Dict[int, str], content_hashes: Dict[str, Optional[str]]) -> str:
+    """Write id_mapping (label -> record id) and content hashes to path; returns the file's digest"""
+    sections = _sections(id_mapping, content_hashes)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for data in sections:
+            f.write(data)
+    os.replace(tmp_path, path)
+    return _digest(sections)
+
+
+def is_id_table(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class IdTable(Mapping):
+    """Read-only label -> record id mapping backed by a (memory-mapped) id table file"""
+
+    def __init__(self, path: str, mmap: bool = True):
+        if mmap:
+            data = np.memmap(path, dtype='uint8', mode='r')
+        else:
+            data = np.fromfile(path, dtype='uint8')
+        magic, count, blob_length = HEADER.unpack(bytes(data[:HEADER.size]))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an id table")
+
+        offset = HEADER.size
+        sections = []
+        for dtype, length in (('int64', count), ('uint64', count + 1), (f'S{HASH_WIDTH}', count), ('int64', count)):
+            array = np.frombuffer(data, dtype=dtype, count=length, offset=offset)
+            sections.append(array)
+            offset += _aligned(array.nbytes)
+        self.labels, self.offsets, self.hashes, self.by_id = sections
+        self.blob = np.frombuffer(data, dtype='uint8', count=blob_length, offset=offset)
+        self.data = data
+        self.count = count
+        self.content_hashes = ContentHashView(self)
+
+    def digest(self) -> str:
+        """Digest of the file, equal to the one write_id_table returned"""
+        return _digest([memoryview(self.data)])
+
+    def record_id_at(self, row: int) -> str:
+        return self.blob[int(self.offsets[row]):int(self.offsets[row + 1])].tobytes().decode("utf-8")
+
+    def row_of_label(self, label: int) -> int:
+        row = int(np.searchsorted(self.labels, label))
+        if row < self.count and self.labels[row] == label:
+            return row
+        return -1
+
+    def row_of_id(self, record_id: str) -> int:
+        """Binary search over the rows ordered by record id"""
+        key = record_id.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = int(self.by_id[mid])
+            if self.blob[int(self.offsets[row]):int(self.offsets[row + 1])].tobytes() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            row = int(self.by_id[lo])
+            if self.record_id_at(row) == record_id:
+                return row
+        return -1
+
+    def __getitem__(self, label: int) -> str:
+        row = self.row_of_label(label)
+        if row < 0:
+            raise KeyError(label)
+        return self.record_id_at(row)
+
+    def __iter__(self) -> Iterator[int]:
+        return (int(label) for label in self.labels)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def values(self):
+        return [self.record_id_at(row) for row in range(self.count)]
+
+    def items(self):
+        return [(int(self.labels[row]), self.record_id_at(row)) for row in range(self.count)]
+
+    def to_dicts(self):
+        """Mutable copies: (label -> record id, record id -> content hash)"""
+        id_mapping = dict(self.items())
+        return id_mapping, dict(self.content_hashes.items())
+
+
+class ContentHashView(Mapping):
+    """Read-only record id -> content hash view over an IdTable"""
+
+    def __init__(self, table: IdTable):
+        self.table = table
+
+    def __getitem__(self, record_id: str) -> Optional[str]:
+        row = self.table.row_of_id(record_id)
+        if row < 0:
+            raise KeyError(record_id)
+        return self.table.hashes[row].decode("ascii") or None
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.table.record_id_at(row) for row in range(self.table.count))
+
+    def __len__(self) -> int:
+        return self.table.count
+
+    def items(self):
+        table = self.table
+        return [(table.record_id_at(row), table.hashes[row].decode("ascii") or None) for row in range(table.count)]
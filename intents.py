@@ -0,0 +1,158 @@
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List
+
+# Intent vocabularies: a query has an intent when it contains one of its keywords as a substring
+INTENT_KEYWORDS = {
+    "comprehensive": ["everything", "full info", "all about", "complete details", "full profile"],
+    "summary": ["who is", "tell me about", "what is", "summ", "bio", "intro"],
+    "education": ["stud", "educat", "college", "university", "degree", "school", "graduat"],
+    "career": ["work", "career", "join", "position", "compan", "history"],
+    "role": ["role", "job", "title", "ceo", "founder", "position", "do"],
+    "contribution": ["known for", "did", "contribution", "invent", "create", "make", "built"],
+}
+
+# Query intents tried in order after comprehensive and definition; the first one the record can answer wins
+SPECIFIC_INTENTS = ["summary", "education", "career", "role", "contribution"]
+
+NO_DOCUMENTS_ANSWER = (
+    "I couldn't find any relevant information to answer your question. Please try rephrasing or ask something else."
+)
+NO_SUMMARY_ANSWER = "I found some information but couldn't extract a clear summary."
+
+
+def trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex matching any keyword, shaped as a trie so a failing position is rejected on its first character.
+
+    Where one keyword extends another, the longer one is tried first.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End of a keyword
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return f"(?:{body})?" if len(branches) == 1 else f"{body}?"
+        return body
+
+    return build(trie)
+
+
+class IntentClassifier:
+    """Every intent vocabulary compiled into one regex that finds all keywords in one pass.
+
+    The trie-shaped pattern sits in a lookahead, so the longest keyword
+    starting at each position is reported, overlapping keywords included. A
+    keyword also carries the intents of the keywords that are its prefixes
+    (they match at the same position), so the result equals checking every
+    keyword as a substring.
+    """
+
+    def __init__(self, vocabularies: Dict[str, List[str]] = None):
+        vocabularies = vocabularies or INTENT_KEYWORDS
+        intents_of: Dict[str, set] = {}
+        for intent, keywords in vocabularies.items():
+            for keyword in keywords:
+                intents_of.setdefault(keyword, set()).add(intent)
+
+        self.intents_of: Dict[str, FrozenSet[str]] = {}
+        for keyword in intents_of:
+            covered = set()
+            for other, intents in intents_of.items():
+                if keyword.startswith(other):
+                    covered |= intents
+            self.intents_of[keyword] = frozenset(covered)
+
+        self.pattern = re.compile("(?=(" + trie_pattern(self.intents_of) + "))")
+        # One pattern per intent, for answering: the cascade stops at the first intent that decides
+        self.patterns = {intent: re.compile(trie_pattern(keywords)) for intent, keywords in vocabularies.items()}
+
+    def classify(self, query: str) -> FrozenSet[str]:
+        """Intents whose vocabulary appears in the query"""
+        found = set()
+        for match in self.pattern.finditer(query.lower()):
+            found |= self.intents_of[match.group(1)]
+        return frozenset(found)
+
+    def choose_answer(self, query: str, answers: Dict[str, Any]) -> Any:
+        """Pick a record's pre-rendered answer, testing only the intents the cascade reaches.
+
+        Equal to choose_answer(self.classify(query), answers), but a request for
+        everything or a concept's definition is answered without looking for
+        any other intent.
+        """
+        query = query.lower()
+        if self.patterns["comprehensive"].search(query):
+            return answers["comprehensive"]
+        if "definition" in answers:
+            return answers["definition"]
+        for intent in SPECIFIC_INTENTS:
+            if intent in answers and self.patterns[intent].search(query):
+                return answers[intent]
+        return answers["fallback"]
+
+
+def render_answers(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Answer a record gives for each intent, rendered once.
+
+    Intents the record cannot answer are left out, except "comprehensive"
+    and "fallback", which always have a value.
+    """
+    answers = {}
+
+    parts = []
+    summary = metadata.get('summary') or metadata.get('explanation') or metadata.get('description')
+    if summary:
+        parts.append(summary)
+    if 'education' in metadata:
+        parts.append(f"Education: {metadata['education']}")
+    if 'career' in metadata:
+        parts.append(f"Career: {metadata['career']}")
+    if 'contribution' in metadata:
+        parts.append(f"Contribution: {metadata['contribution']}")
+    if 'role' in metadata:
+        parts.append(f"Role: {metadata['role']} at {metadata.get('company', '')}")
+    answers["comprehensive"] = "\n\n".join(parts)
+
+    # Concepts answer with their definition whatever the question
+    if 'explanation' in metadata:
+        answers["definition"] = metadata['explanation']
+    elif 'description' in metadata:
+        answers["definition"] = metadata['description']
+
+    name = metadata.get('name', 'This entity')
+    summary = metadata.get('summary') or metadata.get('content')
+    if summary:
+        answers["summary"] = summary
+    if metadata.get('education'):
+        answers["education"] = f"{name} studied at {metadata['education']}."
+    if metadata.get('career'):
+        answers["career"] = f"{metadata['career']}"
+    if metadata.get('role'):
+        answers["role"] = f"{name} is the {metadata['role']} of {metadata.get('company')}."
+    if metadata.get('contribution'):
+        answers["contribution"] = f"{name} is known for: {metadata['contribution']}."
+
+    fallback = (
+        metadata.get('summary') or metadata.get('explanation') or metadata.get('description') or metadata.get('content')
+    )
+    answers["fallback"] = fallback or NO_SUMMARY_ANSWER
+    return answers
+
+
+def choose_answer(intents: Iterable[str], answers: Dict[str, Any]) -> Any:
+    """Pick a record's pre-rendered answer for the query intents"""
+    if "comprehensive" in intents:
+        return answers["comprehensive"]
+    if "definition" in answers:
+        return answers["definition"]
+    for intent in SPECIFIC_INTENTS:
+        if intent in intents and intent in answers:
+            return answers[intent]
+    return answers["fallback"]
@@ -0,0 +1,38 @@
+import re
+from typing import List, Optional, Tuple, Dict
+
+# Words too common to help a keyword search; dropping them keeps FTS5 queries short
+STOPWORDS = frozenset("""
+    a about all an and any are as at be been but by can could did do does for from had has have he her him his how
+    i if in into is it its me more my no not of on or our she so some tell than that the their them then there these
+    they this to was we were what when where which who whom why will with would you your
+""".split())
+
+# Constant from the reciprocal rank fusion paper; damps the weight of the very first ranks
+RRF_K = 60
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def query_terms(text: str) -> List[str]:
+    """Distinct lower-cased keywords of a query, in order"""
+    return list(dict.fromkeys(t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS))
+
+
+def fts_query(terms: List[str], require_all: bool = False) -> Optional[str]:
+    """FTS5 MATCH expression for terms (None when there are none).
+
+    Terms are quoted so user input never reaches the FTS5 query syntax.
+    """
+    if not terms:
+        return None
+    return (" AND " if require_all else " OR ").join(f'"{term}"' for term in terms)
+
+
+def reciprocal_rank_fusion(rankings: List[List[Tuple[str, float]]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """Fuse ranked (id, score) lists: each id scores sum(1 / (k + rank)) over the lists it appears in"""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, (record_id, _) in enumerate(ranking, start=1):
+            fused[record_id] = fused.get(record_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
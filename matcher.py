@@ -0,0 +1,152 @@
+import itertools
+import numpy as np
+from rapidfuzz import fuzz, process
+from thefuzz import utils
+from typing import List, Tuple, Optional, Dict
+
+
+def normalize_name(text: str) -> str:
+    """Same preprocessing thefuzz applies before token_set_ratio"""
+    return utils.full_process(text, force_ascii=True)
+
+
+def contains_name(query: str, name: str) -> bool:
+    """Whether every word of name appears in query (token_set_ratio also scores 100 for the reverse)"""
+    name_words = set(normalize_name(name).split())
+    return bool(name_words) and name_words <= set(normalize_name(query).split())
+
+
+def token_grams(tokens: List[str], n: int = 3) -> set:
+    """Character n-grams of each token, padded so short tokens still produce grams"""
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        for i in range(max(1, len(padded) - n + 1)):
+            grams.add(padded[i:i + n])
+    return grams
+
+
+class EntityMatcher:
+    """Prebuilt fuzzy matcher over known entity names.
+
+    Lookups try an exact hash path first (a known name whose words all
+    appear in the query, which token_set_ratio scores 100), then shortlist
+    candidates through
+    a character trigram inverted index and score only the shortlist with
+    token_set_ratio. Scores and the threshold follow
+    thefuzz.process.extractOne(query, names, scorer=fuzz.token_set_ratio).
+    """
+
+    def __init__(self, names: List[Tuple[str, str]], shortlist_size: int = 1024, max_df_ratio: float = 0.05):
+        """names is a list of (name, record_id) pairs, in priority order"""
+        self.shortlist_size = shortlist_size
+        self.names = []       # Original names
+        self.ids = []         # Record id per name
+        self.processed = []   # Normalized names
+        self.exact = {}       # Sorted word set -> position of first occurrence
+        self.max_name_tokens = 1
+
+        postings: Dict[str, List[int]] = {}
+        gram_counts = []
+        for name, record_id in names:
+            processed = normalize_name(name)
+            if not processed.strip():
+                continue
+
+            pos = len(self.names)
+            self.names.append(name)
+            self.ids.append(record_id)
+            self.processed.append(processed)
+
+            tokens = processed.split()
+            key = tuple(sorted(set(tokens)))
+            if key not in self.exact:
+                self.exact[key] = pos
+            self.max_name_tokens = max(self.max_name_tokens, len(key))
+
+            grams = token_grams(tokens)
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(pos)
+
+        self.postings = {gram: np.asarray(p, dtype=np.int32) for gram, p in postings.items()}
+        self.gram_counts = np.asarray(gram_counts, dtype=np.float32)
+
+        # Grams shared by a large share of names carry little signal
+        self.max_df = max(1, int(max_df_ratio * len(self.names)))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _exact_match(self, tokens: List[str], max_query_words: int = 12) -> Optional[int]:
+        """Earliest known name whose words are all contained in the query"""
+        words = sorted(set(tokens))
+        if len(words) > max_query_words:
+            return None  # Too many word subsets to enumerate; use the shortlist
+
+        # Any such name scores 100, and extractOne keeps the first of equal scores
+        best = None
+        for size in range(1, min(len(words), self.max_name_tokens) + 1):
+            for subset in itertools.combinations(words, size):
+                pos = self.exact.get(subset)
+                if pos is not None and (best is None or pos < best):
+                    best = pos
+        return best
+
+    def shortlist(self, tokens: List[str]) -> np.ndarray:
+        """Positions of the names most likely to match, in original order"""
+        lists = []
+        frequent = []
+        for gram in token_grams(tokens):
+            posting = self.postings.get(gram)
+            if posting is None:
+                continue
+            if len(posting) > self.max_df:
+                frequent.append(posting)
+            else:
+                lists.append(posting)
+
+        # Only fall back to very common grams when nothing rarer matched
+        if not lists:
+            lists = frequent
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+
+        candidates, shared = np.unique(np.concatenate(lists), return_counts=True)
+
+        # Rank by how much of each name's grams appear in the query
+        if len(candidates) > self.shortlist_size:
+            containment = shared / self.gram_counts[candidates]
+            top = np.argpartition(-containment, self.shortlist_size - 1)[:self.shortlist_size]
+            candidates = np.sort(candidates[top])
+
+        return candidates
+
+    def match(self, query: str, threshold: float = 80) -> Optional[Tuple[str, str, int]]:
+        """Return (record_id, name, score) of the best match scoring above threshold"""
+        tokens = normalize_name(query).split()
+        if not tokens or not self.names:
+            return None
+
+        # 1. Exact / alias hash path: a contained name scores 100 with token_set_ratio
+        pos = self._exact_match(tokens)
+        if pos is not None:
+            return self.ids[pos], self.names[pos], 100
+
+        # 2. Shortlist through the trigram index, then score only the shortlist
+        candidates = self.shortlist(tokens)
+        if len(candidates) == 0:
+            return None
+
+        choices = [self.processed[i] for i in candidates]
+        result = process.extractOne(" ".join(tokens), choices, scorer=fuzz.token_set_ratio, processor=None)
+        if result is None:
+            return None
+
+        _, score, offset = result
+        score = int(round(score))  # thefuzz reports rounded scores
+        if score <= threshold:
+            return None
+
+        pos = int(candidates[offset])
+        return self.ids[pos], self.names[pos], score
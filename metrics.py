@@ -0,0 +1,100 @@
+import threading
+from bisect import bisect_left
+import time
+from typing import Dict, Any, Hashable, List, Sequence, Tuple
+
+# Default bucket upper bounds for latency histograms (milliseconds)
+LATENCY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+# Default bucket upper bounds for response-size histograms (bytes)
+SIZE_BUCKETS_BYTES = [256, 512, 1024, 2048, 4096, 8192, 16384, 65536, 262144]
+
+# Default bucket upper bounds for batch-size histograms
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Record a single observation"""
+        slot = bisect_left(self.buckets, value)  # First bucket with value <= bound, else +Inf
+        with self._lock:
+            self.counts[slot] += 1
+            self.count += 1
+            self.total += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a consistent copy of the histogram state"""
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            total = self.total
+
+        labels: List[str] = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "count": count,
+            "sum": round(total, 3),
+            "mean": round(total / count, 3) if count else 0.0,
+            "buckets": dict(zip(labels, counts)),
+        }
+
+    def cumulative(self) -> Tuple[List[Tuple[float, int]], int, float]:
+        """(upper bound, observations at or below it) per bucket ending with +Inf, count and sum"""
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            total = self.total
+
+        running = 0
+        buckets = []
+        for bound, n in zip(list(self.buckets) + [float("inf")], counts):
+            running += n
+            buckets.append((bound, running))
+        return buckets, count, total
+
+
+class _Timing:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.histogram.observe((time.perf_counter() - self.started) * 1000)
+
+
+class StageTimer:
+    """Latency histograms (milliseconds) for named pipeline stages, created on first use"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.stages: Dict[Hashable, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: Hashable) -> Histogram:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stages.setdefault(stage, Histogram(self.buckets))
+        return histogram
+
+    def time(self, stage: Hashable) -> _Timing:
+        """Context manager observing the time spent in the block"""
+        return _Timing(self.histogram(stage))
+
+    def observe(self, stage: Hashable, seconds: float):
+        self.histogram(stage).observe(seconds * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {stage: histogram.snapshot() for stage, histogram in list(self.stages.items())}
@@ -0,0 +1,67 @@
+"""
+Prometheus text exposition format (version 0.0.4) for /metrics.
+
+Histograms kept in milliseconds are exported in seconds, following the
+Prometheus naming convention.
+"""
+
+import math
+from typing import Dict, List, Optional
+
+from metrics import Histogram
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Optional[Dict[str, str]], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in (labels or {}).items()]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class PrometheusWriter:
+    """Collects samples; each metric's HELP and TYPE lines are written once, before its first sample"""
+
+    def __init__(self):
+        self.families: Dict[str, List[str]] = {}
+
+    def _family(self, name: str, kind: str, help_text: str) -> List[str]:
+        lines = self.families.get(name)
+        if lines is None:
+            lines = self.families[name] = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        return lines
+
+    def gauge(self, name: str, help_text: str, value: float, labels: Dict[str, str] = None):
+        self._family(name, "gauge", help_text).append(f"{name}{_labels(labels)} {_number(value)}")
+
+    def counter(self, name: str, help_text: str, value: float, labels: Dict[str, str] = None):
+        """name should end in _total"""
+        self._family(name, "counter", help_text).append(f"{name}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name: str, help_text: str, histogram: Histogram, labels: Dict[str, str] = None,
+                  scale: float = 1.0):
+        """Export a Histogram, multiplying bounds and sum by scale (0.001 turns milliseconds into seconds)"""
+        lines = self._family(name, "histogram", help_text)
+        buckets, count, total = histogram.cumulative()
+        for bound, cumulative in buckets:
+            le = "+Inf" if bound == math.inf else _number(round(bound * scale, 9))
+            bucket_labels = _labels(labels, 'le="' + le + '"')
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(round(total * scale, 9))}")
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+
+    def render(self) -> str:
+        return "\n".join(line for lines in self.families.values() for line in lines) + "\n"
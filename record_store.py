@@ -0,0 +1,150 @@
+"""
+Compact in-memory copy of the indexed corpus, aligned with the id table.
+
+Rows are in FAISS label order, the same order as the id table written by
+id_table.py, so a label returned by the index (or derived from a record id
+with embedding.record_label) finds its row with one binary search. Content
+and metadata JSON are kept as UTF-8 bytes in two blobs with offset arrays
+instead of one Python object per record, so a million records cost little
+more than their text.
+"""
+
+import json
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from database import Database
+from embedding import record_label
+
+# Rows fetched from SQLite per query while loading
+LOAD_CHUNK_SIZE = 500
+
+
+class RecordStore:
+    """Content and metadata of indexed records, by FAISS label.
+
+    Records are loaded in label order until the memory budget is used up.
+    Rows past the budget, and records that change in the database after
+    loading, are not resident and fall back to the Database path.
+    """
+
+    def __init__(self, memory_budget: int = 256 * 1024 * 1024):
+        self.memory_budget = memory_budget
+        self.labels = np.empty(0, dtype='int64')           # Sorted FAISS labels, one per row
+        self.resident = np.zeros(0, dtype=bool)             # Row loaded and unchanged since
+        self.content_offsets = np.zeros(1, dtype='uint64')  # Row i is content[offsets[i]:offsets[i + 1]]
+        self.metadata_offsets = np.zeros(1, dtype='uint64')
+        self.content = b""
+        self.metadata = b""  # Compact metadata JSON, decoded on access
+        self.resident_bytes = 0
+        self.load_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, db: Database, record_ids: List[str]):
+        """Load records in label order until the memory budget is used up"""
+        started = time.perf_counter()
+        labels = np.array([record_label(record_id) for record_id in record_ids], dtype='int64')
+        order = np.argsort(labels)
+        labels = labels[order]
+        ordered_ids = [record_ids[i] for i in order]
+
+        count = len(ordered_ids)
+        resident = np.zeros(count, dtype=bool)
+        content_lengths = np.zeros(count, dtype='uint64')
+        metadata_lengths = np.zeros(count, dtype='uint64')
+        content_parts = []
+        metadata_parts = []
+        # Offset arrays and labels are paid for whatever fits
+        resident_bytes = labels.nbytes + 2 * (count + 1) * 8 + count
+        full = False
+
+        for start in range(0, count, LOAD_CHUNK_SIZE):
+            if full:
+                break
+            chunk = ordered_ids[start:start + LOAD_CHUNK_SIZE]
+            by_id = {r['id']: r for r in db.get_records_by_ids(chunk)}
+            for offset, record_id in enumerate(chunk):
+                record = by_id.get(record_id)
+                if record is None:
+                    continue
+                content = record['content'].encode("utf-8")
+                try:
+                    metadata = json.dumps(json.loads(record['metadata']), separators=(",", ":")).encode("utf-8")
+                except:
+                    metadata = b"{}"
+                size = len(content) + len(metadata)
+                if resident_bytes + size > self.memory_budget:
+                    full = True
+                    break
+                row = start + offset
+                resident[row] = True
+                content_lengths[row] = len(content)
+                metadata_lengths[row] = len(metadata)
+                content_parts.append(content)
+                metadata_parts.append(metadata)
+                resident_bytes += size
+
+        content_offsets = np.zeros(count + 1, dtype='uint64')
+        np.cumsum(content_lengths, out=content_offsets[1:])
+        metadata_offsets = np.zeros(count + 1, dtype='uint64')
+        np.cumsum(metadata_lengths, out=metadata_offsets[1:])
+
+        with self._lock:
+            self.labels = labels
+            self.resident = resident
+            self.content_offsets = content_offsets
+            self.metadata_offsets = metadata_offsets
+            self.content = b"".join(content_parts)
+            self.metadata = b"".join(metadata_parts)
+            self.resident_bytes = self.memory_bytes()
+        self.load_seconds = time.perf_counter() - started
+
+        print(f"Record store loaded {int(resident.sum())}/{count} records "
+              f"({self.resident_bytes / 1024 / 1024:.1f} MB) in {self.load_seconds:.2f}s")
+
+    def row_of_label(self, label: int) -> int:
+        """Row of a FAISS label, or -1"""
+        row = int(np.searchsorted(self.labels, label))
+        if row < len(self.labels) and self.labels[row] == label:
+            return row
+        return -1
+
+    def get_row(self, row: int) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(content, parsed metadata) at a row, if resident"""
+        if not (0 <= row < len(self.labels)) or not self.resident[row]:
+            return None
+        content = self.content[int(self.content_offsets[row]):int(self.content_offsets[row + 1])]
+        metadata = self.metadata[int(self.metadata_offsets[row]):int(self.metadata_offsets[row + 1])]
+        return content.decode("utf-8"), json.loads(metadata)
+
+    def get_label(self, label: int) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(content, parsed metadata) of the record with a FAISS label, if resident"""
+        return self.get_row(self.row_of_label(label))
+
+    def get(self, record_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(content, parsed metadata) of a record, if resident"""
+        return self.get_label(record_label(record_id))
+
+    def discard(self, record_id: str):
+        """Drop a record that changed in the database; it falls back to SQLite"""
+        row = self.row_of_label(record_label(record_id))
+        if row >= 0:
+            with self._lock:
+                self.resident[row] = False
+
+    def memory_bytes(self) -> int:
+        return (len(self.content) + len(self.metadata) + self.labels.nbytes + self.resident.nbytes
+                + self.content_offsets.nbytes + self.metadata_offsets.nbytes)
+
+    def stats(self) -> Dict[str, Any]:
+        """Residency and memory usage"""
+        return {
+            "rows": len(self.labels),
+            "resident": int(self.resident.sum()),
+            "resident_bytes": self.resident_bytes,
+            "memory_budget": self.memory_budget,
+            "load_seconds": round(self.load_seconds, 3),
+        }
@@ -1,32 +1,108 @@
+import hashlib
 import json
-from typing import List, Dict, Any
+import logging
+import threading
+import time
+from typing import List, Dict, Any, Tuple
 from database import Database
 from embedding import EmbeddingManager
-from thefuzz import process, fuzz
+from cache import LRUCache, SingleFlight
+from sessions import SessionStore
+from matcher import EntityMatcher, contains_name
+from metrics import Histogram, StageTimer, LATENCY_BUCKETS_MS
+from lexical import query_terms, fts_query, reciprocal_rank_fusion
+from intents import IntentClassifier, render_answers, NO_DOCUMENTS_ANSWER
+
+logger = logging.getLogger(__name__)
+
+# Session used when callers do not supply one (scripts, single-user use). Not printable,
+# so sessions.is_valid_session_id rejects it and no client can read or overwrite it.
+DEFAULT_SESSION = "\0default"
+
+# vector: FAISS only. hybrid: FAISS and FTS5 fused with reciprocal rank fusion.
+# lexical-first: like hybrid, but a confident FTS5 hit answers without running the encoder.
+RETRIEVAL_MODES = ("vector", "hybrid", "lexical-first")
+
+# Candidates taken from each ranking before fusion
+FUSION_CANDIDATES = 20
 
 class RAGSearch:
-    def __init__(self, db: Database, embedding_manager: EmbeddingManager):
+    def __init__(
+        self,
+        db: Database,
+        embedding_manager: EmbeddingManager,
+        answer_cache_size: int = 1024,
+        sessions: SessionStore = None,
+        record_cache_size: int = 4096,
+        retrieval_mode: str = "vector",
+        lexical_margin: float = 1.5,
+        tiered: bool = False,
+        fuzzy_skip_score: int = 90
+    ):
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode {retrieval_mode!r}, expected one of {', '.join(RETRIEVAL_MODES)}")
         self.db = db
         self.embedding_manager = embedding_manager
+        self.retrieval_mode = retrieval_mode
+        # A lexical top hit is confident when it matches every keyword and outscores the runner-up by this factor
+        self.lexical_margin = lexical_margin
+        # Tiered retrieval: an exact entity match, or a fuzzy one scoring at least
+        # fuzzy_skip_score, answers without the vector / lexical search
+        self.tiered = tiered
+        self.fuzzy_skip_score = fuzzy_skip_score
         self.known_names = []
+        self.intent_classifier = IntentClassifier()
         self._load_known_names()
-        self.last_entity = None  # {id, name}
+        
+        # Per-session conversation context: session id -> last entity {id, name}
+        self.sessions = sessions or SessionStore()
+        
+        # Full answer_question results keyed on (data version, resolved query, question)
+        self.answer_cache = LRUCache(answer_cache_size)
+        self._answer_flight = SingleFlight()
+        self._cache_version = self.data_version()
+        self._fingerprint = None  # (data version, data_fingerprint())
+        
+        # Record id -> (content, parsed metadata), dropped when the record changes
+        self.record_cache = LRUCache(record_cache_size)
+        self.db.add_change_listener(self.record_cache.pop)
+        # Record id -> answer per intent (see intents.render_answers), rendered on first use
+        self.record_answers = LRUCache(record_cache_size)
+        self.db.add_change_listener(self.record_answers.pop)
+        
+        # Optional resident corpus (see attach_record_store)
+        self.record_store = None
+        self.store_hits = 0
+        self.store_misses = 0
+        
+        # Per-stage latency (encoding and index search are timed by the embedding manager)
+        self.stage_times = StageTimer()
+        # Per-request time spent in SQLite and in JSON decoding
+        self.sqlite_times = self.stage_times.histogram("sqlite_fetch")
+        self.json_times = self.stage_times.histogram("json_decode")
+        # Whole answer_question calls, answer cache hits included
+        self.answer_times = Histogram(LATENCY_BUCKETS_MS)
+        
+        # Retrieval path -> request count, requests that found documents, latency
+        self.path_stats = {}
+        # Requests per entity-match tier, counted whether or not tiering is on
+        self.tier_counts = {"exact": 0, "fuzzy": 0, "ann": 0}
+        # Guards path_stats, tier_counts and the store hit / miss counts, updated from worker threads
+        self._stats_lock = threading.Lock()
         
     def _load_known_names(self):
         """Load all names from database for fuzzy matching"""
-        records = self.db.get_all_records()
         self.known_names = []
-        for record in records:
-            try:
-                metadata = json.loads(record['metadata'])
-                # Personalities
-                if 'name' in metadata:
-                    self.known_names.append((metadata['name'], record['id']))
-                # Concepts (Titles)
-                if 'title' in metadata:
-                     self.known_names.append((metadata['title'], record['id']))
-            except:
-                continue
+        for record_id, name, title in self.db.get_entity_names():
+            # Personalities
+            if name is not None:
+                self.known_names.append((name, record_id))
+            # Concepts (Titles)
+            if title is not None:
+                self.known_names.append((title, record_id))
+        
+        # Prebuilt index so queries never scan every name
+        self.matcher = EntityMatcher(self.known_names)
 
     def expand_query(self, query: str) -> str:
         """Expand shortcuts to full words"""
@@ -40,50 +116,132 @@ class RAGSearch:
         expanded_words = [shortcuts.get(w.lower(), w) for w in words]
         return " ".join(expanded_words)
                 
-    def retrieve_relevant_documents(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
-        """Retrieve top-k relevant documents for a query with fuzzy matching and context"""
-        
+    @property
+    def last_entity(self) -> Dict[str, Any]:
+        """Last entity discussed in the default session"""
+        return self.sessions.get(DEFAULT_SESSION)
+
+    @last_entity.setter
+    def last_entity(self, entity: Dict[str, Any]):
+        if entity:
+            self.sessions.set(DEFAULT_SESSION, entity)
+        else:
+            self.sessions.delete(DEFAULT_SESSION)
+
+    def data_version(self) -> tuple:
+        """Stamp that changes whenever the records or the index change"""
+        return (self.db.version, self.embedding_manager.version)
+
+    def data_fingerprint(self) -> str:
+        """Like data_version, but the same in every process serving the same data, and across restarts"""
+        version = self.data_version()
+        if self._fingerprint is None or self._fingerprint[0] != version:
+            key = json.dumps([
+                self.db.fingerprint(), self.embedding_manager.fingerprint(),
+                self.retrieval_mode, self.lexical_margin, self.tiered, self.fuzzy_skip_score
+            ])
+            self._fingerprint = (version, hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest())
+        return self._fingerprint[1]
+
+    def has_pronoun(self, query: str) -> bool:
+        """Check whether a query refers back to a previous entity"""
+        query_lower = query.lower()
+        pronouns = ["he", "she", "it", "they", "him", "her", "his", "this", "that"]
+        return any(f" {p} " in f" {query_lower} " for p in pronouns) or \
+               any(query_lower.startswith(f"{p} ") for p in pronouns)
+
+    def resolve_query(self, query: str, session_id: str = None) -> str:
+        """Expand shortcuts and rewrite pronouns using the session's conversation context"""
         # Expand shortcuts
         query = self.expand_query(query)
         
-        query_lower = query.lower()
-        pronouns = ["he", "she", "it", "they", "him", "her", "his", "this", "that"]
-        has_pronoun = any(f" {p} " in f" {query_lower} " for p in pronouns) or \
-                      any(query_lower.startswith(f"{p} ") for p in pronouns)
+        # Context Handling
+        if self.has_pronoun(query):
+            last_entity = self.sessions.get(session_id or DEFAULT_SESSION)
+            if last_entity:
+                # If we have a context, we should PRIORITIZE it.
+                # We can either force the ID if we are sure, or just append the name to the query.
+                # Appending the name is safer for "his education" -> "education Sundar Pichai" which works well with vector search.
+                query = f"{query} {last_entity['name']}"
+        
+        return query
+                
+    def retrieve_relevant_documents(self, query: str, top_k: int = 3, session_id: str = None) -> List[Dict[str, Any]]:
+        """Retrieve top-k relevant documents for a query with fuzzy matching and context"""
+        with self.stage_times.time("resolve_query"):
+            resolved = self.resolve_query(query, session_id)
+        documents = self._retrieve_resolved(resolved, top_k)
+        self._remember_entity(documents, session_id)
+        return documents
+
+    def _retrieve_resolved(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Retrieve documents for a query that has already been resolved"""
+        started = time.perf_counter()
+        forced_id, tier = self._match_entity(query)
+            
+        # 3. Vector / lexical search, unless the entity match already answers
+        # Context is already appended to query if needed above
+        if self.tiered and tier != "ann":
+            path, results = tier, []
+        else:
+            path, results = self._search(query, top_k)
+        
+        final_results = self._combine(forced_id, results, top_k)
+        self._record_path(path, time.perf_counter() - started, bool(final_results))
         
+        return self.fetch_documents(final_results)
+    
+    def _retrieve_resolved_batch(self, queries: List[str], top_k: int) -> List[List[Dict[str, Any]]]:
+        """_retrieve_resolved for many queries: one encode, one index search and one record fetch.
+
+        Latency is recorded per query as its share of the batch time.
+        """
+        started = time.perf_counter()
+        matches = [self._match_entity(query) for query in queries]
+        searched = [i for i, (_, tier) in enumerate(matches) if not (self.tiered and tier != "ann")]
+        searches = self._search_batch([queries[i] for i in searched], top_k)
+        
+        hits = []
+        paths = []
+        for forced_id, tier in matches:
+            hits.append(self._combine(forced_id, [], top_k))
+            paths.append(tier)
+        for i, (path, results) in zip(searched, searches):
+            hits[i] = self._combine(matches[i][0], results, top_k)
+            paths[i] = path
+        
+        parsed = self._parse_records([record_id for query_hits in hits for record_id, _ in query_hits])
+        documents = [self._documents(query_hits, parsed) for query_hits in hits]
+        
+        seconds = (time.perf_counter() - started) / max(1, len(queries))
+        for path, query_hits in zip(paths, hits):
+            self._record_path(path, seconds, bool(query_hits))
+        return documents
+    
+    def _match_entity(self, query: str) -> Tuple[str, str]:
+        """Record id of the entity named in the query (or None) and its tier: exact, fuzzy or ann"""
         forced_id = None
         
-        # 1. Context Handling
-        if has_pronoun and self.last_entity:
-            # If we have a context, we should PRIORITIZE it.
-            # We can either force the ID if we are sure, or just append the name to the query.
-            # Appending the name is safer for "his education" -> "education Sundar Pichai" which works well with vector search.
-            query = f"{query} {self.last_entity['name']}"
-            
         # 2. Fuzzy Name Matching
-        names_only = [n[0] for n in self.known_names]
-        fuzzy_match_id = None
-        
-        if names_only:
-            match_name, score = process.extractOne(query, names_only, scorer=fuzz.token_set_ratio)
-            
-            if score > 80:
-                print(f"Fuzzy match found: {match_name} ({score}%)")
-                for name, rid in self.known_names:
-                    if name == match_name:
-                        fuzzy_match_id = rid
-                        break
-        
-        if fuzzy_match_id:
-            forced_id = fuzzy_match_id
-            
-        # 3. Vector Search
-        search_query = query
-        # Context is already appended to query if needed above
-              
-        results = self.embedding_manager.search(search_query, k=top_k)
+        with self.stage_times.time("entity_match"):
+            match = self.matcher.match(query, threshold=80)
         
-        # Combine results
+        tier = "ann"
+        if match:
+            forced_id, match_name, score = match
+            logger.debug("Entity match: %s (%s%%)", match_name, score)
+            # token_set_ratio scores 100 when either word set contains the other, so a
+            # query naming only part of an entity ("sundar") is at best a fuzzy match
+            if score >= 100 and contains_name(query, match_name):
+                tier = "exact"
+            elif score >= self.fuzzy_skip_score:
+                tier = "fuzzy"
+        with self._stats_lock:
+            self.tier_counts[tier] += 1
+        return forced_id, tier
+    
+    def _combine(self, forced_id: str, results: List[Tuple[str, float]], top_k: int) -> List[Tuple[str, float]]:
+        """The entity match first, then the search results, without duplicates"""
         final_results = []
         seen_ids = set()
         
@@ -96,24 +254,147 @@ class RAGSearch:
                 final_results.append((rid, s))
                 seen_ids.add(rid)
         
-        final_results = final_results[:top_k]
+        return final_results[:top_k]
+    
+    def _search(self, query: str, top_k: int) -> Tuple[str, List[Tuple[str, float]]]:
+        """Ranked (record id, score) hits and the retrieval path that produced them"""
+        if self.retrieval_mode == "vector":
+            return "vector", self.embedding_manager.search(query, k=top_k)
         
-        documents = []
-        for record_id, score in final_results:
-            record = self.db.get_record_by_id(record_id)
-            if record:
+        lexical, matches_all = self._search_lexical(query_terms(query))
+        if self.retrieval_mode == "lexical-first" and matches_all and self._confident_lexical(lexical):
+            return "lexical", lexical[:top_k]
+        
+        vector = self.embedding_manager.search(query, k=max(top_k, FUSION_CANDIDATES))
+        return self._fuse(vector, lexical, top_k)
+    
+    def _search_batch(self, queries: List[str], top_k: int) -> List[Tuple[str, List[Tuple[str, float]]]]:
+        """_search for many queries, with every vector search done in one search_batch call"""
+        if not queries:
+            return []
+        if self.retrieval_mode == "vector":
+            return [("vector", results) for results in self.embedding_manager.search_batch(queries, k=top_k)]
+        
+        searches = [None] * len(queries)
+        lexical_hits = {}
+        for i, query in enumerate(queries):
+            lexical, matches_all = self._search_lexical(query_terms(query))
+            if self.retrieval_mode == "lexical-first" and matches_all and self._confident_lexical(lexical):
+                searches[i] = ("lexical", lexical[:top_k])
+            else:
+                lexical_hits[i] = lexical
+        
+        pending = list(lexical_hits)
+        vectors = self.embedding_manager.search_batch([queries[i] for i in pending], k=max(top_k, FUSION_CANDIDATES))
+        for i, vector in zip(pending, vectors):
+            searches[i] = self._fuse(vector, lexical_hits[i], top_k)
+        return searches
+    
+    @staticmethod
+    def _fuse(vector: List[Tuple[str, float]], lexical: List[Tuple[str, float]], top_k: int) -> Tuple[str, List[Tuple[str, float]]]:
+        if not lexical:
+            return "vector", vector[:top_k]
+        return "hybrid", reciprocal_rank_fusion([vector, lexical])[:top_k]
+    
+    def _search_lexical(self, terms: List[str]) -> Tuple[List[Tuple[str, float]], bool]:
+        """BM25 hits for records matching every keyword, or any keyword when none match all.
+
+        The second value tells whether the hits match every keyword. Trying AND
+        first keeps FTS5 from scoring every record that shares one common word.
+        """
+        if not terms:
+            return [], False
+        with self.stage_times.time("lexical_search"):
+            hits = self.db.search_lexical(fts_query(terms, require_all=True), FUSION_CANDIDATES)
+            if hits or len(terms) == 1:
+                return hits, True
+            return self.db.search_lexical(fts_query(terms), FUSION_CANDIDATES), False
+    
+    def _confident_lexical(self, hits: List[Tuple[str, float]]) -> bool:
+        """Whether the top lexical hit clearly outscores the next one"""
+        if not hits:
+            return False
+        return len(hits) == 1 or hits[0][1] >= self.lexical_margin * hits[1][1]
+    
+    def _record_path(self, path: str, seconds: float, found: bool):
+        with self._stats_lock:
+            stats = self.path_stats.get(path)
+            if stats is None:
+                stats = self.path_stats[path] = {"requests": 0, "hits": 0, "latency": Histogram(LATENCY_BUCKETS_MS)}
+            stats["requests"] += 1
+            stats["hits"] += found
+        stats["latency"].observe(seconds * 1000)
+    
+    def attach_record_store(self, store):
+        """Serve resident records from an in-memory RecordStore instead of SQLite"""
+        self.record_store = store
+        self.db.add_change_listener(store.discard)
+    
+    def fetch_documents(self, hits: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+        """Materialize (record id, score) hits into documents with parsed metadata"""
+        return self._documents(hits, self._parse_records([record_id for record_id, _ in hits]))
+    
+    def _parse_records(self, record_ids: List[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """Record id -> (content, parsed metadata), from the cache, the record store or one SQLite query"""
+        parsed = {}
+        missing = []
+        for record_id in dict.fromkeys(record_ids):
+            cached = self.record_cache.get(record_id)
+            if cached is not None:
+                parsed[record_id] = cached
+                continue
+            
+            # The store replaces SQLite behind the record cache, so hot records are decoded once
+            if self.record_store:
+                stored = self.record_store.get(record_id)
+                with self._stats_lock:
+                    if stored is None:
+                        self.store_misses += 1
+                    else:
+                        self.store_hits += 1
+                if stored is not None:
+                    parsed[record_id] = stored
+                    self.record_cache.put(record_id, stored)
+                    continue
+            missing.append(record_id)
+        
+        sqlite_seconds = json_seconds = 0.0
+        if missing:
+            started = time.perf_counter()
+            records = self.db.get_records_by_ids(missing)
+            decoded_at = time.perf_counter()
+            sqlite_seconds = decoded_at - started
+            
+            for record in records:
                 try:
                     original_data = json.loads(record['metadata'])
                 except:
                     original_data = {}
-                
+                parsed[record['id']] = (record['content'], original_data)
+                self.record_cache.put(record['id'], parsed[record['id']])
+            json_seconds = time.perf_counter() - decoded_at
+        
+        self.sqlite_times.observe(sqlite_seconds * 1000)
+        self.json_times.observe(json_seconds * 1000)
+        return parsed
+    
+    @staticmethod
+    def _documents(hits: List[Tuple[str, float]], parsed: Dict[str, Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        documents = []
+        for record_id, score in hits:
+            if record_id in parsed:
+                content, original_data = parsed[record_id]
                 documents.append({
                     'id': record_id,
-                    'content': record['content'],
+                    'content': content,
                     'score': score,
                     'metadata': original_data
                 })
                 
+        return documents
+    
+    def _remember_entity(self, documents: List[Dict[str, Any]], session_id: str = None):
+        """Update the session's conversation context from the top document"""
         if documents:
             top_doc = documents[0]
             md = top_doc['metadata']
@@ -121,115 +402,70 @@ class RAGSearch:
             
             # ALWAYS update context if we found a valid entity
             if files_name:
-                self.last_entity = {
+                self.sessions.set(session_id or DEFAULT_SESSION, {
                     'id': top_doc['id'],
                     'name': files_name
-                }
-        
-        return documents
+                })
     
     def generate_answer(self, query: str, documents: List[Dict[str, Any]]) -> str:
         """Generate answer from retrieved documents with intent detection"""
         if not documents:
-            return "I couldn't find any relevant information to answer your question. Please try rephrasing or ask something else."
+            return NO_DOCUMENTS_ANSWER
         
         top_doc = documents[0]
-        metadata = top_doc['metadata']
-        query_lower = query.lower()
+        answers = self.record_answers.get(top_doc['id'])
+        if answers is None:
+            answers = render_answers(top_doc['metadata'])
+            self.record_answers.put(top_doc['id'], answers)
+        return self.intent_classifier.choose_answer(query, answers)
 
-        # 1. Comprehensive Intent ("Everything", "Full Info")
-        # STRICT "Everything" keywords
-        comprehensive_keywords = ["everything", "full info", "all about", "complete details", "full profile"]
-        is_comprehensive = any(k in query_lower for k in comprehensive_keywords)
-        
-        # If specific questions like "who is X and what did he do", that implies comprehensive too.
-        
-        if is_comprehensive:
-             # Gather available fields
-             parts = []
-             
-             # Summary
-             summary = metadata.get('summary') or metadata.get('explanation') or metadata.get('description')
-             if summary: parts.append(summary)
-             
-             # Education
-             if 'education' in metadata:
-                 parts.append(f"Education: {metadata['education']}")
-                 
-             # Career
-             if 'career' in metadata:
-                 parts.append(f"Career: {metadata['career']}")
-                 
-             # Contribution
-             if 'contribution' in metadata:
-                 parts.append(f"Contribution: {metadata['contribution']}")
-                 
-             # Role
-             if 'role' in metadata:
-                 parts.append(f"Role: {metadata['role']} at {metadata.get('company', '')}")
-                 
-             return "\n\n".join(parts)
-
-        # 2. Concept/Definition (Java/Python) -> Direct text, NO TITLE
-        if 'explanation' in metadata:
-             return metadata['explanation']
-        if 'description' in metadata:
-             return metadata['description']
-
-        # 3. Summary/Identity Intent ("Who is", "Tell me about")
-        summary_keywords = ["who is", "tell me about", "what is", "summ", "bio", "intro"]
-        if any(k in query_lower for k in summary_keywords):
-            summary = metadata.get('summary') or metadata.get('content')
-            if summary:
-                return summary
-             
-        # 3. Specific Intent for Personalities
-        name = metadata.get('name', 'This entity')
-        
-        # Education
-        education_keywords = ["stud", "educat", "college", "university", "degree", "school", "graduat"]
-        if any(k in query_lower for k in education_keywords):
-            education = metadata.get('education')
-            if education:
-                return f"{name} studied at {education}."
-                
-        # Career
-        career_keywords = ["work", "career", "join", "position", "compan", "history"]
-        if any(k in query_lower for k in career_keywords):
-            career = metadata.get('career')
-            if career:
-                return f"{career}"
-                
-        # Role
-        role_keywords = ["role", "job", "title", "ceo", "founder", "position", "do"]
-        if any(k in query_lower for k in role_keywords):
-            role = metadata.get('role')
-            company = metadata.get('company')
-            if role:
-                return f"{name} is the {role} of {company}."
-
-        # Contribution
-        contrib_keywords = ["known for", "did", "contribution", "invent", "create", "make", "built"]
-        if any(k in query_lower for k in contrib_keywords):
-            contribution = metadata.get('contribution')
-            if contribution:
-                 return f"{name} is known for: {contribution}."
-        
-        # Fallback to general summary fields
-        fallback = metadata.get('summary') or metadata.get('explanation') or metadata.get('description') or metadata.get('content')
-        if not fallback:
-             return "I found some information but couldn't extract a clear summary."
-             
-        return fallback
-
-    def answer_question(self, question: str) -> Dict[str, Any]:
-        """Complete RAG pipeline: retrieve and generate answer"""
+    def answer_question(self, question: str, session_id: str = None, use_context: bool = True) -> Dict[str, Any]:
+        """Complete RAG pipeline: retrieve and generate answer.
+
+        With use_context=False the question neither reads nor updates any
+        session's conversation context.
+        """
+        started = time.perf_counter()
+        with self.stage_times.time("resolve_query"):
+            resolved = self.resolve_query(question, session_id) if use_context else self.expand_query(question)
+        
+        # Drop stale answers as soon as the data or index changes
+        version = self.data_version()
+        if version != self._cache_version:
+            self.answer_cache.clear()
+            self._cache_version = version
+        
+        # Intent detection reads the raw question, so it is part of the key too
+        key = (version, resolved.lower(), question.lower())
+        result = self.answer_cache.get(key)
+        if result is None:
+            result = self._answer_flight.do(key, lambda: self._answer_resolved(key, question, resolved))
+        
+        if use_context:
+            self._remember_entity(result['sources'], session_id)
+        self.answer_times.observe((time.perf_counter() - started) * 1000)
+        return {
+            'answer': result['answer'],
+            'sources': list(result['sources'])
+        }
+    
+    def _answer_resolved(self, key: tuple, question: str, resolved: str) -> Dict[str, Any]:
+        # Another caller may have filled the cache while we waited to lead
+        cached = self.answer_cache.get(key, record_miss=False)
+        if cached is not None:
+            return cached
+        
         # Retrieve relevant documents
-        documents = self.retrieve_relevant_documents(question, top_k=5)
+        documents = self._retrieve_resolved(resolved, top_k=5)
         
         # Generate answer
-        answer = self.generate_answer(question, documents)
-        
+        result = self._result(question, documents)
+        self.answer_cache.put(key, result)
+        return result
+
+    def _result(self, question: str, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        with self.stage_times.time("generate_answer"):
+            answer = self.generate_answer(question, documents)
         return {
             'answer': answer,
             'sources': [
@@ -241,3 +477,108 @@ class RAGSearch:
                 for doc in documents[:3]
             ]
         }
+
+    def answer_batch(self, questions: List[str], session_ids: List[str] = None) -> List[Dict[str, Any]]:
+        """answer_question for many questions, in input order, with retrieval batched.
+
+        A question without a session id is answered without conversation
+        context. Questions sharing a session are answered in order: a repeated
+        session starts a new round, so each question sees the context left by
+        the previous one, as it would through answer_question.
+        """
+        session_ids = session_ids or [None] * len(questions)
+        results = [None] * len(questions)
+        round_items = []
+        round_sessions = set()
+        for i, session_id in enumerate(session_ids):
+            if session_id is not None and session_id in round_sessions:
+                self._answer_round(round_items, questions, session_ids, results)
+                round_items, round_sessions = [], set()
+            round_items.append(i)
+            if session_id is not None:
+                round_sessions.add(session_id)
+        self._answer_round(round_items, questions, session_ids, results)
+        return results
+
+    def _answer_round(self, items: List[int], questions: List[str], session_ids: List[str], results: List[Dict[str, Any]]):
+        """Answer questions from distinct sessions, retrieving every cache miss in one batch"""
+        version = self.data_version()
+        if version != self._cache_version:
+            self.answer_cache.clear()
+            self._cache_version = version
+        
+        keys = {}
+        found = {}  # key -> result, kept here since a large round can evict its own cache entries
+        misses = {}  # key -> (question, resolved) of the first question with that key
+        for i in items:
+            question = questions[i]
+            if session_ids[i] is None:
+                resolved = self.expand_query(question)
+            else:
+                resolved = self.resolve_query(question, session_ids[i])
+            key = keys[i] = (version, resolved.lower(), question.lower())
+            if key in found or key in misses:
+                continue
+            cached = self.answer_cache.get(key)
+            if cached is None:
+                misses[key] = (question, resolved)
+            else:
+                found[key] = cached
+        
+        if misses:
+            documents = self._retrieve_resolved_batch([resolved for _, resolved in misses.values()], top_k=5)
+            for (key, (question, _)), docs in zip(misses.items(), documents):
+                found[key] = self._result(question, docs)
+                self.answer_cache.put(key, found[key])
+        
+        for i in items:
+            result = found[keys[i]]
+            if session_ids[i] is not None:
+                self._remember_entity(result['sources'], session_ids[i])
+            results[i] = {'answer': result['answer'], 'sources': list(result['sources'])}
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Answer cache counters"""
+        stats = self.answer_cache.stats()
+        stats.update(self._answer_flight.stats())
+        return stats
+
+    def fetch_stats(self) -> Dict[str, Any]:
+        """Record cache counters and per-request SQLite / JSON decoding time"""
+        with self._stats_lock:
+            store_hits, store_misses = self.store_hits, self.store_misses
+        return {
+            'record_store': dict(
+                self.record_store.stats(),
+                hits=store_hits,
+                misses=store_misses
+            ) if self.record_store else None,
+            'record_cache': self.record_cache.stats(),
+            'answer_render_cache': self.record_answers.stats(),
+            'sqlite_ms': self.sqlite_times.snapshot(),
+            'json_ms': self.json_times.snapshot()
+        }
+
+    def retrieval_counters(self) -> Tuple[Dict[str, int], Dict[str, Dict[str, Any]]]:
+        """Consistent copies of tier_counts and path_stats (each path's latency histogram is shared)"""
+        with self._stats_lock:
+            return dict(self.tier_counts), {path: dict(stats) for path, stats in self.path_stats.items()}
+
+    def retrieval_stats(self) -> Dict[str, Any]:
+        """Requests per entity-match tier, and requests, hit rate and latency of each retrieval path"""
+        tiers, path_stats = self.retrieval_counters()
+        paths = {}
+        for path, stats in path_stats.items():
+            requests = stats["requests"]
+            paths[path] = {
+                "requests": requests,
+                "hits": stats["hits"],
+                "hit_rate": round(stats["hits"] / requests, 4) if requests else 0.0,
+                "latency_ms": stats["latency"].snapshot()
+            }
+        return {
+            "mode": self.retrieval_mode,
+            "tiered": self.tiered,
+            "tiers": tiers,
+            "paths": paths
+        }
@@ -0,0 +1,132 @@
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Longest client-supplied session id we accept
+MAX_SESSION_ID_LENGTH = 64
+
+
+def new_session_id() -> str:
+    """Generate a fresh random session id"""
+    return uuid.uuid4().hex
+
+
+def is_valid_session_id(session_id: Optional[str]) -> bool:
+    """Accept short printable ids only, so clients cannot bloat the store"""
+    return bool(session_id) and len(session_id) <= MAX_SESSION_ID_LENGTH and session_id.isprintable()
+
+
+class _Shard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # session id -> (context, last_seen)
+
+
+class SessionStore:
+    """Sharded, bounded store of per-session conversation context.
+
+    Each shard has its own lock, so concurrent conversations only contend
+    when their ids hash to the same shard. Sessions expire after ttl seconds
+    of inactivity and the least recently used ones are evicted once a shard
+    holds max_sessions / shards entries, which bounds total memory.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl: float = 1800.0, shards: int = 16):
+        self.shards = [_Shard() for _ in range(max(1, shards))]
+        self.max_per_shard = max(1, max_sessions // len(self.shards))
+        self.max_sessions = self.max_per_shard * len(self.shards)
+        self.ttl = ttl
+        self._stats_lock = threading.Lock()
+
+        # Counters
+        self.evictions = 0
+        self.expirations = 0
+
+    def _shard(self, session_id: str) -> _Shard:
+        return self.shards[zlib.crc32(session_id.encode("utf-8")) % len(self.shards)]
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the stored context for a session, if still alive"""
+        shard = self._shard(session_id)
+        now = time.monotonic()
+        with shard.lock:
+            entry = shard.entries.get(session_id)
+            if entry is None:
+                return None
+            context, last_seen = entry
+            if self.ttl and now - last_seen > self.ttl:
+                del shard.entries[session_id]
+                self._count(expirations=1)
+                return None
+            shard.entries[session_id] = (context, now)
+            shard.entries.move_to_end(session_id)
+            return context
+
+    def set(self, session_id: str, context: Dict[str, Any]):
+        """Store the context for a session, evicting old sessions if needed"""
+        shard = self._shard(session_id)
+        now = time.monotonic()
+        expired = evicted = 0
+        with shard.lock:
+            shard.entries[session_id] = (context, now)
+            shard.entries.move_to_end(session_id)
+
+            # Expired sessions sit at the front, so trimming from there is cheap
+            while shard.entries:
+                oldest_id, (_, last_seen) = next(iter(shard.entries.items()))
+                if self.ttl and now - last_seen > self.ttl:
+                    expired += 1
+                elif len(shard.entries) > self.max_per_shard:
+                    evicted += 1
+                else:
+                    break
+                del shard.entries[oldest_id]
+
+        if expired or evicted:
+            self._count(expirations=expired, evictions=evicted)
+
+    def delete(self, session_id: str):
+        """Forget a session"""
+        shard = self._shard(session_id)
+        with shard.lock:
+            shard.entries.pop(session_id, None)
+
+    def _count(self, expirations: int = 0, evictions: int = 0):
+        with self._stats_lock:
+            self.expirations += expirations
+            self.evictions += evictions
+
+    def purge_expired(self):
+        """Drop expired sessions from every shard"""
+        if not self.ttl:
+            return
+        expired = 0
+        for shard in self.shards:
+            with shard.lock:
+                now = time.monotonic()
+                while shard.entries:
+                    oldest_id, (_, last_seen) = next(iter(shard.entries.items()))
+                    if now - last_seen <= self.ttl:
+                        break
+                    del shard.entries[oldest_id]
+                    expired += 1
+        if expired:
+            self._count(expirations=expired)
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self.shards)
+
+    def stats(self) -> Dict[str, Any]:
+        """Active-session count and eviction counters"""
+        self.purge_expired()
+        return {
+            "active_sessions": len(self),
+            "max_sessions": self.max_sessions,
+            "shards": len(self.shards),
+            "ttl": self.ttl,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
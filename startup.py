@@ -0,0 +1,63 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List
+
+# Stage states reported by /ready
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+class StartupTracker:
+    """Thread-safe status and timing of the start-up stages.
+
+    The background warm-up thread moves each stage through
+    pending -> running -> done (or failed); /ready reads a snapshot.
+    """
+
+    def __init__(self, stages: List[str]):
+        self.started = time.perf_counter()
+        self.stages = {name: {"status": PENDING, "seconds": None} for name in stages}
+        self.error = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage and record whether it completed"""
+        with self._lock:
+            self.stages[name]["status"] = RUNNING
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                self.stages[name].update(status=FAILED, seconds=round(time.perf_counter() - started, 3))
+                self.error = f"{name}: {e}"
+            raise
+        with self._lock:
+            self.stages[name].update(status=DONE, seconds=round(time.perf_counter() - started, 3))
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return all(stage["status"] == DONE for stage in self.stages.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: dict(stage) for name, stage in self.stages.items()}
+            error = self.error
+        return {
+            "ready": all(stage["status"] == DONE for stage in stages.values()),
+            "stages": stages,
+            "error": error,
+            "uptime_seconds": round(time.perf_counter() - self.started, 3),
+        }
+
+    def report(self, import_seconds: float):
+        """Print the import and stage timings"""
+        snapshot = self.snapshot()
+        print("Startup timing:")
+        print(f"   {'app imports':<12} {import_seconds:8.3f}s")
+        for name, stage in snapshot["stages"].items():
+            seconds = f"{stage['seconds']:8.3f}s" if stage["seconds"] is not None else " " * 9
+            print(f"   {name:<12} {seconds}  {stage['status']}")
+        print(f"   {'total':<12} {snapshot['uptime_seconds']:8.3f}s")
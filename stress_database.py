@@ -0,0 +1,106 @@
+"""
+Multi-threaded stress test for Database.
+
+Reader threads hammer get_record_by_id / get_records_by_ids / count_records
+while a writer inserts new records. Checks that every read returns the
+right record, that counts never go backwards for a reader, and that no
+thread raises.
+
+Usage: python stress_database.py [--readers 8] [--seconds 5] [--seed-records 1000]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from database import Database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--seed-records", type=int, default=1000)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "stress.db")
+    db = Database(db_path)
+    db.connect()
+    db.create_table()
+    for i in range(args.seed_records):
+        db.insert_record(f"seed_{i}", f"content {i}", json.dumps({"name": f"Seed {i}"}))
+
+    stop = threading.Event()
+    errors = []
+    reads = [0] * args.readers
+    writes = [0]
+
+    def reader(slot):
+        rng = random.Random(slot)
+        last_count = 0
+        try:
+            while not stop.is_set():
+                i = rng.randrange(args.seed_records)
+                record = db.get_record_by_id(f"seed_{i}")
+                if record is None or record['content'] != f"content {i}":
+                    raise AssertionError(f"seed_{i} returned {record}")
+
+                ids = [f"seed_{rng.randrange(args.seed_records)}" for _ in range(5)]
+                if [r['id'] for r in db.get_records_by_ids(ids)] != ids:
+                    raise AssertionError(f"bulk fetch out of order for {ids}")
+
+                count = db.count_records()
+                if count < last_count:
+                    raise AssertionError(f"count went backwards: {last_count} -> {count}")
+                last_count = count
+                reads[slot] += 3
+        except Exception as e:
+            errors.append(f"reader {slot}: {e!r}")
+            stop.set()
+
+    def writer():
+        try:
+            while not stop.is_set():
+                n = writes[0]
+                db.insert_record(f"new_{n}", f"new content {n}", json.dumps({"name": f"New {n}"}))
+                writes[0] += 1
+        except Exception as e:
+            errors.append(f"writer: {e!r}")
+            stop.set()
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads.append(threading.Thread(target=writer))
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    expected = args.seed_records + writes[0]
+    final = db.count_records()
+    db.close()
+
+    print(f"{args.readers} readers, 1 writer, {elapsed:.1f}s")
+    print(f"Reads:  {sum(reads):,} ({sum(reads) / elapsed:,.0f}/s)")
+    print(f"Writes: {writes[0]:,} ({writes[0] / elapsed:,.0f}/s)")
+    print(f"Final count {final:,} (expected {expected:,})")
+
+    if final != expected:
+        errors.append(f"final count {final} != {expected}")
+    if errors:
+        print("FAILED")
+        for error in errors:
+            print(f"  {error}")
+        raise SystemExit(1)
+    print("PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Synthetic corpus generator shaped like data/*.json.
+
+Produces a deterministic mix of tech personalities (name, education, career,
+company, role, contribution, summary, keywords) and Java/Python concepts
+(title, concept, explanation, usage, keywords) for benchmarks, plus a
+HashingEncoder that stands in for the sentence-transformer model.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+FIRST = ["Ada", "Alan", "Grace", "Linus", "Guido", "James", "Sundar", "Satya", "Jensen", "Lisa",
+         "Margaret", "Dennis", "Ken", "Bjarne", "Anders", "Barbara", "Frances", "Radia", "Tim", "Vint"]
+LAST = ["Lovelace", "Turing", "Hopper", "Torvalds", "Rossum", "Gosling", "Pichai", "Nadella", "Huang", "Su",
+        "Hamilton", "Ritchie", "Thompson", "Stroustrup", "Hejlsberg", "Liskov", "Allen", "Perlman", "Lee", "Cerf"]
+SYLLABLES = ["an", "bel", "cor", "da", "el", "fin", "gar", "hal", "is", "jo", "kar", "lin",
+             "mar", "nor", "os", "pet", "quin", "ros", "sam", "tor", "ul", "ven", "wil", "yan", "zed"]
+SCHOOLS = ["Stanford University", "MIT", "IIT Kharagpur", "Carnegie Mellon University", "University of Cambridge",
+           "Oregon State University", "University of Helsinki", "Harvard University", "ETH Zurich"]
+DEGREES = ["Bachelor's in Computer Science", "Master's in Electrical Engineering", "PhD in Mathematics", "MBA"]
+COMPANIES = ["Google", "Microsoft", "NVIDIA", "AMD", "Apple", "Meta", "Amazon", "IBM", "Oracle", "Intel"]
+ROLES = ["CEO", "CTO", "Founder", "Chief Scientist", "Distinguished Engineer", "VP of Engineering"]
+PRODUCTS = ["search engine", "operating system", "GPU architecture", "programming language", "cloud platform",
+            "database engine", "web browser", "compiler", "machine learning framework"]
+LANGUAGES = ["Java", "Python"]
+TOPICS = ["garbage collection", "list comprehension", "decorators", "generics", "streams", "closures",
+          "context managers", "interfaces", "exceptions", "threads", "iterators", "annotations",
+          "lambdas", "modules", "collections", "inheritance", "polymorphism", "serialization"]
+
+
+def _person_name(rng: random.Random, idx: int) -> str:
+    if rng.random() < 0.5:
+        return f"{rng.choice(FIRST)} {rng.choice(LAST)} {idx}"
+    first = "".join(rng.choice(SYLLABLES) for _ in range(2)).capitalize()
+    last = "".join(rng.choice(SYLLABLES) for _ in range(3)).capitalize()
+    return f"{first} {last}"
+
+
+def make_personality(rng: random.Random, idx: int) -> Dict[str, Any]:
+    name = _person_name(rng, idx)
+    company = rng.choice(COMPANIES)
+    role = rng.choice(ROLES)
+    product = rng.choice(PRODUCTS)
+    school = rng.choice(SCHOOLS)
+    return {
+        "id": f"SYN_TP{idx:07d}",
+        "category": "Tech Personality",
+        "name": name,
+        "education": f"{school} ({rng.choice(DEGREES)})",
+        "career": f"{name} joined {company} in {rng.randint(1985, 2020)} and led work on the {product}. "
+                  f"Later became {role} of {company}.",
+        "company": company,
+        "role": role,
+        "contribution": f"Led the development of the {company} {product}",
+        "summary": f"{name} is the {role} of {company}, known for work on the {product}. "
+                   f"Studied at {school} and is an influential technology leader.",
+        "keywords": [role, company, product, school.split()[0]],
+    }
+
+
+def make_concept(rng: random.Random, idx: int) -> Dict[str, Any]:
+    language = rng.choice(LANGUAGES)
+    topic = rng.choice(TOPICS)
+    prefix = "JV" if language == "Java" else "PY"
+    return {
+        "id": f"SYN_{prefix}{idx:07d}",
+        "category": language,
+        "title": f"What is {language} {topic} #{idx}?",
+        "concept": topic.title(),
+        "explanation": f"{topic.capitalize()} in {language} is a core language feature. "
+                       f"It helps developers write clearer and safer programs by structuring code around {topic}. "
+                       f"Variant {idx} covers edge cases and common pitfalls.",
+        "usage": f"{topic.capitalize()} is used throughout {language} applications.",
+        "keywords": [language, topic, "programming"],
+    }
+
+
+def generate_records(count: int, seed: int = 7, personality_ratio: float = 0.2) -> Iterator[Dict[str, Any]]:
+    """Yield count synthetic records, deterministic for a given seed"""
+    rng = random.Random(seed)
+    for idx in range(count):
+        if rng.random() < personality_ratio:
+            yield make_personality(rng, idx)
+        else:
+            yield make_concept(rng, idx)
+
+
+def write_corpus(folder: str, count: int, seed: int = 7, chunk_size: int = 100000) -> int:
+    """Write a synthetic corpus as {"data": [...]} JSON files that DataLoader can read"""
+    os.makedirs(folder, exist_ok=True)
+    chunk = []
+    files = 0
+    for record in generate_records(count, seed):
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            with open(os.path.join(folder, f"synthetic_{files:04d}.json"), "w", encoding="utf-8") as f:
+                json.dump({"data": chunk}, f)
+            files += 1
+            chunk = []
+    if chunk:
+        with open(os.path.join(folder, f"synthetic_{files:04d}.json"), "w", encoding="utf-8") as f:
+            json.dump({"data": chunk}, f)
+        files += 1
+    return files
+
+
+class HashingEncoder:
+    """Deterministic stand-in for SentenceTransformer with the same encode() shape.
+
+    Each word and word bigram adds +/-1 to a few hashed dimensions, so texts
+    that share vocabulary get similar vectors. Needs no model download and is
+    fast enough to embed millions of synthetic records.
+    """
+
+    TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+    def __init__(self, dimension: int = 384, hashes_per_token: int = 4):
+        self.dimension = dimension
+        self.hashes_per_token = hashes_per_token
+        self._slots = {}  # token -> (dimensions, signs)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def _token_slots(self, token: str):
+        slots = self._slots.get(token)
+        if slots is None:
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=4 * self.hashes_per_token).digest()
+            values = np.frombuffer(digest, dtype=np.uint32)
+            slots = (values % self.dimension, np.where(values & (1 << 31), 1.0, -1.0).astype('float32'))
+            self._slots[token] = slots
+        return slots
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype='float32')
+        for row, text in enumerate(texts):
+            words = self.TOKEN_RE.findall(text.lower())
+            for token in words + [a + " " + b for a, b in zip(words, words[1:])]:
+                dims, signs = self._token_slots(token)
+                np.add.at(vectors[row], dims, signs)
+        return vectors
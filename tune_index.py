@@ -0,0 +1,172 @@
+"""
+Tune the FAISS index type for a corpus: recall@k against exact (flat) search,
+single-query p50/p99 latency, memory and build time for flat, IVF-Flat, HNSW
+and IVF-PQ over a grid of parameters.
+
+Queries are the opening words of sampled records, so every query has a true
+neighbourhood in the corpus. A returned record counts towards recall when its
+exact score reaches the k-th exact score, so ties between near-duplicate
+records are not counted as misses. The fastest configuration that reaches
+--min-recall is printed as RAG_INDEX_* environment variables.
+
+Usage:
+    python tune_index.py                           # real corpus in data/, real model
+    python tune_index.py --stub-encoder            # real corpus, HashingEncoder
+    python tune_index.py --synthetic 100000        # synthetic corpus, HashingEncoder
+    python tune_index.py --synthetic 100000 --json tune_results.json
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+
+import faiss
+import numpy as np
+
+from data_loader import DataLoader
+from synthetic_data import HashingEncoder, generate_records
+from vector_index import create_index, apply_search_params, index_memory_bytes, describe
+
+# Search-time values swept for each built index
+NPROBE_VALUES = [1, 4, 16, 64]
+EF_SEARCH_VALUES = [16, 32, 64, 128, 256]
+
+
+def load_corpus(args):
+    loader = DataLoader(args.data)
+    if args.synthetic:
+        records = generate_records(args.synthetic)
+        name = f"synthetic-{args.synthetic}"
+    else:
+        records = loader.load_json_files()
+        name = args.data
+    return name, [loader.prepare_content(r) for r in records]
+
+
+def load_encoder(args):
+    if args.stub_encoder or args.synthetic:
+        return HashingEncoder()
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(args.model)
+
+
+def encode(encoder, texts, batch_size=4096):
+    chunks = []
+    for start in range(0, len(texts), batch_size):
+        chunks.append(np.asarray(encoder.encode(texts[start:start + batch_size]), dtype='float32'))
+    vectors = np.vstack(chunks)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def candidates(n: int):
+    """(index_type, build params) pairs to try for a corpus of n vectors"""
+    nlist = max(1, int(4 * math.sqrt(n)))
+    return [
+        ("flat", {}),
+        ("ivf_flat", {"nlist": nlist}),
+        ("hnsw", {"M": 16}),
+        ("hnsw", {"M": 32}),
+        ("ivf_pq", {"nlist": nlist, "pq_m": 48}),
+        ("ivf_pq", {"nlist": nlist, "pq_m": 96}),
+    ]
+
+
+def search_settings(index_type: str, params):
+    if index_type in ("ivf_flat", "ivf_pq"):
+        return [{"nprobe": p} for p in NPROBE_VALUES if p <= params["nlist"]]
+    if index_type == "hnsw":
+        return [{"ef_search": ef} for ef in EF_SEARCH_VALUES]
+    return [{}]
+
+
+def measure(index, vectors, queries, kth_scores, k):
+    latencies = []
+    recalls = []
+    for query, kth in zip(queries, kth_scores):
+        started = time.perf_counter()
+        _, labels = index.search(query.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        labels = labels[0][labels[0] >= 0]
+        exact = vectors[labels] @ query
+        recalls.append(np.count_nonzero(exact >= kth - 1e-5) / k)
+    return float(np.mean(recalls)), float(np.percentile(latencies, 50)), float(np.percentile(latencies, 99))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic records instead of --data")
+    parser.add_argument("--stub-encoder", action="store_true", help="Use HashingEncoder instead of the model")
+    parser.add_argument("--model", default="paraphrase-MiniLM-L3-v2")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    name, texts = load_corpus(args)
+    encoder = load_encoder(args)
+    started = time.perf_counter()
+    vectors = encode(encoder, texts)
+    print(f"Corpus {name}: {len(texts):,} records encoded in {time.perf_counter() - started:.1f}s")
+
+    rng = random.Random(0)
+    sample = rng.sample(range(len(texts)), min(args.queries, len(texts)))
+    queries = encode(encoder, [" ".join(texts[i].split()[:8]) for i in sample])
+    labels = np.arange(len(vectors), dtype='int64')
+
+    results = []
+    kth_scores = None
+    for index_type, build_params in candidates(len(vectors)):
+        started = time.perf_counter()
+        index, params = create_index(index_type, vectors.shape[1], build_params, vectors)
+        index.add_with_ids(vectors, labels)
+        build_seconds = time.perf_counter() - started
+        memory = index_memory_bytes(index)
+
+        if kth_scores is None:
+            # The first candidate is flat: exact results are the reference
+            kth_scores = index.search(queries, args.k)[0][:, -1]
+
+        for setting in search_settings(index_type, params):
+            params.update(setting)
+            apply_search_params(index, index_type, params)
+            recall, p50, p99 = measure(index, vectors, queries, kth_scores, args.k)
+            results.append({
+                "index_type": index_type,
+                "params": dict(params),
+                f"recall_at_{args.k}": round(recall, 4),
+                "p50_ms": round(p50, 4),
+                "p99_ms": round(p99, 4),
+                "memory_mb": round(memory / 1024 / 1024, 2),
+                "build_seconds": round(build_seconds, 2),
+            })
+            print(f"{describe(index_type, params):<60} recall@{args.k} {recall:.3f}  "
+                  f"p50 {p50:.3f}ms  p99 {p99:.3f}ms  {memory / 1024 / 1024:8.1f}MB  build {build_seconds:.1f}s")
+
+    eligible = [r for r in results if r[f"recall_at_{args.k}"] >= args.min_recall]
+    best = min(eligible, key=lambda r: r["p50_ms"]) if eligible else None
+    if best:
+        print(f"\nFastest configuration with recall@{args.k} >= {args.min_recall}: "
+              f"{describe(best['index_type'], best['params'])}")
+        env_names = {"nlist": "RAG_INDEX_NLIST", "nprobe": "RAG_INDEX_NPROBE", "M": "RAG_INDEX_HNSW_M",
+                     "ef_search": "RAG_INDEX_EF_SEARCH", "pq_m": "RAG_INDEX_PQ_M"}
+        print(f"  RAG_INDEX_TYPE={best['index_type']}")
+        for key, value in best["params"].items():
+            if key in env_names:
+                print(f"  {env_names[key]}={value}")
+    else:
+        print(f"\nNo configuration reached recall@{args.k} >= {args.min_recall}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"corpus": name, "records": len(texts), "queries": len(queries), "k": args.k,
+                       "results": results, "recommended": best}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
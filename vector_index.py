@@ -0,0 +1,172 @@
+"""
+FAISS index factory for the index types EmbeddingManager can build.
+
+Every index scores by inner product on L2-normalized vectors (cosine
+similarity) and is addressed by stable record labels: IVF indexes store the
+labels themselves, flat and HNSW indexes are wrapped in IndexIDMap2.
+"""
+
+import math
+from typing import Any, Dict, Tuple
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq", "sq8", "fp16", "pq")
+
+# Types that keep lossy codes instead of float32 vectors; pair them with re-ranking
+COMPRESSED_TYPES = ("ivf_pq", "sq8", "fp16", "pq")
+
+DEFAULT_PARAMS = {
+    "flat": {},
+    "ivf_flat": {"nlist": 1024, "nprobe": 16},
+    "hnsw": {"M": 32, "ef_construction": 200, "ef_search": 64},
+    "ivf_pq": {"nlist": 1024, "nprobe": 16, "pq_m": 48, "pq_nbits": 8},
+    "sq8": {},
+    "fp16": {},
+    "pq": {"pq_m": 48, "pq_nbits": 8},
+}
+
+# FAISS wants roughly this many training points per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+# Larger corpora are trained on a random sample of this size
+MAX_TRAINING_VECTORS = 200000
+
+
+def resolve_params(index_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Defaults for index_type overridden by params; params of other index types are ignored"""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r} (expected one of {', '.join(INDEX_TYPES)})")
+
+    known = set().union(*DEFAULT_PARAMS.values())
+    resolved = dict(DEFAULT_PARAMS[index_type])
+    for key, value in (params or {}).items():
+        if key not in known:
+            raise ValueError(f"Unknown index parameter {key!r}")
+        if key in resolved and value is not None:
+            resolved[key] = int(value)
+    return resolved
+
+
+def is_ivf(index_type: str) -> bool:
+    return index_type in ("ivf_flat", "ivf_pq")
+
+
+def needs_training(index_type: str) -> bool:
+    return index_type not in ("flat", "hnsw")
+
+
+def supports_removal(index_type: str) -> bool:
+    """HNSW graphs cannot drop vectors; they are rebuilt instead"""
+    return index_type != "hnsw"
+
+
+def _fit_to_data(index_type: str, dimension: int, params: Dict[str, Any], n: int) -> Dict[str, Any]:
+    """Shrink parameters that the training set (n vectors) or dimension cannot support"""
+    fitted = dict(params)
+    if "nlist" in fitted:
+        fitted["nlist"] = max(1, min(fitted["nlist"], n // MIN_POINTS_PER_CENTROID))
+        fitted["nprobe"] = min(fitted["nprobe"], fitted["nlist"])
+    if "pq_m" in fitted:
+        # Sub-quantizers must split the vector evenly
+        fitted["pq_m"] = max(m for m in range(1, min(fitted["pq_m"], dimension) + 1) if dimension % m == 0)
+        # Each sub-quantizer needs at least 2^nbits training points
+        fitted["pq_nbits"] = max(1, min(fitted["pq_nbits"], int(math.log2(max(n, 2)))))
+    if fitted != params:
+        changes = ", ".join(f"{k}={params[k]}->{fitted[k]}" for k in fitted if fitted[k] != params[k])
+        print(f"Adjusted {index_type} parameters for {n} training vectors: {changes}")
+    return fitted
+
+
+def create_index(
+    index_type: str, dimension: int, params: Dict[str, Any], training_vectors: np.ndarray
+) -> Tuple[faiss.Index, Dict[str, Any]]:
+    """Create an empty, trained index of the given type that accepts add_with_ids.
+
+    Returns the index together with the parameters actually used, which may
+    be smaller than requested when there is too little training data.
+    """
+    params = resolve_params(index_type, params)
+    if needs_training(index_type):
+        if len(training_vectors) > MAX_TRAINING_VECTORS:
+            rows = np.random.default_rng(0).choice(len(training_vectors), MAX_TRAINING_VECTORS, replace=False)
+            training_vectors = training_vectors[np.sort(rows)]
+        params = _fit_to_data(index_type, dimension, params, len(training_vectors))
+
+    metric = faiss.METRIC_INNER_PRODUCT
+    if index_type == "flat":
+        inner = faiss.IndexFlatIP(dimension)
+    elif index_type == "hnsw":
+        inner = faiss.IndexHNSWFlat(dimension, params["M"], metric)
+        inner.hnsw.efConstruction = params["ef_construction"]
+    elif index_type == "ivf_flat":
+        quantizer = faiss.IndexFlatIP(dimension)
+        inner = faiss.IndexIVFFlat(quantizer, dimension, params["nlist"], metric)
+    elif index_type == "ivf_pq":
+        quantizer = faiss.IndexFlatIP(dimension)
+        inner = faiss.IndexIVFPQ(quantizer, dimension, params["nlist"], params["pq_m"], params["pq_nbits"], metric)
+    elif index_type == "sq8":
+        inner = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, metric)
+    elif index_type == "fp16":
+        inner = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, metric)
+    else:
+        inner = faiss.IndexPQ(dimension, params["pq_m"], params["pq_nbits"], metric)
+
+    if needs_training(index_type):
+        inner.train(np.ascontiguousarray(training_vectors, dtype='float32'))
+
+    if is_ivf(index_type):
+        # IVF lists keep their own ids; IndexIDMap2 would lose track of them on remove_ids
+        inner.set_direct_map_type(faiss.DirectMap.Hashtable)
+        index = inner
+    else:
+        index = faiss.IndexIDMap2(inner)
+    apply_search_params(index, index_type, params)
+    return index, params
+
+
+def apply_search_params(index: faiss.Index, index_type: str, params: Dict[str, Any]):
+    """Set query-time knobs (nprobe, efSearch) on an index built by create_index"""
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if is_ivf(index_type):
+        inner.nprobe = params["nprobe"]
+    elif index_type == "hnsw":
+        inner.hnsw.efSearch = params["ef_search"]
+
+
+def mmap_io_flags(index_type: str) -> int:
+    """read_index flags that map an index file instead of copying it into memory"""
+    if is_ivf(index_type):
+        return faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY  # Inverted lists are mapped
+    return faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY  # Flat codes (and HNSW storage) are mapped
+
+
+def index_memory_bytes(index: faiss.Index) -> int:
+    """Serialized size of an index, a close proxy for its resident memory"""
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def estimate_memory_bytes(index_type: str, params: Dict[str, Any], ntotal: int, dimension: int) -> int:
+    """Rough resident size without serializing the index (vectors, codes, graph and id maps)"""
+    size = ntotal * 8 * 6  # Label arrays and hash maps (IndexIDMap2 or the IVF direct map)
+    if index_type in ("ivf_pq", "pq"):
+        size += ntotal * -(-params["pq_m"] * params["pq_nbits"] // 8)
+        size += (2 ** params["pq_nbits"]) * dimension * 4  # PQ centroids
+    elif index_type == "sq8":
+        size += ntotal * dimension
+    elif index_type == "fp16":
+        size += ntotal * dimension * 2
+    else:
+        size += ntotal * dimension * 4
+    if is_ivf(index_type):
+        size += params["nlist"] * dimension * 4 + ntotal * 8  # Coarse centroids, inverted list ids
+    if index_type == "hnsw":
+        size += ntotal * params["M"] * 2 * 4 * 1.1  # Level-0 links plus upper levels
+    return int(size)
+
+
+def describe(index_type: str, params: Dict[str, Any]) -> str:
+    if not params:
+        return index_type
+    return index_type + "(" + ", ".join(f"{k}={v}" for k, v in params.items()) + ")"
@@ -0,0 +1,143 @@
+"""
+Full-precision vectors kept beside a compressed FAISS index.
+
+A compressed index (SQ8, fp16, PQ) shortlists candidates from its codes;
+rerank() then rescores the shortlist with exact inner products read from a
+VectorStore. The store is saved as two .npy files (vectors and labels) and
+loaded memory-mapped, so only the rows touched by re-ranking become resident.
+"""
+
+import os
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Rows copied per step when writing a store to disk
+SAVE_CHUNK_ROWS = 65536
+
+
+def store_paths(index_path: str) -> Tuple[str, str]:
+    """Vector and label files stored next to an index file"""
+    base = os.path.splitext(index_path)[0]
+    return base + ".vectors.npy", base + ".labels.npy"
+
+
+class VectorStore:
+    """Normalized float32 vectors addressed by FAISS label.
+
+    Rows loaded from disk stay memory-mapped; rows added later live in an
+    in-memory tail until the next save rewrites the files. Added chunks are
+    only concatenated into the tail when rows are read, so repeated adds
+    cost their own size rather than a copy of everything added before.
+    """
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.base = np.empty((0, dimension), dtype='float32')  # Possibly a read-only memmap
+        self.tail = np.empty((0, dimension), dtype='float32')  # Rows added since the last save
+        self.pending: List[np.ndarray] = []  # Chunks added after tail was last concatenated
+        self.tail_rows = 0  # Rows in tail and pending
+        self._tail_lock = threading.Lock()  # Concurrent searches may concatenate at once
+        self.row_of: Dict[int, int] = {}  # Label -> row across base and tail
+
+    def __len__(self):
+        return len(self.row_of)
+
+    def add(self, labels: np.ndarray, vectors: np.ndarray):
+        first = len(self.base) + self.tail_rows
+        vectors = np.array(vectors, dtype='float32').reshape(-1, self.dimension)
+        with self._tail_lock:
+            self.pending.append(vectors)
+            self.tail_rows += len(vectors)
+        for offset, label in enumerate(labels):
+            self.row_of[int(label)] = first + offset
+
+    def remove(self, labels: np.ndarray):
+        """Forget labels; their rows are dropped from disk on the next save"""
+        for label in labels:
+            self.row_of.pop(int(label), None)
+
+    def _concatenate_pending(self):
+        if not self.pending:
+            return
+        with self._tail_lock:
+            if self.pending:
+                self.tail = np.concatenate([self.tail] + self.pending)
+                self.pending = []
+
+    def _take(self, rows: np.ndarray) -> np.ndarray:
+        """Vectors at row positions (-1 gives a row of zeros)"""
+        self._concatenate_pending()
+        out = np.zeros((len(rows), self.dimension), dtype='float32')
+        in_base = (rows >= 0) & (rows < len(self.base))
+        in_tail = rows >= len(self.base)
+        if in_base.any():
+            out[in_base] = self.base[rows[in_base]]
+        if in_tail.any():
+            out[in_tail] = self.tail[rows[in_tail] - len(self.base)]
+        return out
+
+    def get(self, labels: np.ndarray) -> np.ndarray:
+        """Vectors for labels (rows of zeros for unknown labels)"""
+        return self._take(np.array([self.row_of.get(int(label), -1) for label in labels], dtype='int64'))
+
+    def memory_bytes(self) -> int:
+        """Bytes held in RAM (memory-mapped rows are excluded)"""
+        base = 0 if isinstance(self.base, np.memmap) else self.base.nbytes
+        return base + self.tail.nbytes + sum(chunk.nbytes for chunk in self.pending)
+
+    def save(self, index_path: str):
+        """Write live rows to .npy files beside index_path"""
+        vectors_path, labels_path = store_paths(index_path)
+        labels = np.fromiter(self.row_of.keys(), dtype='int64', count=len(self.row_of))
+        rows = np.fromiter(self.row_of.values(), dtype='int64', count=len(self.row_of))
+        order = np.argsort(rows)
+        labels, rows = labels[order], rows[order]
+
+        # Copy in chunks into a new file, then swap it in (the old file may be mapped)
+        tmp_path = vectors_path + ".tmp"
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype='float32', shape=(len(rows), self.dimension))
+        for start in range(0, len(rows), SAVE_CHUNK_ROWS):
+            out[start:start + SAVE_CHUNK_ROWS] = self._take(rows[start:start + SAVE_CHUNK_ROWS])
+        out.flush()
+        del out
+        os.replace(tmp_path, vectors_path)
+        np.save(labels_path, labels)
+
+        self._open(vectors_path, labels)
+
+    def load(self, index_path: str, mmap: bool = True) -> bool:
+        """Load a saved store; returns False when there is none"""
+        vectors_path, labels_path = store_paths(index_path)
+        if not (os.path.exists(vectors_path) and os.path.exists(labels_path)):
+            return False
+        self._open(vectors_path, np.load(labels_path), mmap)
+        return True
+
+    def _open(self, vectors_path: str, labels: np.ndarray, mmap: bool = True):
+        self.base = np.load(vectors_path, mmap_mode='r' if mmap else None)
+        self.tail = np.empty((0, self.dimension), dtype='float32')
+        self.pending = []
+        self.tail_rows = 0
+        self.row_of = {int(label): row for row, label in enumerate(labels)}
+
+
+def rerank(
+    store: VectorStore, queries: np.ndarray, candidates: np.ndarray, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Rescore candidate labels (one row per query, -1 = empty) with exact inner products.
+
+    Returns (scores, labels) of shape (len(queries), k), padded with -inf / -1.
+    """
+    scores = np.full((len(queries), k), -np.inf, dtype='float32')
+    labels = np.full((len(queries), k), -1, dtype='int64')
+    for row, (query, shortlist) in enumerate(zip(queries, candidates)):
+        shortlist = shortlist[shortlist >= 0]
+        if not len(shortlist):
+            continue
+        exact = store.get(shortlist) @ query
+        top = np.argsort(-exact)[:k]
+        scores[row, :len(top)] = exact[top]
+        labels[row, :len(top)] = shortlist[top]
+    return scores, labels
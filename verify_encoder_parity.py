@@ -0,0 +1,79 @@
+"""
+Check that the ONNX encoder backends embed like the torch SentenceTransformer.
+
+Sampled records from data/ and short queries made from their opening words
+are encoded with every backend. For each ONNX backend the script reports the
+cosine similarity to the torch vector of the same text (mean, 1st percentile
+and minimum), and how many of each query's top-k records (searched among the
+torch record vectors) agree with the torch query. It exits with status 1 when
+the minimum cosine of any backend is below its threshold.
+
+Usage:
+    python verify_encoder_parity.py
+    python verify_encoder_parity.py --backends onnx-int8 --min-cosine-int8 0.98
+"""
+
+import argparse
+import random
+import sys
+
+import numpy as np
+
+from data_loader import DataLoader
+from encoders import load_encoder
+
+
+def normalized(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype='float32')
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-(queries @ corpus.T), axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--model", default="paraphrase-MiniLM-L3-v2")
+    parser.add_argument("--backends", default="onnx,onnx-int8")
+    parser.add_argument("--samples", type=int, default=500, help="Records (and as many queries) to compare")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--min-cosine", type=float, default=0.999, help="Threshold for the fp32 ONNX backend")
+    parser.add_argument("--min-cosine-int8", type=float, default=0.98, help="Threshold for the int8 backend")
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data)
+    texts = [loader.prepare_content(r) for r in loader.load_json_files()]
+    if not texts:
+        sys.exit(f"No records found in {args.data}")
+    sample = random.Random(0).sample(texts, min(args.samples, len(texts)))
+    queries = [" ".join(text.split()[:8]) for text in sample]
+
+    reference = load_encoder(args.model, "torch")
+    ref_docs = normalized(reference.encode(sample))
+    ref_queries = normalized(reference.encode(queries))
+    ref_top = top_k(ref_queries, ref_docs, args.k)
+
+    failed = False
+    for backend in args.backends.split(","):
+        encoder = load_encoder(args.model, backend)
+        docs = normalized(encoder.encode(sample))
+        query_vectors = normalized(encoder.encode(queries))
+
+        cosines = np.concatenate([(docs * ref_docs).sum(axis=1), (query_vectors * ref_queries).sum(axis=1)])
+        backend_top = top_k(query_vectors, ref_docs, args.k)
+        overlap = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(backend_top, ref_top)])
+
+        threshold = args.min_cosine_int8 if backend.endswith("int8") else args.min_cosine
+        ok = cosines.min() >= threshold
+        failed |= not ok
+        print(f"{backend:<10} cosine mean {cosines.mean():.5f}  p1 {np.percentile(cosines, 1):.5f}  "
+              f"min {cosines.min():.5f} (>= {threshold})  top-{args.k} overlap {overlap:.3f}  "
+              f"{'OK' if ok else 'FAIL'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Check that pre-rendered intent answers match the original keyword cascade.
+
+reference_answer() below is generate_answer as it was before answers were
+rendered per record: a chain of any(keyword in query) checks that builds the
+answer from the metadata on every request. For every record in data/ and a
+set of questions covering each intent keyword (alone, combined, inside
+other words and next to each other), the script compares it with
+RAGSearch.generate_answer. It also compares IntentClassifier with the
+per-keyword checks, times both answer paths, and exits with status 1 on any
+mismatch.
+
+Usage: python verify_intent_parity.py [--data data] [--questions 300]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from data_loader import DataLoader
+from intents import INTENT_KEYWORDS, IntentClassifier, render_answers, choose_answer
+
+
+def reference_answer(query, documents):
+    """The original generate_answer"""
+    if not documents:
+        return "I couldn't find any relevant information to answer your question. Please try rephrasing or ask something else."
+
+    top_doc = documents[0]
+    metadata = top_doc['metadata']
+    query_lower = query.lower()
+
+    comprehensive_keywords = ["everything", "full info", "all about", "complete details", "full profile"]
+    if any(k in query_lower for k in comprehensive_keywords):
+        parts = []
+        summary = metadata.get('summary') or metadata.get('explanation') or metadata.get('description')
+        if summary: parts.append(summary)
+        if 'education' in metadata:
+            parts.append(f"Education: {metadata['education']}")
+        if 'career' in metadata:
+            parts.append(f"Career: {metadata['career']}")
+        if 'contribution' in metadata:
+            parts.append(f"Contribution: {metadata['contribution']}")
+        if 'role' in metadata:
+            parts.append(f"Role: {metadata['role']} at {metadata.get('company', '')}")
+        return "\n\n".join(parts)
+
+    if 'explanation' in metadata:
+        return metadata['explanation']
+    if 'description' in metadata:
+        return metadata['description']
+
+    summary_keywords = ["who is", "tell me about", "what is", "summ", "bio", "intro"]
+    if any(k in query_lower for k in summary_keywords):
+        summary = metadata.get('summary') or metadata.get('content')
+        if summary:
+            return summary
+
+    name = metadata.get('name', 'This entity')
+
+    education_keywords = ["stud", "educat", "college", "university", "degree", "school", "graduat"]
+    if any(k in query_lower for k in education_keywords):
+        education = metadata.get('education')
+        if education:
+            return f"{name} studied at {education}."
+
+    career_keywords = ["work", "career", "join", "position", "compan", "history"]
+    if any(k in query_lower for k in career_keywords):
+        career = metadata.get('career')
+        if career:
+            return f"{career}"
+
+    role_keywords = ["role", "job", "title", "ceo", "founder", "position", "do"]
+    if any(k in query_lower for k in role_keywords):
+        role = metadata.get('role')
+        company = metadata.get('company')
+        if role:
+            return f"{name} is the {role} of {company}."
+
+    contrib_keywords = ["known for", "did", "contribution", "invent", "create", "make", "built"]
+    if any(k in query_lower for k in contrib_keywords):
+        contribution = metadata.get('contribution')
+        if contribution:
+            return f"{name} is known for: {contribution}."
+
+    fallback = metadata.get('summary') or metadata.get('explanation') or metadata.get('description') or metadata.get('content')
+    if not fallback:
+        return "I found some information but couldn't extract a clear summary."
+    return fallback
+
+
+def make_questions(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    keywords = [k for words in INTENT_KEYWORDS.values() for k in words]
+    questions = ["", "hello", "Who Is Sundar Pichai", "DOCKER", "studied", "todo", "whois", "jobdone"]
+    questions += [f"tell me {k} please" for k in keywords]
+    questions += [f"x{k}y" for k in keywords]  # Inside other words
+    for _ in range(count):
+        picked = rng.sample(keywords, rng.randint(2, 4))
+        joiner = rng.choice([" ", "", " and "])  # "" puts keywords right next to each other
+        questions.append(joiner.join(picked).upper() if rng.random() < 0.2 else joiner.join(picked))
+    return questions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--questions", type=int, default=300, help="Random keyword combinations to add")
+    args = parser.parse_args()
+
+    records = DataLoader(args.data).load_json_files()
+    metadata = [dict(r) for r in records] + [{}, {"name": "Nobody"}, {"explanation": None}]
+    questions = make_questions(args.questions)
+    classifier = IntentClassifier()
+
+    intent_mismatches = 0
+    for question in questions:
+        expected = {intent for intent, words in INTENT_KEYWORDS.items() if any(k in question.lower() for k in words)}
+        if classifier.classify(question) != expected:
+            intent_mismatches += 1
+            print(f"intent mismatch for {question!r}: {sorted(classifier.classify(question))} != {sorted(expected)}")
+
+    rendered = [render_answers(md) for md in metadata]
+    answer_mismatches = 0
+    reference_seconds = compiled_seconds = 0.0
+    for md, answers in zip(metadata, rendered):
+        documents = [{'id': md.get('id'), 'metadata': md}]
+        for question in questions:
+            started = time.perf_counter()
+            expected = reference_answer(question, documents)
+            reference_seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            actual = classifier.choose_answer(question, answers)
+            compiled_seconds += time.perf_counter() - started
+            # The cascade must also agree with choosing from the full set of intents
+            if actual != expected or actual != choose_answer(classifier.classify(question), answers):
+                answer_mismatches += 1
+                if answer_mismatches <= 10:
+                    print(f"answer mismatch for record {md.get('id')} and {question!r}")
+
+    checks = len(metadata) * len(questions)
+    print(f"{len(questions)} questions x {len(metadata)} records = {checks} answers")
+    print(f"Intent mismatches: {intent_mismatches}")
+    print(f"Answer mismatches: {answer_mismatches}")
+    print(f"Keyword cascade: {reference_seconds * 1e6 / checks:.2f} us per answer")
+    print(f"Compiled intents + pre-rendered answers: {compiled_seconds * 1e6 / checks:.2f} us per answer")
+    sys.exit(1 if intent_mismatches or answer_mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Compare tiered retrieval against the current behaviour (always run the
+vector search, then pin the entity match first).
+
+Questions are built from the entity names and titles in data/: exact names,
+lower-cased names, names with a typo, and a few generic questions. Each one is
+answered by two RAGSearch instances over the same database and index, one
+with tiered=False and one with tiered=True. The script reports how often the
+answers and the top source agree, requests per tier, and retrieval latency
+per path. It exits with status 1 if any answer differs.
+
+Usage:
+    python verify_tiered_parity.py                  # real model
+    python verify_tiered_parity.py --stub-encoder   # HashingEncoder
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from data_loader import DataLoader
+from database import Database
+from embedding import EmbeddingManager
+from encoders import STUB_MODEL
+from search import RAGSearch
+
+PERSON_TEMPLATES = ["{name} education", "who is {name}", "what did {name} create", "{name} career", "{name} role"]
+CONCEPT_TEMPLATES = ["what is {name}", "explain {name}", "{name}"]
+GENERIC_QUESTIONS = [
+    "how does garbage collection work",
+    "difference between list and tuple",
+    "who founded a search engine company",
+    "what is the JVM",
+]
+
+
+def with_typo(name: str, rng: random.Random) -> str:
+    """Drop one letter from the longest word"""
+    words = name.split()
+    longest = max(range(len(words)), key=lambda i: len(words[i]))
+    word = words[longest]
+    if len(word) > 4:
+        cut = rng.randrange(1, len(word) - 1)
+        words[longest] = word[:cut] + word[cut + 1:]
+    return " ".join(words)
+
+
+def make_questions(records, count: int, seed: int = 0):
+    rng = random.Random(seed)
+    questions = list(GENERIC_QUESTIONS)
+    for record in rng.sample(records, min(count, len(records))):
+        name = record.get('name') or record.get('title')
+        if not name:
+            continue
+        templates = PERSON_TEMPLATES if 'name' in record else CONCEPT_TEMPLATES
+        template = rng.choice(templates)
+        questions.append(template.format(name=name))
+        questions.append(template.format(name=name.lower()))
+        questions.append(template.format(name=with_typo(name, rng)))
+    return questions
+
+
+def run(search: RAGSearch, questions):
+    """Answer every question in its own session; returns results and total seconds"""
+    results = []
+    started = time.perf_counter()
+    for i, question in enumerate(questions):
+        results.append(search.answer_question(question, session_id=f"parity-{i}"))
+    return results, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--stub-encoder", action="store_true", help="Use HashingEncoder instead of the model")
+    parser.add_argument("--model", default="paraphrase-MiniLM-L3-v2")
+    parser.add_argument("--records", type=int, default=300, help="Records to build questions from")
+    parser.add_argument("--fuzzy-skip-score", type=int, default=90)
+    args = parser.parse_args()
+
+    loader = DataLoader(args.data)
+    records = loader.load_json_files()
+    db = Database(os.path.join(tempfile.mkdtemp(), "parity.db"))
+    db.connect()
+    db.create_table()
+    db.insert_records((r['id'], loader.prepare_content(r), json.dumps(r)) for r in records)
+
+    embedding_manager = EmbeddingManager(model_name=STUB_MODEL if args.stub_encoder else args.model)
+    embedding_manager.build_index_from_database(db)
+    questions = make_questions(records, args.records)
+
+    current = RAGSearch(db, embedding_manager)
+    tiered = RAGSearch(db, embedding_manager, tiered=True, fuzzy_skip_score=args.fuzzy_skip_score)
+    baseline, baseline_seconds = run(current, questions)
+    candidate, tiered_seconds = run(tiered, questions)
+
+    answer_mismatches = []
+    top_matches = 0
+    for question, old, new in zip(questions, baseline, candidate):
+        if old['answer'] != new['answer']:
+            answer_mismatches.append(question)
+        old_top = old['sources'][0]['id'] if old['sources'] else None
+        new_top = new['sources'][0]['id'] if new['sources'] else None
+        top_matches += old_top == new_top
+
+    n = len(questions)
+    print(f"\n{n} questions")
+    print(f"Answers identical:    {n - len(answer_mismatches)}/{n}")
+    print(f"Top source identical: {top_matches}/{n}")
+    print(f"Tiers: {tiered.retrieval_stats()['tiers']}")
+    for label, search, seconds in (("current", current, baseline_seconds), ("tiered", tiered, tiered_seconds)):
+        print(f"\n{label}: {seconds * 1000 / n:.3f} ms per question")
+        for path, stats in search.retrieval_stats()['paths'].items():
+            print(f"   {path:<8} {stats['requests']:5d} requests  mean {stats['latency_ms']['mean']:.3f} ms")
+    for question in answer_mismatches[:20]:
+        print(f"   answer differs: {question!r}")
+
+    db.close()
+    sys.exit(1 if answer_mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()